@@ -14,6 +14,7 @@ import { EnergyAuditor } from './components/EnergyAuditor';
 import ExecutiveSummary from './components/ExecutiveSummary';
 import InteractiveCharts from './components/InteractiveCharts';
 import RecommendationEngine from './components/RecommendationEngine';
+import { prefetchDashboardBundle } from './services/dashboardData';
 import { LayoutGrid, Calculator as CalcIcon, Activity, Leaf, Settings, Github, BookOpen, Scale, Mail, Layers, Info, Bot, Zap, BarChart3, TrendingUp, Lightbulb, Award } from 'lucide-react';
 
 const App: React.FC = () => {
@@ -43,6 +44,10 @@ const App: React.FC = () => {
     setUrlParams(params);
   };
 
+  useEffect(() => {
+    prefetchDashboardBundle();
+  }, []);
+
   useEffect(() => {
     const params = new URLSearchParams(window.location.search);
 
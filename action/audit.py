@@ -11,27 +11,28 @@ Detection rules derived from the EcoCompute OpenClaw Skill v2.0 AUDIT protocol:
 Author: Hongping Zhang
 """
 
-import json
 import os
 import re
-import subprocess
 import sys
 import time
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field, replace
 from enum import IntEnum
-from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+# The Action pins 3.11; the pre-commit hook runs on the developer's python3
+if sys.version_info < (3, 9):
+    sys.exit("EcoCompute audit needs Python 3.9+ (found %d.%d)" % sys.version_info[:2])
 
 # Add action directory to path for sibling imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from hardware import HardwareInfo, detect_gpu, format_hardware_section
-from calibrate import (
-    Baseline, CalibrationResult, RelativeChange,
-    calibrate, compute_relative_change, estimate_energy,
-    format_estimation, format_relative_change,
-    load_baseline, save_baseline,
-)
+# hardware/calibrate (and json/subprocess, only needed to talk to git/gh) are
+# imported lazily inside the phases that need them so that static-only runs
+# (local lint, pre-merge bots) never pay for GPU probing or unused imports.
+if TYPE_CHECKING:
+    from hardware import HardwareInfo
+    from calibrate import Baseline, CalibrationResult, RelativeChange
+    from workload import WorkloadResult
 
 
 # ---------------------------------------------------------------------------
@@ -70,12 +71,101 @@ class Issue:
     file: str
     line: Optional[int] = None
     energy_impact: str = ""
+    rule: str = ""                   # rule function name or declarative rule id
+    cell: Optional[int] = None       # notebook cell (1-based); `line` is then within the cell
+    fingerprint: str = ""            # rule + file + normalized source line (see fingerprint_issues)
+
+    def location(self) -> str:
+        """Markdown location, e.g. `serve.py` (line 12) or `nb.ipynb` (cell 3, line 2)."""
+        loc = f"`{self.file}`"
+        if self.cell is not None:
+            loc += f" (cell {self.cell}, line {self.line})" if self.line else f" (cell {self.cell})"
+        elif self.line:
+            loc += f" (line {self.line})"
+        return loc
+
+    def to_dict(self) -> dict:
+        d = asdict(self)
+        d["severity"] = self.severity.name.lower()
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Issue":
+        fields = {k: v for k, v in d.items() if k in cls.__dataclass_fields__}
+        fields["severity"] = SEVERITY_THRESHOLD_MAP[str(d["severity"]).lower()]
+        return cls(**fields)
+
+
+@dataclass
+class ScanContext:
+    """Project-wide state shared by context-aware rules."""
+    index: Optional[Any] = None      # project_index.ProjectIndex
+    rules: Optional[Any] = None      # rulespec.CompiledRuleSet (declarative rules)
+    hw: Optional[Any] = None         # hardware.HardwareInfo (None in static-only mode)
+    index_loader: Optional[Callable[[], Any]] = None   # fast paths: builds `index` on demand
+
+    def project_index(self, content: str, filename: str) -> Optional[Any]:
+        """The project index, for a rule auditing `filename`.
+
+        On the fast paths the index is only built (and project_index only
+        imported) once a file imports a module that exists in the project;
+        until then there is nothing for a cross-file rule to resolve.
+        """
+        if self.index is None and self.index_loader is not None:
+            if not imports_local_module(content, filename):
+                return None
+            self.index, self.index_loader = self.index_loader(), None
+        return self.index
+
+
+# `import a.b` / `from a.b import c` / `from . import c`
+_IMPORT_PATTERN = re.compile(
+    r'^\s*(?:from\s+(\.*)([\w.]*)\s+import\b|import\s+([\w.]+))', re.MULTILINE,
+)
+
+
+def imports_local_module(content: str, filename: str) -> bool:
+    """True if `content` has a relative import, or imports a top-level name
+    that is a module or package beside `filename` or in a directory above it
+    (up to the workspace). A few stats, no parse: it only decides whether
+    building the project index can pay off.
+    """
+    root = os.path.abspath(os.environ.get("GITHUB_WORKSPACE") or ".")
+    here = os.path.dirname(os.path.abspath(filename))
+    bases = [here]
+    while here != root and os.path.commonpath([here, root]) == root:
+        here = os.path.dirname(here)
+        bases.append(here)
+
+    for m in _IMPORT_PATTERN.finditer(content):
+        if m.group(1):
+            return True
+        top = (m.group(2) or m.group(3)).split('.')[0]
+        if any(os.path.exists(os.path.join(base, top + ".py"))
+               or os.path.isdir(os.path.join(base, top)) for base in bases):
+            return True
+    return False
 
 
 # ---------------------------------------------------------------------------
 # Detection rules — derived from OpenClaw Skill AUDIT protocol
 # ---------------------------------------------------------------------------
 
+# Models ≤3B where NF4 costs more energy than it saves (paradox_data.md)
+SMALL_MODELS = [
+    (r'[Qq]wen2?-1\.5[Bb]', 'Qwen2-1.5B'),
+    (r'[Pp]hi-?3-?mini', 'Phi-3-mini (3.8B)'),
+    (r'[Pp]hi-?2', 'Phi-2 (2.7B)'),
+    (r'[Gg]emma-?2[Bb]', 'Gemma-2B'),
+    (r'[Tt]iny[Ll]lama', 'TinyLlama (1.1B)'),
+    (r'[Ss]table[Ll][Mm]-?2?-?1\.6', 'StableLM-1.6B'),
+    (r'[Oo]pt-?1\.3[Bb]', 'OPT-1.3B'),
+    (r'[Oo]pt-?2\.7[Bb]', 'OPT-2.7B'),
+    (r'[Gg][Pp][Tt]-?2', 'GPT-2'),
+    (r'[Bb]loom-?1[Bb]', 'BLOOM-1B'),
+]
+
+
 def detect_default_int8(content: str, filename: str) -> list[Issue]:
     """Rule 1: load_in_8bit=True without llm_int8_threshold=0.0
     Energy impact: +17-147% vs FP16 (paradox_data.md)
@@ -129,9 +219,17 @@ def detect_default_int8(content: str, filename: str) -> list[Issue]:
     return issues
 
 
-def detect_nf4_small_model(content: str, filename: str) -> list[Issue]:
+def detect_nf4_small_model(content: str, filename: str,
+                           ctx: Optional[ScanContext] = None) -> list[Issue]:
     """Rule 2: NF4/4-bit quantization on small models (<=3B)
     Energy impact: +11-29% vs FP16 (paradox_data.md)
+
+    The model is bound to the NF4 load: each `from_pretrained` call's
+    quantization config and model id are resolved within the file (index
+    call sites), so an unrelated small-model string elsewhere in the file
+    does not trigger. Configs or ids imported from other modules are Rule 7.
+    Files that do not parse fall back to the whole-file match. With a
+    project index the file is parsed once, for this rule and Rule 7.
     """
     issues = []
 
@@ -139,19 +237,6 @@ def detect_nf4_small_model(content: str, filename: str) -> list[Issue]:
         r'load_in_4bit\s*=\s*True', re.IGNORECASE
     )
 
-    small_models = [
-        (r'[Qq]wen2?-1\.5[Bb]', 'Qwen2-1.5B'),
-        (r'[Pp]hi-?3-?mini', 'Phi-3-mini (3.8B)'),
-        (r'[Pp]hi-?2', 'Phi-2 (2.7B)'),
-        (r'[Gg]emma-?2[Bb]', 'Gemma-2B'),
-        (r'[Tt]iny[Ll]lama', 'TinyLlama (1.1B)'),
-        (r'[Ss]table[Ll][Mm]-?2?-?1\.6', 'StableLM-1.6B'),
-        (r'[Oo]pt-?1\.3[Bb]', 'OPT-1.3B'),
-        (r'[Oo]pt-?2\.7[Bb]', 'OPT-2.7B'),
-        (r'[Gg][Pp][Tt]-?2', 'GPT-2'),
-        (r'[Bb]loom-?1[Bb]', 'BLOOM-1B'),
-    ]
-
     lines = content.split('\n')
     has_nf4 = False
     nf4_line = None
@@ -164,10 +249,49 @@ def detect_nf4_small_model(content: str, filename: str) -> list[Issue]:
             nf4_line = i
 
     if has_nf4:
-        for pattern, model_name in small_models:
-            if re.search(pattern, content):
-                detected_model = model_name
-                break
+        index = ctx.project_index(content, filename) if ctx is not None else None
+        if index is None:
+            from project_index import ProjectIndex, analyze_source
+
+            index, entry, here = ProjectIndex(), analyze_source(content, filename=filename), filename
+        else:
+            entry, here = index.parse(filename, content), index.key(filename)
+        if entry is None:
+            for pattern, model_name in SMALL_MODELS:
+                if re.search(pattern, content):
+                    detected_model = model_name
+                    break
+        else:
+            for call in entry.calls:
+                quant = call.quant_inline
+                if call.quant_name:
+                    symbol = index.resolve(entry, call.quant_name)
+                    if symbol is not None and symbol.kind == "quant_config" and symbol.file == here:
+                        quant = symbol.quant
+                    else:
+                        # Config built inside a function: bind by name within the file
+                        m = re.search(rf'\b{re.escape(call.quant_name)}\s*=\s*[\w.]*BitsAndBytesConfig\s*\(',
+                                      content)
+                        nf4 = m is not None and nf4_pattern.search(_call_args(content, m.end() - 1))
+                        quant = {"load_in_4bit": True} if nf4 else {}
+                if quant.get("load_in_4bit") is not True:
+                    continue
+                model_id = call.model_value
+                if call.model_name:
+                    symbol = index.resolve(entry, call.model_name)
+                    if symbol is not None and symbol.kind == "model_id" and symbol.file == here:
+                        model_id = symbol.value
+                    else:
+                        # Assigned inside a function: bind by name within the file
+                        m = re.search(rf'\b{re.escape(call.model_name)}\s*=\s*["\']([^"\']+)["\']',
+                                      content)
+                        model_id = m.group(1) if m else ""
+                detected_model = next(
+                    (name for pattern, name in SMALL_MODELS if re.search(pattern, model_id)), None,
+                )
+                if detected_model:
+                    nf4_line = call.line
+                    break
 
     if has_nf4 and detected_model:
         issues.append(Issue(
@@ -378,19 +502,549 @@ def detect_redundant_params(content: str, filename: str) -> list[Issue]:
     return issues
 
 
+def detect_cross_file_quant_config(content: str, filename: str, ctx: ScanContext) -> list[Issue]:
+    """Rule 7: Rules 1 and 2 applied through imports
+    `from_pretrained(MODEL_ID, quantization_config=bnb_config)` where the config
+    or the model id is defined in another module. The per-file rules only see
+    the names; the project index resolves them to their definitions.
+    """
+    issues = []
+    index = ctx.project_index(content, filename)
+    if index is None:
+        return issues
+
+    entry = index.entry_for(filename, content)
+    here = index.key(filename)
+
+    for call in entry.calls:
+        quant, quant_origin = call.quant_inline, None
+        if call.quant_name:
+            symbol = index.resolve(entry, call.quant_name)
+            if symbol is None or symbol.kind != "quant_config":
+                continue
+            quant = symbol.quant
+            if symbol.file != here:
+                quant_origin = symbol
+
+        model_id, model_origin = call.model_value, None
+        if call.model_name:
+            symbol = index.resolve(entry, call.model_name)
+            if symbol is not None and symbol.kind == "model_id":
+                model_id = symbol.value
+                if symbol.file != here:
+                    model_origin = symbol
+
+        if quant_origin is None and model_origin is None:
+            continue  # everything is local — the per-file rules cover it
+
+        where = f"`{call.quant_name}` is defined in `{quant_origin.file}` (line {quant_origin.line})" \
+            if quant_origin else ""
+
+        if (quant_origin and quant.get("load_in_8bit") is True
+                and quant.get("llm_int8_threshold") not in (0, 0.0)):
+            issues.append(Issue(
+                severity=Severity.CRITICAL,
+                title="Default INT8 (bitsandbytes mixed-precision decomposition)",
+                description=(
+                    f"{where} with `load_in_8bit=True` but no `llm_int8_threshold=0.0`. "
+                    "This causes 17–147% energy waste due to INT8↔FP16 type conversion at "
+                    "every linear layer. Measured on RTX 4090D (+32.7%) and A800 (+122–147%)."
+                ),
+                fix=(
+                    f"Add `llm_int8_threshold=0.0` where `{call.quant_name}` is defined "
+                    f"(`{quant_origin.file}`):\n"
+                    "```python\n"
+                    "config = BitsAndBytesConfig(\n"
+                    "    load_in_8bit=True,\n"
+                    "    llm_int8_threshold=0.0,  # Disables mixed-precision decomposition\n"
+                    ")\n"
+                    "```"
+                ),
+                file=filename,
+                line=call.line,
+                energy_impact="+17–147% energy vs FP16",
+            ))
+
+        if quant.get("load_in_4bit") is True and model_id:
+            detected_model = next(
+                (name for pattern, name in SMALL_MODELS if re.search(pattern, model_id)),
+                None,
+            )
+            if detected_model:
+                origin = model_origin or quant_origin
+                issues.append(Issue(
+                    severity=Severity.WARNING,
+                    title=f"NF4 quantization on small model ({detected_model})",
+                    description=(
+                        f"`{model_id}` is loaded with NF4 via a config or model id defined in "
+                        f"`{origin.file}` (line {origin.line}). NF4 (4-bit) quantization on "
+                        "models ≤3B wastes 11–29% energy vs FP16. Measured: Qwen2-1.5B "
+                        "+29.4%, Phi-3-mini +11.7% on RTX 5090."
+                    ),
+                    fix=(
+                        f"Use FP16 instead for {detected_model}:\n"
+                        "```python\n"
+                        "model = AutoModelForCausalLM.from_pretrained(\n"
+                        "    model_name,\n"
+                        "    torch_dtype=torch.float16,\n"
+                        '    device_map="auto",\n'
+                        ")\n"
+                        "```"
+                    ),
+                    file=filename,
+                    line=call.line,
+                    energy_impact="+11–29% energy vs FP16",
+                ))
+
+    return issues
+
+
+def _bs_energy_scale(batch_size: int) -> float:
+    """Energy per token at `batch_size` relative to BS=1 (A800 sweep, power
+    law between and beyond the measured sizes)."""
+    from calibrate import BS_ENERGY_SCALE
+
+    return BS_ENERGY_SCALE.get(batch_size, 1.0 / (batch_size ** 0.78))
+
+
+def detect_vram_headroom(content: str, filename: str, ctx: ScanContext) -> list[Issue]:
+    """Rule 8: Configuration vs the detected GPU's VRAM
+    Estimated peak memory (memory.py) for the loaded model, dtype and batch
+    size: flags models that do not fit, and configurations that leave most
+    of the card idle when a much larger batch would fit.
+    """
+    issues = []
+    hw = ctx.hw
+    if hw is None or hw.vram_total_mb <= 0:
+        return issues
+
+    from memory import (
+        estimate_memory, largest_power_of_two, max_batch_size, parse_model_params_b,
+    )
+
+    code = '\n'.join(line.split('#')[0] for line in content.split('\n'))
+    match = re.search(r'from_pretrained\(\s*["\']([^"\']+)["\']', code)
+    if match is None:
+        return issues
+    model_id = match.group(1)
+    params_b = parse_model_params_b(model_id)
+    if params_b is None:
+        return issues
+    line_num = code[:match.start()].count('\n') + 1
+
+    if re.search(r'load_in_4bit\s*=\s*True', code):
+        quantization = "nf4"
+    elif re.search(r'load_in_8bit\s*=\s*True', code):
+        quantization = "int8"
+    elif re.search(r'torch\.float32\b', code):
+        quantization = "fp32"
+    else:
+        quantization = "fp16"
+    batch_sizes = [int(b) for b in re.findall(r'batch_size\s*=\s*(\d+)', code)]
+    batch_size = max(batch_sizes) if batch_sizes else 1
+
+    vram_gb = hw.vram_total_mb / 1024
+    est = estimate_memory(params_b, quantization, batch_size)
+
+    if est.total_gb > vram_gb:
+        issues.append(Issue(
+            severity=Severity.WARNING,
+            title=f"{model_id} does not fit in {vram_gb:.0f} GB VRAM",
+            description=(
+                f"Estimated peak for {params_b:g}B {quantization.upper()} at BS={batch_size}: "
+                f"{est.total_gb:.1f} GB (weights {est.weights_gb:.1f} GB, KV cache "
+                f"{est.kv_cache_gb:.1f} GB) on a {hw.gpu_name} with {vram_gb:.0f} GB. "
+                "`device_map=\"auto\"` will offload layers to CPU, which makes every "
+                "decode step wait on PCIe transfers."
+            ),
+            fix=(
+                "Reduce the footprint so the model stays on the GPU: a smaller batch, "
+                "FP16 instead of FP32, or 8-bit with `llm_int8_threshold=0.0`."
+            ),
+            file=filename,
+            line=line_num,
+            energy_impact="CPU offload: several× slower decode",
+        ))
+        return issues
+
+    room = largest_power_of_two(max_batch_size(params_b, quantization, vram_gb))
+    if room >= 4 * batch_size and est.total_gb < 0.5 * vram_gb:
+        from calibrate import BS_ENERGY_SCALE
+
+        measured = min(room, max(BS_ENERGY_SCALE))   # don't extrapolate past the data
+        saving = (1 - _bs_energy_scale(measured) / _bs_energy_scale(batch_size)) * 100
+        issues.append(Issue(
+            severity=Severity.INFO,
+            title=f"{model_id} fits with room for BS={room}",
+            description=(
+                f"Estimated peak at BS={batch_size}: {est.total_gb:.1f} GB of "
+                f"{vram_gb:.0f} GB on {hw.gpu_name} ({est.total_gb / vram_gb:.0%}). "
+                f"A batch of {room} (256+256 tokens) still fits with 10% headroom. "
+                "Idle VRAM is idle throughput: the A800 batch-size experiment used "
+                "8.4 GB at BS=1 and reached 95.7% less energy per request at BS=64."
+            ),
+            fix=(
+                f"Batch requests (up to {room}) or serve with dynamic batching "
+                "(vLLM, TGI) to use the free memory."
+            ),
+            file=filename,
+            line=line_num,
+            energy_impact=f"~{saving:.0f}% less energy per token at BS={measured}",
+        ))
+
+    return issues
+
+
+# ---------------------------------------------------------------------------
+# Inference-mode and dtype rules — autograd, default FP32 weights, eval mode
+# ---------------------------------------------------------------------------
+
+# `X.from_pretrained(` classes that load no weights
+NON_MODEL_CLASSES = re.compile(r'Tokenizer|Config|Processor|FeatureExtractor', re.IGNORECASE)
+
+# Files that train: gradients and train mode are intended there
+TRAINING_SIGNALS = re.compile(
+    r'\.backward\(|\boptim(?:izer)?\b|\bTrainer\(|\.zero_grad\(|\.step\(\)'
+)
+
+GRAD_FREE_SCOPE = re.compile(r'(?:no_grad|inference_mode)\s*\(|set_grad_enabled\(\s*False')
+FP32_DTYPE = re.compile(r'\b(?:torch_)?dtype\s*=\s*(?:torch\.)?float32\b|\btorch\.float32\b')
+GPU_PLACEMENT = re.compile(r'cuda|device_map\s*=|\.to\(\s*device\b')
+
+
+@dataclass
+class ModelLoad:
+    """`var = Cls.from_pretrained(...)` (or torch.load) found in a file."""
+    var: str
+    line: int
+    args: str                        # text between the call's parentheses
+    model_id: Optional[str] = None   # first argument, when a string literal
+
+
+def _strip_comments(content: str) -> str:
+    return '\n'.join(line.split('#')[0] for line in content.split('\n'))
+
+
+def _call_args(code: str, open_paren: int) -> str:
+    """Text inside the parentheses opening at `open_paren` (to the end if unbalanced)."""
+    depth = 0
+    for i in range(open_paren, len(code)):
+        if code[i] == '(':
+            depth += 1
+        elif code[i] == ')':
+            depth -= 1
+            if depth == 0:
+                return code[open_paren + 1:i]
+    return code[open_paren + 1:]
+
+
+def _model_loads(code: str, loaders: str = r'[\w.]+\.from_pretrained') -> list[ModelLoad]:
+    """Assignments of a loaded model, tokenizers/configs/processors excluded."""
+    loads = []
+    for m in re.finditer(rf'^\s*(\w+)\s*=\s*({loaders})\s*\(', code, re.MULTILINE):
+        if NON_MODEL_CLASSES.search(m.group(2)):
+            continue
+        args = _call_args(code, m.end() - 1)
+        model_id = re.match(r'\s*["\']([^"\']+)["\']', args)
+        loads.append(ModelLoad(
+            var=m.group(1),
+            line=code[:m.start(1)].count('\n') + 1,
+            args=args,
+            model_id=model_id.group(1) if model_id else None,
+        ))
+    return loads
+
+
+def _in_grad_free_scope(lines: list[str], idx: int) -> bool:
+    """Whether line `idx` (0-based) sits in a `with torch.no_grad()` /
+    `inference_mode()` block or a function decorated with either.
+    """
+    def indent(s: str) -> int:
+        return len(s) - len(s.lstrip())
+
+    level = indent(lines[idx])
+    for j in range(idx - 1, -1, -1):
+        line = lines[j]
+        if not line.strip() or indent(line) >= level:
+            continue
+        level = indent(line)
+        header = line.strip()
+        if header.startswith('with ') and GRAD_FREE_SCOPE.search(header):
+            return True
+        if header.startswith(('def ', 'async def ')):
+            k = j - 1
+            while k >= 0 and lines[k].strip().startswith('@'):
+                if GRAD_FREE_SCOPE.search(lines[k]):
+                    return True
+                k -= 1
+    return False
+
+
+def _dtype_impact(load: Optional[ModelLoad], ctx: ScanContext) -> tuple[str, str]:
+    """(description sentence, energy_impact) for FP32 instead of FP16 weights:
+    weight bytes from memory.py and, with a detected GPU, J/1k tokens from
+    estimate_energy. Decode is memory-bound, so energy follows bytes read.
+    """
+    from memory import DTYPE_BYTES, estimate_memory, parse_model_params_b
+
+    params_b = parse_model_params_b(load.model_id) if load and load.model_id else None
+    label = f"{params_b:g}B" if params_b else "7B (reference size)"
+    params_b = params_b or 7.0
+    fp32 = estimate_memory(params_b, "fp32").weights_gb
+    fp16 = estimate_memory(params_b, "fp16").weights_gb
+    ratio = DTYPE_BYTES["fp32"] / DTYPE_BYTES["fp16"]
+    sentence = (f"For a {label} model that is {fp32:.1f} GB of weights instead of "
+                f"{fp16:.1f} GB, read once per generated token.")
+    impact = f"~{ratio:.0f}× weight traffic per decode step ({fp32:.0f} vs {fp16:.0f} GB)"
+
+    if ctx.hw is not None:
+        from calibrate import estimate_energy
+
+        j_fp16 = estimate_energy(params_b, "fp16", 1, ctx.hw)["energy_j_per_1k_tok"]
+        impact += f"; ≈{j_fp16 * ratio:.0f} vs {j_fp16:.0f} J/1k tokens on {ctx.hw.gpu_name}"
+    return sentence, impact
+
+
+def _autograd_impact(load: ModelLoad, ctx: ScanContext) -> tuple[str, str]:
+    """(description sentence, energy_impact) for activations kept for a
+    backward pass: the memory held (memory.py) and, with a detected GPU, the
+    batch it costs priced like Rule 8. Without a GPU there is no batch to
+    price, so the impact is stated as memory.
+    """
+    from memory import (
+        autograd_activations_gb, largest_power_of_two, max_batch_size, parse_model_params_b,
+    )
+
+    params_b = (parse_model_params_b(load.model_id) if load.model_id else None) or 7.0
+    held = autograd_activations_gb(params_b)
+    sentence = (f"For {params_b:g}B at 256 tokens that is ~{held:.1f} GB per request, "
+                "written to VRAM and holding memory a larger batch could use.")
+    impact = f"Memory, not energy: +{held:.1f} GB held per forward (BS=1, 256 tokens)"
+
+    hw = ctx.hw
+    if hw is None or hw.vram_total_mb <= 0:
+        return sentence, impact
+
+    from calibrate import BS_ENERGY_SCALE
+
+    vram_gb = hw.vram_total_mb / 1024
+    cap = max(BS_ENERGY_SCALE)   # don't extrapolate past the data
+    free = min(largest_power_of_two(max_batch_size(params_b, "fp16", vram_gb)), cap)
+    grads = min(largest_power_of_two(
+        max_batch_size(params_b, "fp16", vram_gb, extra_gb_per_request=held)), cap)
+    if 0 < grads < free:
+        extra = (_bs_energy_scale(grads) / _bs_energy_scale(free) - 1) * 100
+        impact = (f"~{extra:.0f}% more energy per token at the largest batch that fits on "
+                  f"{hw.gpu_name}: BS={grads} instead of {free} (+{held:.1f} GB per request)")
+    return sentence, impact
+
+
+def detect_grad_enabled_inference(content: str, filename: str, ctx: ScanContext) -> list[Issue]:
+    """Rule 9: Forward pass with autograd on
+    `model(**inputs)` / `model.forward(...)` outside `torch.no_grad()` or
+    `torch.inference_mode()` keeps every layer's activations for a backward
+    pass that never comes. `model.generate()` is not flagged: transformers
+    already runs it under no_grad. Files that train are skipped.
+    """
+    issues = []
+    code = _strip_comments(content)
+    if TRAINING_SIGNALS.search(code) or re.search(r'set_grad_enabled\(\s*False', code):
+        return issues
+
+    lines = code.split('\n')
+    for load in _model_loads(code):
+        call = re.compile(rf'(?<![\w.]){re.escape(load.var)}(?:\.forward)?\s*\(')
+        for i, line in enumerate(lines):
+            if i + 1 <= load.line or not call.search(line):
+                continue
+            if _in_grad_free_scope(lines, i):
+                continue
+
+            sentence, impact = _autograd_impact(load, ctx)
+            issues.append(Issue(
+                severity=Severity.WARNING,
+                title="Forward pass without torch.no_grad() / inference_mode()",
+                description=(
+                    f"`{load.var}(...)` runs with autograd enabled, so every layer's "
+                    f"activations are kept for a backward pass that never happens. {sentence}"
+                ),
+                fix=(
+                    "Wrap inference in `torch.inference_mode()` (or `torch.no_grad()`):\n"
+                    "```python\n"
+                    "with torch.inference_mode():\n"
+                    f"    outputs = {load.var}(**inputs)\n"
+                    "```"
+                ),
+                file=filename,
+                line=i + 1,
+                energy_impact=impact,
+            ))
+            return issues  # one per file is enough
+
+    return issues
+
+
+def detect_missing_torch_dtype(content: str, filename: str, ctx: ScanContext) -> list[Issue]:
+    """Rule 10: from_pretrained without torch_dtype
+    transformers 4.x loads weights in float32 unless told otherwise: twice
+    the memory and memory traffic of the FP16/BF16 checkpoint. Quantized
+    loads (bitsandbytes picks the dtype) and models cast afterwards are
+    skipped.
+    """
+    issues = []
+    code = _strip_comments(content)
+    for load in _model_loads(code):
+        if re.search(r'\b(?:torch_)?dtype\s*=|load_in_[48]bit|quantization_config', load.args):
+            continue
+        # Cast after loading (Rule 11 covers casts to float32)
+        var = re.escape(load.var)
+        if re.search(rf'\b{var}\.(?:half|bfloat16|float)\(|\b{var}\.to\([^)]*(?:float|dtype)', code):
+            continue
+        sentence, impact = _dtype_impact(load, ctx)
+        issues.append(Issue(
+            severity=Severity.WARNING,
+            title="from_pretrained() without torch_dtype loads FP32 weights",
+            description=(
+                "Without `torch_dtype`, transformers 4.x upcasts the checkpoint to "
+                f"float32. {sentence} Token-by-token decode is bound by that traffic."
+            ),
+            fix=(
+                'Load in the checkpoint\'s dtype (`torch_dtype="auto"`) or FP16/BF16:\n'
+                "```python\n"
+                f"{load.var} = AutoModelForCausalLM.from_pretrained(\n"
+                "    model_name,\n"
+                "    torch_dtype=torch.bfloat16,\n"
+                '    device_map="auto",\n'
+                ")\n"
+                "```"
+            ),
+            file=filename,
+            line=load.line,
+            energy_impact=impact,
+        ))
+        break  # one per file is enough
+
+    return issues
+
+
+def detect_fp32_on_gpu(content: str, filename: str, ctx: ScanContext) -> list[Issue]:
+    """Rule 11: Explicit torch.float32 for a model placed on a GPU
+    `torch_dtype=torch.float32`, `model.float()` or `model.to(torch.float32)`
+    where the file also targets CUDA. FP32 inference doubles weight traffic
+    and gives up tensor-core throughput for no accuracy most LLMs need.
+    """
+    issues = []
+    code = _strip_comments(content)
+    if not GPU_PLACEMENT.search(code):
+        return issues
+
+    lines = code.split('\n')
+    loads = _model_loads(code)
+    for load in loads:
+        if FP32_DTYPE.search(load.args):
+            hit = load
+            break
+    else:
+        hit = None
+        for load in loads:
+            cast = re.compile(rf'\b{re.escape(load.var)}\.(?:float\(\)|to\([^)]*float32)')
+            line = next((i for i, text in enumerate(lines, 1) if cast.search(text)), None)
+            if line is not None:
+                hit = ModelLoad(load.var, line, load.args, load.model_id)
+                break
+    if hit is None:
+        return issues
+
+    sentence, impact = _dtype_impact(hit, ctx)
+    issues.append(Issue(
+        severity=Severity.WARNING,
+        title="Model explicitly kept in float32 on GPU",
+        description=(
+            f"`{hit.var}` is loaded or cast to `torch.float32` and runs on a GPU. "
+            f"{sentence} FP32 also bypasses the FP16/BF16 tensor cores."
+        ),
+        fix=(
+            "Use `torch_dtype=torch.bfloat16` (or `torch.float16`), and keep FP32 only "
+            "where a measured accuracy drop requires it."
+        ),
+        file=filename,
+        line=hit.line,
+        energy_impact=impact,
+    ))
+    return issues
+
+
+def detect_missing_eval(content: str, filename: str, ctx: ScanContext) -> list[Issue]:
+    """Rule 12: Inference in training mode
+    from_pretrained() returns models in eval mode, but a model switched with
+    `.train()` or loaded with `torch.load` / `torch.hub.load` stays (or may
+    be) in training mode: dropout keeps sampling masks and outputs are not
+    deterministic. Files that train are skipped.
+    """
+    issues = []
+    code = _strip_comments(content)
+    if TRAINING_SIGNALS.search(code):
+        return issues
+
+    lines = code.split('\n')
+    loads = _model_loads(code, r'[\w.]+\.from_pretrained|torch\.(?:hub\.)?load')
+    for load in loads:
+        var = re.escape(load.var)
+        use = re.compile(rf'(?<![\w.]){var}(?:\.forward|\.generate)?\s*\(')
+        train = re.compile(rf'\b{var}\.train\(\s*(?:True)?\s*\)')
+        evaluated = re.compile(rf'\b{var}\.(?:eval\(\)|train\(\s*False\s*\))')
+        # from_pretrained starts in eval mode; torch.load's module is whatever was saved
+        training = 'from_pretrained' not in lines[load.line - 1]
+        for i, line in enumerate(lines[load.line:], load.line + 1):
+            if evaluated.search(line):
+                training = False
+            elif train.search(line):
+                training = True
+            elif training and use.search(line):
+                issues.append(Issue(
+                    severity=Severity.INFO,
+                    title="Inference without model.eval()",
+                    description=(
+                        f"`{load.var}` is used for inference without `.eval()` after "
+                        "being loaded with `torch.load` or put in training mode. Dropout "
+                        "keeps drawing masks on every forward and outputs change run to run."
+                    ),
+                    fix=f"Call `{load.var}.eval()` before inference.",
+                    file=filename,
+                    line=i,
+                    energy_impact="Dropout masking on every forward; nondeterministic outputs",
+                ))
+                return issues  # one per file is enough
+
+    return issues
+
+
 # ---------------------------------------------------------------------------
 # All detection rules
 # ---------------------------------------------------------------------------
 
 ALL_RULES = [
     detect_default_int8,
-    detect_nf4_small_model,
     detect_bs1_loop,
     detect_mixed_precision_conflict,
     detect_missing_device_map,
     detect_redundant_params,
 ]
 
+# Rules that need project-wide state: called as rule(content, filename, ctx)
+CONTEXT_RULES = [
+    detect_nf4_small_model,
+    detect_cross_file_quant_config,
+    detect_vram_headroom,
+    detect_grad_enabled_inference,
+    detect_missing_torch_dtype,
+    detect_fp32_on_gpu,
+    detect_missing_eval,
+]
+
+# Context rules whose findings depend on other files (via the project index)
+INDEX_RULES = {"detect_cross_file_quant_config"}
+
 
 # ---------------------------------------------------------------------------
 # Diff parsing
@@ -398,9 +1052,12 @@ ALL_RULES = [
 
 def get_pr_diff() -> str:
     """Get the diff of the current PR using gh CLI or git."""
+    import json
+    import subprocess
+
     # Try GitHub Actions context
     event_path = os.environ.get("GITHUB_EVENT_PATH")
-    if event_path and Path(event_path).exists():
+    if event_path and os.path.exists(event_path):
         with open(event_path) as f:
             event = json.load(f)
         pr_number = event.get("pull_request", {}).get("number")
@@ -429,26 +1086,38 @@ def get_pr_diff() -> str:
     return ""
 
 
+# Auditable file types: Python sources and Jupyter notebooks
+SOURCE_SUFFIXES = ('.py', '.ipynb')
+RULES_DIR = ".ecocompute/rules"    # rulespec.RULES_DIR, checked without importing rulespec
+
+
 def get_changed_python_files() -> list[str]:
-    """Get list of changed Python files from the PR diff."""
+    """Get list of changed Python files (and notebooks) from the PR diff."""
     diff_output = get_pr_diff()
     files = []
     for line in diff_output.strip().split('\n'):
         line = line.strip()
-        if line.endswith('.py'):
-            if Path(line).exists():
+        if line.endswith(SOURCE_SUFFIXES):
+            if os.path.exists(line):
                 files.append(line)
     return files
 
 
-def get_all_python_files() -> list[str]:
-    """Fallback: scan common directories for Python files."""
+def get_all_python_files(limit: Optional[int] = 50) -> list[str]:
+    """Fallback: scan common directories for Python files and notebooks.
+
+    Capped at `limit` files (None: no cap, used when sharding).
+    """
+    from pathlib import Path
+
     py_files = []
     scan_dirs = ['.', 'src', 'scripts', 'examples']
     for d in scan_dirs:
         p = Path(d)
         if p.exists():
-            for f in p.rglob('*.py'):
+            for f in p.rglob('*'):
+                if f.suffix not in SOURCE_SUFFIXES:
+                    continue
                 # Skip common non-relevant dirs
                 parts = f.parts
                 if any(skip in parts for skip in [
@@ -457,34 +1126,476 @@ def get_all_python_files() -> list[str]:
                 ]):
                     continue
                 py_files.append(str(f))
-    return py_files[:50]  # cap to avoid scanning huge repos
+    if limit is None:
+        return sorted(set(py_files))   # '.' also covers src/ etc.
+    return py_files[:limit]  # cap to avoid scanning huge repos
 
 
 # ---------------------------------------------------------------------------
-# Report generation
+# Scanning
 # ---------------------------------------------------------------------------
 
-def generate_report(
-    issues: list[Issue],
-    files_scanned: int,
-    hw: Optional[HardwareInfo] = None,
-    cal: Optional[CalibrationResult] = None,
-    change: Optional[RelativeChange] = None,
-    baseline: Optional[Baseline] = None,
-) -> str:
-    """Generate markdown audit report with hardware info and relative changes."""
-    critical = [i for i in issues if i.severity == Severity.CRITICAL]
-    warnings = [i for i in issues if i.severity == Severity.WARNING]
-    infos = [i for i in issues if i.severity == Severity.INFO]
+# Cheap substring pre-filter: files without any of these cannot trigger a rule
+RULE_KEYWORDS = [
+    'BitsAndBytesConfig', 'load_in_8bit', 'load_in_4bit',
+    'quantization_config', 'from_pretrained', '.generate(',
+    'bnb_4bit', 'llm_int8', 'torch.load', 'hub.load',
+]
 
-    lines = []
-    lines.append("## ⚡ EcoCompute Energy Audit")
-    lines.append("")
 
-    # Hardware section
-    if hw:
-        lines.append(format_hardware_section(hw))
+def has_rule_keywords(content: str) -> bool:
+    """Whether any built-in rule could possibly fire on this content."""
+    return any(kw in content for kw in RULE_KEYWORDS)
+
+
+def audit_content(content: str, filename: str, ctx: Optional[ScanContext] = None) -> list[Issue]:
+    """Run all detection rules over one file's content. Without `ctx` the
+    context rules see an empty one, as in static-only mode."""
+    issues = []
+    ctx = ctx if ctx is not None else ScanContext()
+
+    if has_rule_keywords(content):
+        for rule in ALL_RULES:
+            for issue in rule(content, filename):
+                issue.rule = issue.rule or rule.__name__
+                issues.append(issue)
+        for rule in CONTEXT_RULES:
+            for issue in rule(content, filename, ctx):
+                issue.rule = issue.rule or rule.__name__
+                issues.append(issue)
+
+    # Declarative rules carry their own patterns, so no keyword pre-filter
+    if ctx.rules is not None:
+        for hit in ctx.rules.evaluate(content):
+            issues.append(Issue(
+                severity=SEVERITY_THRESHOLD_MAP[hit.spec.severity],
+                title=hit.spec.title,
+                description=hit.spec.description,
+                fix=hit.spec.fix,
+                file=filename,
+                line=hit.line,
+                energy_impact=hit.spec.energy_impact,
+                rule=hit.spec.id,
+            ))
+
+    return issues
+
+
+def build_scan_context(hw: Optional["HardwareInfo"] = None,
+                       files: Optional[list[str]] = None,
+                       index_loader: Optional[Callable[[], Any]] = None) -> ScanContext:
+    """Load declarative rules and build the project index (unless disabled
+    with PROJECT_INDEX=false). `hw` enables hardware-aware rules.
+
+    `files` (static-only) or `index_loader` (staged blobs) defer the index
+    to the first file that imports a project module, instead of walking the
+    workspace. The walked index is only persisted in CI, so local runs leave
+    nothing behind.
+    """
+    ctx = ScanContext(hw=hw)
+    workspace = os.environ.get("GITHUB_WORKSPACE")
+
+    # rulespec compiles every pattern up front; skip it when no spec can exist
+    if os.environ.get("RULES_PATH") or os.path.exists(os.path.join(workspace or ".", RULES_DIR)):
+        from rulespec import load_compiled_rules
+
+        ctx.rules = load_compiled_rules()
+        if ctx.rules is not None:
+            print(f"  Custom rules: {len(ctx.rules)} loaded")
+
+    if os.environ.get("PROJECT_INDEX", "true").lower() != "true":
+        return ctx
+
+    if index_loader is not None:
+        ctx.index_loader = index_loader
+        return ctx
+
+    def load():
+        from project_index import build_index
+
+        start = time.time()
+        index = build_index(workspace or ".", files=files, persist=bool(workspace))
+        print(f"  Project index: {len(index.files)} module(s) "
+              f"({(time.time() - start) * 1000:.0f} ms)")
+        return index
+
+    if files is not None:
+        ctx.index_loader = load
+    else:
+        ctx.index = load()
+    return ctx
+
+
+def read_source(filepath: str) -> tuple[str, Optional[list[tuple[int, int]]]]:
+    """File content to audit, plus a (cell, line) map for notebooks."""
+    if filepath.endswith('.ipynb'):
+        from notebook import load_notebook_source
+        return load_notebook_source(filepath)
+
+    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+        return f.read(), None
+
+
+def source_from_bytes(data: bytes, filepath: str) -> tuple[str, Optional[list[tuple[int, int]]]]:
+    """Like read_source, for a blob read from git instead of the filesystem."""
+    text = data.decode('utf-8', errors='ignore')
+    if filepath.endswith('.ipynb'):
+        import io
+        from notebook import read_notebook_source
+        return read_notebook_source(io.StringIO(text))
+    return text, None
+
+
+def map_notebook_lines(issues: list[Issue], line_map: list[tuple[int, int]]) -> list[Issue]:
+    """Point issues found in a notebook's concatenated source at their cell."""
+    for issue in issues:
+        if issue.line and 0 < issue.line <= len(line_map):
+            issue.cell, issue.line = line_map[issue.line - 1]
+    return issues
+
+
+def fingerprint_issues(issues: list[Issue], content: str) -> list[Issue]:
+    """Identify each finding by rule + file + its whitespace-normalized source
+    line, so the same finding matches across versions even when it moved.
+    """
+    import hashlib
+
+    lines = content.split('\n')
+    for issue in issues:
+        context = issue.title
+        if issue.line and 0 < issue.line <= len(lines):
+            context = ' '.join(lines[issue.line - 1].split())
+        key = f"{issue.rule}|{issue.file}|{context}"
+        issue.fingerprint = hashlib.sha1(key.encode()).hexdigest()[:16]
+    return issues
+
+
+def audit_source(content: str, line_map: Optional[list[tuple[int, int]]], filepath: str,
+                 ctx: Optional[ScanContext] = None) -> list[Issue]:
+    """Audit one file's content: rules, fingerprints, notebook cell mapping."""
+    issues = fingerprint_issues(audit_content(content, filepath, ctx), content)
+    if line_map is not None:
+        map_notebook_lines(issues, line_map)
+    return issues
+
+
+def scan_files(py_files: list[str], ctx: Optional[ScanContext] = None) -> list[Issue]:
+    """Read and audit each file, printing progress like the CI log expects."""
+    all_issues: list[Issue] = []
+
+    for filepath in py_files:
+        print(f"  Scanning: {filepath}")
+        try:
+            content, line_map = read_source(filepath)
+        except (OSError, ValueError) as e:
+            print(f"    Error reading {filepath}: {e}")
+            continue
+
+        if not has_rule_keywords(content) and (ctx is None or ctx.rules is None):
+            print(f"    Skipped (no quantization keywords)")
+            continue
+
+        all_issues.extend(audit_source(content, line_map, filepath, ctx))
+
+    return all_issues
+
+
+# ---------------------------------------------------------------------------
+# Differential audit (base vs head)
+# ---------------------------------------------------------------------------
+
+@dataclass
+class DiffResult:
+    """Head findings split into new vs pre-existing, relative to the base."""
+    base: str
+    new: list
+    existing: list
+    resolved: list
+
+
+def split_new_issues(head: list[Issue], base: list[Issue]) -> DiffResult:
+    """Multiset difference on fingerprints: the k-th occurrence of a
+    fingerprint in head is new only if base had fewer than k.
+    """
+    from collections import Counter
+
+    base_counts = Counter(i.fingerprint for i in base)
+    head_counts = Counter(i.fingerprint for i in head)
+    seen: Counter = Counter()
+    result = DiffResult(base="", new=[], existing=[], resolved=[])
+    for issue in head:
+        seen[issue.fingerprint] += 1
+        target = result.existing if seen[issue.fingerprint] <= base_counts[issue.fingerprint] else result.new
+        target.append(issue)
+    seen.clear()
+    for issue in base:
+        seen[issue.fingerprint] += 1
+        if seen[issue.fingerprint] > head_counts[issue.fingerprint]:
+            result.resolved.append(issue)
+    return result
+
+
+def differential_audit(py_files: list[str], ctx: Optional[ScanContext] = None,
+                       repo: str = ".") -> Optional[DiffResult]:
+    """Audit head (working tree) and base (merge base, read from the object
+    database via one `git cat-file --batch`) versions of the given files.
+    Only files changed since the base are read and audited again; a tracked
+    file outside the diff has the same findings at base as at head, except
+    cross-file findings, which depend on modules that may have changed.
+    Base versions are audited against a project index of the base tree.
+    Returns None if no base can be resolved.
+    """
+    from gitobjects import CatFileBatch, GitError, changed_files, resolve_base, tracked_files
+
+    try:
+        base = resolve_base(repo)
+        if base is None:
+            return None
+        renames = changed_files(base, repo)
+        tracked = set(tracked_files("*", repo))
+    except GitError as e:
+        print(f"  Differential audit unavailable: {e}")
+        return None
+
+    head_issues = scan_files(py_files, ctx)
+
+    # Base version of each changed file (following renames; added and
+    # untracked files have none)
+    specs = {}
+    unchanged = set()
+    for path in py_files:
+        rel = os.path.relpath(path, repo).replace(os.sep, '/')
+        if rel in renames:
+            if renames[rel] is not None:
+                specs[path] = f"{base}:{renames[rel]}"
+        elif rel in tracked:
+            unchanged.add(path)
+
+    recheck = sorted({issue.file for issue in head_issues
+                      if issue.file in unchanged and issue.rule in INDEX_RULES})
+    base_issues = [issue for issue in head_issues
+                   if issue.file in unchanged and issue.file not in recheck]
+    if specs or recheck:
+        with CatFileBatch(repo) as git:
+            blobs = git.read_many(specs.values()) if specs else {}
+            sources = {}
+            for path, spec in specs.items():
+                data = blobs.get(spec)
+                if data is None:
+                    continue
+                try:
+                    sources[path] = source_from_bytes(data, path)
+                except ValueError:
+                    continue
+            for path in recheck:
+                sources[path] = read_source(path)    # unchanged: same as at base
 
+            base_ctx = ctx
+            if ctx is not None and (ctx.index is not None or ctx.index_loader is not None):
+                texts = {path: content for path, (content, _) in sources.items()}
+                base_ctx = replace(ctx, index=None,
+                                   index_loader=lambda: index_revision(git, base, texts, repo))
+            # Attributed to the head path so renamed files keep their fingerprints
+            for path, (content, line_map) in sources.items():
+                base_issues.extend(audit_source(content, line_map, path, base_ctx))
+
+    result = split_new_issues(head_issues, base_issues)
+    result.base = base
+    return result
+
+
+def index_revision(git, rev: str, sources: dict[str, str], repo: str = "."):
+    """Project index of commit `rev`: the given sources (at their head
+    paths), plus the modules they import, read from `rev` as needed."""
+    from gitobjects import revision_files
+    from project_index import index_sources
+
+    def read(paths: list[str]) -> dict[str, str]:
+        found = git.read_many(f"{rev}:{p}" for p in paths)
+        return {p: found[f"{rev}:{p}"].decode("utf-8", errors="ignore")
+                for p in paths if found.get(f"{rev}:{p}") is not None}
+
+    python = {path: content for path, content in sources.items() if path.endswith(".py")}
+    return index_sources(python, revision_files(rev, repo=repo), read, root=repo)
+
+
+# ---------------------------------------------------------------------------
+# Sharded audit (CI matrix jobs)
+# ---------------------------------------------------------------------------
+
+SHARD_FORMAT_VERSION = 1
+
+
+@dataclass
+class ShardResult:
+    """One shard's partial audit: written by `--shard`, combined by `--merge`.
+
+    `issues` are unfiltered (the merge applies the severity threshold). In a
+    differential audit the first `new_count` of them are new since
+    `diff_base` and the rest pre-existing; `resolved` are gone since then.
+    """
+    index: int
+    count: int
+    scan_mode: str = ""
+    files: list = field(default_factory=list)
+    issues: list = field(default_factory=list)
+    diff_base: str = ""
+    new_count: int = 0
+    resolved: list = field(default_factory=list)
+    hardware_hash: str = ""          # runner that evaluated hardware-aware rules
+    elapsed_s: float = 0.0
+
+    def to_dict(self) -> dict:
+        d = asdict(self)
+        d["version"] = SHARD_FORMAT_VERSION
+        d["issues"] = [i.to_dict() for i in self.issues]
+        d["resolved"] = [i.to_dict() for i in self.resolved]
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ShardResult":
+        if d.get("version") != SHARD_FORMAT_VERSION:
+            raise ValueError(f"unsupported shard result version {d.get('version')}")
+        fields = {k: v for k, v in d.items() if k in cls.__dataclass_fields__}
+        fields["issues"] = [Issue.from_dict(i) for i in d.get("issues", [])]
+        fields["resolved"] = [Issue.from_dict(i) for i in d.get("resolved", [])]
+        return cls(**fields)
+
+    def diff_result(self) -> Optional[DiffResult]:
+        if not self.diff_base:
+            return None
+        return DiffResult(base=self.diff_base, new=self.issues[:self.new_count],
+                          existing=self.issues[self.new_count:], resolved=self.resolved)
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """'2/4' → (2, 4): shard 2 of 4, 1-based like a matrix index."""
+    try:
+        index, count = (int(x) for x in spec.split('/'))
+    except ValueError:
+        raise ValueError(f"shard must be INDEX/COUNT (e.g. 2/4), got '{spec}'") from None
+    if not 1 <= index <= count:
+        raise ValueError(f"shard index {index} is outside 1..{count}")
+    return index, count
+
+
+def shard_files(files: list[str], index: int, count: int) -> list[str]:
+    """This shard's share of `files`, balanced by size.
+
+    Largest first, each file goes to the shard with the fewest bytes so far
+    (lowest number on ties). Equal sizes are ordered by a hash of the path,
+    so every matrix job derives the same partition from the same file set
+    whatever order discovery produced it in.
+    """
+    import hashlib
+    import heapq
+
+    sizes = {}
+    for path in files:
+        try:
+            sizes[path] = os.path.getsize(path)
+        except OSError:
+            sizes[path] = 0
+    order = sorted(sizes, key=lambda p: (-sizes[p], hashlib.sha1(p.encode()).hexdigest()))
+
+    loads = [(0, shard) for shard in range(count)]
+    mine = []
+    for path in order:
+        load, shard = heapq.heappop(loads)
+        if shard == index - 1:
+            mine.append(path)
+        heapq.heappush(loads, (load + max(sizes[path], 1), shard))
+    return sorted(mine)
+
+
+def write_shard_result(result: ShardResult, path: str):
+    import json
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(result.to_dict(), f, indent=1)
+
+
+def load_shard_results(paths: list[str]) -> list[ShardResult]:
+    """Read partial results; a directory contributes every
+    ecocompute-shard-*.json below it (so a downloaded artifact folder can be
+    passed as is)."""
+    import json
+    from pathlib import Path
+
+    files: list[Path] = []
+    for p in paths:
+        path = Path(p)
+        files.extend(sorted(path.rglob('ecocompute-shard-*.json')) if path.is_dir() else [path])
+    results = []
+    for f in files:
+        with open(f) as fh:
+            try:
+                results.append(ShardResult.from_dict(json.load(fh)))
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{f}: not a shard result ({e})") from None
+    return results
+
+
+def merge_shard_results(results: list[ShardResult]) -> ShardResult:
+    """Combine every shard of one run into a single result (index 0).
+
+    Raises ValueError unless exactly shards 1..N of the same N are present
+    and they agree on the scan mode and differential base.
+    """
+    if not results:
+        raise ValueError("no shard results found")
+    count = results[0].count
+    if any(r.count != count for r in results):
+        raise ValueError("shard results come from runs with different shard counts: "
+                         + ", ".join(sorted({str(r.count) for r in results})))
+    indices = sorted(r.index for r in results)
+    duplicates = sorted({i for i in indices if indices.count(i) > 1})
+    if duplicates:
+        raise ValueError(f"duplicate shard(s): {', '.join(f'{i}/{count}' for i in duplicates)}")
+    missing = [i for i in range(1, count + 1) if i not in indices]
+    if missing:
+        raise ValueError(f"missing shard(s): {', '.join(f'{i}/{count}' for i in missing)}")
+    differential = sorted(f"{r.index}/{count}" for r in results if r.diff_base)
+    if differential and len(differential) < count:
+        # A full-audit shard has no new/pre-existing split to merge
+        raise ValueError("shards mix differential and full audits "
+                         f"(differential: {', '.join(differential)})")
+    for attr in ("scan_mode", "diff_base"):
+        values = {getattr(r, attr) for r in results}
+        if len(values) > 1:
+            raise ValueError(f"shards disagree on {attr}: {', '.join(sorted(values))}")
+
+    merged = ShardResult(index=0, count=count, scan_mode=results[0].scan_mode,
+                         diff_base=results[0].diff_base)
+    existing = []
+    for r in sorted(results, key=lambda r: r.index):
+        merged.files.extend(r.files)
+        merged.issues.extend(r.issues[:r.new_count])
+        existing.extend(r.issues[r.new_count:])
+        merged.resolved.extend(r.resolved)
+        merged.elapsed_s = max(merged.elapsed_s, r.elapsed_s)
+    merged.new_count = len(merged.issues)
+    merged.issues.extend(existing)
+    hashes = {r.hardware_hash for r in results}
+    merged.hardware_hash = hashes.pop() if len(hashes) == 1 else "mixed"
+    return merged
+
+
+def filter_issues(issues: list[Issue], threshold: Severity) -> list[Issue]:
+    """Drop issues below the severity threshold and sort critical-first."""
+    filtered = [i for i in issues if i.severity >= threshold]
+    filtered.sort(key=lambda i: (-i.severity, i.file))
+    return filtered
+
+
+# ---------------------------------------------------------------------------
+# Report generation
+# ---------------------------------------------------------------------------
+
+def _summary_lines(issues: list[Issue], files_scanned: int) -> list[str]:
+    """The "Scanned N file(s). Found …" paragraph (or the all-clear)."""
+    lines = []
     if not issues:
         lines.append(
             f"Scanned **{files_scanned}** Python file(s). "
@@ -496,90 +1607,243 @@ def generate_report(
             "For deeper analysis (cost estimation, carbon footprint, optimization), "
             "try the [EcoCompute OpenClaw Skill](https://clawhub.ai/hongping-zh/ecocompute)."
         )
-    else:
-        issue_summary = []
-        if critical:
-            issue_summary.append(f"**{len(critical)}** critical")
-        if warnings:
-            issue_summary.append(f"**{len(warnings)}** warning(s)")
-        if infos:
-            issue_summary.append(f"**{len(infos)}** info")
+        return lines
 
-        lines.append(
-            f"Scanned **{files_scanned}** Python file(s). "
-            f"Found {', '.join(issue_summary)}."
-        )
-        lines.append("")
+    counts = {sev: sum(1 for i in issues if i.severity == sev) for sev in Severity}
+    issue_summary = []
+    if counts[Severity.CRITICAL]:
+        issue_summary.append(f"**{counts[Severity.CRITICAL]}** critical")
+    if counts[Severity.WARNING]:
+        issue_summary.append(f"**{counts[Severity.WARNING]}** warning(s)")
+    if counts[Severity.INFO]:
+        issue_summary.append(f"**{counts[Severity.INFO]}** info")
 
-        # Critical issues
-        if critical:
-            lines.append("### 🔴 Critical Issues")
-            lines.append("")
-            for issue in critical:
-                loc = f"`{issue.file}`"
-                if issue.line:
-                    loc += f" (line {issue.line})"
-                lines.append(f"**{issue.title}** — {loc}")
-                lines.append(f"> {issue.description}")
-                lines.append("")
-                lines.append(f"**Energy impact:** {issue.energy_impact}")
-                lines.append("")
-                lines.append(f"**Fix:** {issue.fix}")
-                lines.append("")
+    lines.append(
+        f"Scanned **{files_scanned}** Python file(s). "
+        f"Found {', '.join(issue_summary)}."
+    )
+    lines.append("")
+    return lines
+
+
+def _footer_lines() -> list[str]:
+    return [
+        "---",
+        "",
+        "📊 Based on **93+ measurements** across RTX 4090D / A800 / RTX 5090 "
+        "· [Full data](https://github.com/hongping-zh/ecocompute-dynamic-eval) "
+        "· [Install Bot](https://github.com/apps/ecocompute-energy-auditor) "
+        "· [OpenClaw Skill](https://clawhub.ai/hongping-zh/ecocompute)",
+    ]
+
+
+SECTION_HEADINGS = {
+    Severity.CRITICAL: "### 🔴 Critical Issues",
+    Severity.WARNING: "### 🟡 Warnings",
+    Severity.INFO: "### 🟠 Info",
+}
 
-        # Warnings
-        if warnings:
-            lines.append("### 🟡 Warnings")
+
+def generate_report(
+    issues: list[Issue],
+    files_scanned: int,
+    hw: Optional["HardwareInfo"] = None,
+    cal: Optional["CalibrationResult"] = None,
+    change: Optional["RelativeChange"] = None,
+    baseline: Optional["Baseline"] = None,
+    workload: Optional["WorkloadResult"] = None,
+) -> str:
+    """Generate markdown audit report with hardware info and relative changes."""
+    lines = []
+    lines.append("## ⚡ EcoCompute Energy Audit")
+    lines.append("")
+
+    # Hardware section
+    if hw:
+        from hardware import format_hardware_section
+        lines.append(format_hardware_section(hw))
+
+    lines.extend(_summary_lines(issues, files_scanned))
+
+    for severity in (Severity.CRITICAL, Severity.WARNING, Severity.INFO):
+        section = [i for i in issues if i.severity == severity]
+        if not section:
+            continue
+        lines.append(SECTION_HEADINGS[severity])
+        lines.append("")
+        for issue in section:
+            lines.append(f"**{issue.title}** — {issue.location()}")
+            lines.append(f"> {issue.description}")
             lines.append("")
-            for issue in warnings:
-                loc = f"`{issue.file}`"
-                if issue.line:
-                    loc += f" (line {issue.line})"
-                lines.append(f"**{issue.title}** — {loc}")
-                lines.append(f"> {issue.description}")
-                lines.append("")
+            if severity != Severity.INFO:
                 lines.append(f"**Energy impact:** {issue.energy_impact}")
                 lines.append("")
                 lines.append(f"**Fix:** {issue.fix}")
                 lines.append("")
 
-        # Info
-        if infos:
-            lines.append("### 🟠 Info")
-            lines.append("")
-            for issue in infos:
-                loc = f"`{issue.file}`"
-                if issue.line:
-                    loc += f" (line {issue.line})"
-                lines.append(f"**{issue.title}** — {loc}")
-                lines.append(f"> {issue.description}")
-                lines.append("")
+    if workload:
+        from workload import format_workload
+        lines.append(format_workload(workload))
 
     # Relative change section
     if change:
+        from calibrate import format_relative_change
         lines.append(format_relative_change(change, baseline))
 
-    # Footer
-    lines.append("---")
-    lines.append("")
-    lines.append(
-        "📊 Based on **93+ measurements** across RTX 4090D / A800 / RTX 5090 "
-        "· [Full data](https://github.com/hongping-zh/ecocompute-dynamic-eval) "
-        "· [Install Bot](https://github.com/apps/ecocompute-energy-auditor) "
-        "· [OpenClaw Skill](https://clawhub.ai/hongping-zh/ecocompute)"
-    )
+    lines.extend(_footer_lines())
+    return '\n'.join(lines)
+
+
+# ---------------------------------------------------------------------------
+# PR comment rendering (size-bounded)
+# ---------------------------------------------------------------------------
+
+COMMENT_MAX_CHARS = 65536          # GitHub issue/PR comment body limit
+COMMENT_BUDGET_BYTES = 60000       # UTF-8 bytes ≥ chars; leaves room for the marker
+MAX_GROUP_LOCATIONS = 15
+TRUNCATION_RESERVE = 400           # room kept for the "… omitted" summary line
+
+
+@dataclass
+class IssueGroup:
+    """The same rule hit in several places, rendered once."""
+    severity: Severity
+    title: str
+    issues: list
 
+
+def group_issues(issues: list[Issue]) -> list[IssueGroup]:
+    """Group identical findings (same rule, title and severity) across files,
+    most severe first, then most widespread.
+    """
+    groups: dict[tuple, IssueGroup] = {}
+    for issue in issues:
+        key = (issue.severity, issue.rule, issue.title)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = IssueGroup(issue.severity, issue.title, [])
+        group.issues.append(issue)
+    return sorted(groups.values(), key=lambda g: (-g.severity, -len(g.issues), g.title))
+
+
+class ReportBuffer:
+    """Markdown accumulator with a hard size budget in UTF-8 bytes."""
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.parts: list[str] = []
+        self.size = 0
+
+    def write(self, text: str, reserve: int = 0) -> bool:
+        """Append `text` unless it would leave less than `reserve` bytes."""
+        size = len(text.encode('utf-8')) + 1   # + joining newline
+        if self.size + size + reserve > self.budget:
+            return False
+        self.parts.append(text)
+        self.size += size
+        return True
+
+    def getvalue(self) -> str:
+        return '\n'.join(self.parts)
+
+
+def _render_group(group: IssueGroup) -> str:
+    first = group.issues[0]
+    locations = [i.location() for i in group.issues[:MAX_GROUP_LOCATIONS]]
+    more = len(group.issues) - len(locations)
+    if more > 0:
+        locations.append(f"and {more} more")
+
+    lines = []
+    if len(group.issues) == 1:
+        lines.append(f"**{group.title}** — {first.location()}")
+    else:
+        lines.append(f"**{group.title}** — {len(group.issues)} locations: {', '.join(locations)}")
+    lines.append(f"> {first.description}")
+    lines.append("")
+    if group.severity != Severity.INFO:
+        lines.append(f"**Energy impact:** {first.energy_impact}")
+        lines.append("")
+        lines.append(f"**Fix:** {first.fix}")
+        lines.append("")
     return '\n'.join(lines)
 
 
+def generate_comment(
+    issues: list[Issue],
+    files_scanned: int,
+    hw: Optional["HardwareInfo"] = None,
+    change: Optional["RelativeChange"] = None,
+    baseline: Optional["Baseline"] = None,
+    budget: int = COMMENT_BUDGET_BYTES,
+    workload: Optional["WorkloadResult"] = None,
+) -> str:
+    """PR comment version of the report: identical findings are grouped,
+    sections go most severe first, and output stops at `budget` bytes with a
+    summary of what was left out (the artifact report keeps everything).
+    """
+    tail = []
+    if workload:
+        from workload import format_workload
+        tail.append(("Workload benchmark", format_workload(workload)))
+    if change:
+        from calibrate import format_relative_change
+        tail.append(("Relative change", format_relative_change(change, baseline)))
+    footer = '\n'.join(_footer_lines())
+    footer_size = len(footer.encode('utf-8')) + 1
+
+    # The tail is written last but reserved first, up to half the budget;
+    # a section beyond that is replaced by a pointer to the artifact
+    tail_sections = []
+    reserve = footer_size + TRUNCATION_RESERVE
+    for name, text in tail:
+        if reserve + len(text.encode('utf-8')) + 1 > budget // 2:
+            text = f"> ✂️ **{name} section not shown** — see `ecocompute-audit-report.md`.\n"
+        tail_sections.append(text)
+        reserve += len(text.encode('utf-8')) + 1
+
+    buf = ReportBuffer(budget)
+    buf.write("## ⚡ EcoCompute Energy Audit\n")
+    if hw:
+        from hardware import format_hardware_section
+        buf.write(format_hardware_section(hw), reserve)
+    buf.write('\n'.join(_summary_lines(issues, files_scanned)), reserve)
+
+    groups = group_issues(issues)
+    current = None
+    for n, group in enumerate(groups):
+        block = _render_group(group)
+        if group.severity != current:
+            block = f"{SECTION_HEADINGS[group.severity]}\n\n{block}"
+        if not buf.write(block, reserve):
+            omitted = groups[n:]
+            count = sum(len(g.issues) for g in omitted)
+            worst = SEVERITY_LABELS[omitted[0].severity]
+            buf.write(
+                f"> ✂️ **{count} more finding(s) in {len(omitted)} group(s) not shown** "
+                f"(most severe: {worst}) to stay within GitHub's comment size limit. "
+                "See the full report in `ecocompute-audit-report.md`.\n"
+            )
+            break
+        current = group.severity
+
+    for text in tail_sections:
+        buf.write(text, footer_size)
+    buf.write(footer)
+    return buf.getvalue()
+
+
 # ---------------------------------------------------------------------------
 # GitHub Actions integration
 # ---------------------------------------------------------------------------
 
 def post_pr_comment(report: str):
     """Post the audit report as a PR comment using gh CLI."""
+    import json
+    import subprocess
+
     event_path = os.environ.get("GITHUB_EVENT_PATH")
-    if not event_path or not Path(event_path).exists():
+    if not event_path or not os.path.exists(event_path):
         print("No GITHUB_EVENT_PATH — skipping PR comment.")
         return
 
@@ -646,7 +1910,70 @@ def set_output(name: str, value: str):
 # Main
 # ---------------------------------------------------------------------------
 
-def main():
+def parse_args(argv: Optional[list[str]] = None):
+    """Parse CLI flags. Defaults come from the Action's environment inputs."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="EcoCompute Energy Audit — scan Python code for LLM energy waste.",
+    )
+    parser.add_argument(
+        "paths", nargs="*",
+        help="Files to scan (default: PR diff, falling back to a full scan)",
+    )
+    parser.add_argument(
+        "--static-only", action="store_true",
+        default=os.environ.get("STATIC_ONLY", "false").lower() == "true",
+        help="Static analysis only: no GPU probing, calibration or baseline I/O",
+    )
+    parser.add_argument(
+        "--pre-commit", action="store_true",
+        help="Audit the staged (index) version of files; exit 1 on critical findings",
+    )
+    parser.add_argument(
+        "--shard", metavar="INDEX/COUNT", default=os.environ.get("SHARD") or None,
+        help="Audit only this shard of the file set (e.g. 2/4) and write a partial "
+             "result for --merge instead of a report",
+    )
+    parser.add_argument(
+        "--merge", metavar="PATH", action="append",
+        default=os.environ.get("MERGE_SHARDS", "").split() or None,
+        help="Report on partial shard results (files or directories) instead of scanning",
+    )
+    return parser.parse_args(argv)
+
+
+def discover_files(paths: list[str], limit: Optional[int] = 50) -> tuple[list[str], str]:
+    """Resolve the file set to scan and describe how it was chosen."""
+    if paths:
+        return [p for p in paths if os.path.isfile(p)], "explicit paths"
+
+    py_files = get_changed_python_files()
+    if py_files:
+        return py_files, "PR diff"
+    return get_all_python_files(limit), "full scan"
+
+
+def load_merged_shards(paths: list[str]) -> ShardResult:
+    """Load and merge partial results, exiting with a message if incomplete."""
+    try:
+        merged = merge_shard_results(load_shard_results(paths))
+    except (OSError, ValueError) as e:
+        print(f"\n❌ Cannot merge shard results: {e}")
+        sys.exit(1)
+    print(f"  Merged {merged.count} shard(s): {len(merged.files)} file(s), "
+          f"{len(merged.issues)} finding(s); slowest shard {merged.elapsed_s:.1f}s")
+    return merged
+
+
+def main(argv: Optional[list[str]] = None):
+    args = parse_args(argv)
+
+    if args.pre_commit:
+        return run_pre_commit(args.paths, SEVERITY_THRESHOLD_MAP.get(
+            os.environ.get("SEVERITY_THRESHOLD", "warning").lower(), Severity.WARNING,
+        ))
+
     print("=" * 60)
     print("⚡ EcoCompute Energy Audit v2.0")
     print("   Based on 93+ measurements · 3 GPU architectures")
@@ -658,6 +1985,19 @@ def main():
         Severity.WARNING,
     )
     post_comment = os.environ.get("POST_COMMENT", "true").lower() == "true"
+
+    if args.shard:
+        return run_shard(args.paths, args.shard, args.static_only)
+    if args.static_only:
+        return run_static_only(args.paths, severity_threshold, post_comment, args.merge)
+
+    from hardware import detect_gpu
+    from calibrate import (
+        Baseline, CalibrationResult,
+        calibrate, compute_relative_change,
+        load_baseline, save_baseline,
+    )
+
     do_calibrate = os.environ.get("CALIBRATE", "false").lower() == "true"
     energy_threshold = float(os.environ.get("ENERGY_THRESHOLD", "5"))
     baseline_path = os.environ.get("BASELINE_PATH", ".ecocompute/baseline.json")
@@ -675,72 +2015,102 @@ def main():
         print(f"  Driver: {hw.driver_version}, CUDA: {hw.cuda_version}")
         print(f"  Hardware hash: {hw.hardware_hash}")
     else:
-        print("  No GPU detected — static analysis + estimation mode.")
+        print(f"  No GPU detected — CPU: {hw.cpu_name} ({hw.cpu_count} cores)")
+        print(f"  Hardware hash: {hw.hardware_hash}")
 
     # ── Phase 2: Calibration (optional) ──
     cal = CalibrationResult(method="skipped")
-    if do_calibrate and hw.gpu_count > 0:
+    if do_calibrate:
         print("\n[2/4] Running calibration benchmark...")
         cal = calibrate(hw)
         print(f"  Method: {cal.method}")
         if cal.benchmark_score > 0:
-            print(f"  Score: {cal.benchmark_score:.1f} TFLOPS")
+            print(f"  Score: {cal.benchmark_score:.2f} TFLOPS")
+        for dtype, gflops in cal.gflops_by_dtype.items():
+            print(f"    {dtype}: {gflops:.1f} GFLOPS")
         if cal.power_draw_w > 0:
-            print(f"  Power: {cal.power_draw_w:.0f}W")
+            print(f"  Power: {cal.power_draw_w:.0f}W ({cal.power_domains or 'gpu'})")
+            ps = cal.power_summary
+            if ps.get("samples"):
+                print(f"    p5/p50/p95: {ps['p05_w']:.0f}/{ps['p50_w']:.0f}/{ps['p95_w']:.0f}W, "
+                      f"range {ps['min_w']:.0f}–{ps['max_w']:.0f}W, "
+                      f"{ps['samples']} samples, {ps['energy_j']:.0f} J")
         if cal.energy_per_tflop > 0:
             print(f"  Energy/TFLOP: {cal.energy_per_tflop:.1f} J")
+        if cal.adaptive:
+            state = (f"steady after {cal.warmup_s:.1f}s" if cal.steady_state
+                     else f"no plateau within {cal.warmup_s:.1f}s")
+            print(f"  Precision: ±{cal.ci_pct:.1f}% {cal.ci_metric} (95% CI, target "
+                  f"±{cal.ci_target_pct:g}%; {cal.blocks} blocks, {state}, "
+                  f"stopped on {cal.stop_reason})")
     else:
         print("\n[2/4] Calibration skipped.")
 
-    # ── Phase 3: Static Code Analysis ──
-    print("\n[3/4] Scanning code...")
-    py_files = get_changed_python_files()
-    scan_mode = "PR diff"
-
-    if not py_files:
-        py_files = get_all_python_files()
-        scan_mode = "full scan"
-
-    if not py_files:
-        print("  No Python files found to scan.")
-        py_files = []
-
-    print(f"  Scan mode: {scan_mode}")
-    print(f"  Files: {len(py_files)}")
-
-    all_issues: list[Issue] = []
+    workload = None
+    if os.environ.get("WORKLOAD_COMMAND") or os.environ.get("WORKLOAD_CALLABLE"):
+        from workload import WorkloadError, workload_from_env
 
-    for filepath in py_files:
-        print(f"  Scanning: {filepath}")
+        print("  Running workload benchmark...")
         try:
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-        except OSError as e:
-            print(f"    Error reading {filepath}: {e}")
-            continue
-
-        keywords = [
-            'BitsAndBytesConfig', 'load_in_8bit', 'load_in_4bit',
-            'quantization_config', 'from_pretrained', '.generate(',
-            'bnb_4bit', 'llm_int8',
-        ]
-        if not any(kw in content for kw in keywords):
-            print(f"    Skipped (no quantization keywords)")
-            continue
+            workload = workload_from_env()
+        except WorkloadError as e:
+            print(f"\n❌ Workload benchmark failed: {e}")
+            sys.exit(1)
+        print(f"  Workload: {workload.name} — {workload.runs} runs, "
+              f"{workload.j_per_run:.1f} ± {workload.j_per_run_std:.1f} J/run, "
+              f"{workload.throughput:.2f} units/s")
 
-        for rule in ALL_RULES:
-            issues = rule(content, filepath)
-            all_issues.extend(issues)
-
-    # Filter by severity threshold
-    filtered = [i for i in all_issues if i.severity >= severity_threshold]
-    filtered.sort(key=lambda i: (-i.severity, i.file))
+    # ── Phase 3: Static Code Analysis ──
+    diff = None
+    if args.merge:
+        print("\n[3/4] Merging shard results...")
+        merged = load_merged_shards(args.merge)
+        py_files, scan_mode = merged.files, merged.scan_mode
+        print(f"  Scan mode: {scan_mode}, {merged.count} shard(s)")
+        if merged.hardware_hash and merged.hardware_hash != hw.hardware_hash:
+            print("  Note: hardware-aware rules ran on the shard runners, not this one.")
+        head_issues = merged.issues
+        diff = merged.diff_result()
+    else:
+        print("\n[3/4] Scanning code...")
+        py_files, scan_mode = discover_files(args.paths)
+
+        if not py_files:
+            print("  No Python files found to scan.")
+
+        print(f"  Scan mode: {scan_mode}")
+        print(f"  Files: {len(py_files)}")
+
+        ctx = build_scan_context(hw)
+        if os.environ.get("DIFFERENTIAL", "false").lower() == "true":
+            diff = differential_audit(py_files, ctx)
+            if diff is None:
+                print("  No merge base found — falling back to a full audit.")
+        if diff is None:
+            head_issues = scan_files(py_files, ctx)
+    if diff is not None:
+        all_issues = filter_issues(diff.new + diff.existing, severity_threshold)
+        filtered = filter_issues(diff.new, severity_threshold)
+        resolved = filter_issues(diff.resolved, severity_threshold)
+        print(f"  Merge base: {diff.base[:7]} — {len(filtered)} new, "
+              f"{len(all_issues) - len(filtered)} pre-existing, {len(resolved)} resolved")
+    else:
+        all_issues = filtered = filter_issues(head_issues, severity_threshold)
 
     critical_count = len([i for i in filtered if i.severity == Severity.CRITICAL])
     warning_count = len([i for i in filtered if i.severity == Severity.WARNING])
 
     # ── Phase 4: Relative Change Analysis ──
     print("\n[4/4] Comparing against baseline...")
+    diff_args = {}
+    if diff is not None:
+        # Gate on findings this change introduced, not on pre-existing ones
+        diff_args = dict(
+            new_issues=len(filtered),
+            new_critical=critical_count,
+            resolved_issues=len(resolved),
+            diff_base=diff.base,
+        )
     change = compute_relative_change(
         current_issues=len(filtered),
         current_critical=critical_count,
@@ -748,6 +2118,8 @@ def main():
         hw=hw,
         cal=cal,
         threshold_pct=energy_threshold,
+        workload=workload,
+        **diff_args,
     )
     baseline = load_baseline(hw.hardware_hash)
 
@@ -766,23 +2138,32 @@ def main():
         benchmark_score=cal.benchmark_score,
         power_draw_w=cal.power_draw_w,
         energy_per_tflop=cal.energy_per_tflop,
-        issues_found=len(filtered),
-        critical_count=critical_count,
-        warning_count=warning_count,
+        power_domains=cal.power_domains,
+        power_summary=cal.power_summary,
+        issues_found=len(all_issues),
+        critical_count=sum(1 for i in all_issues if i.severity == Severity.CRITICAL),
+        warning_count=sum(1 for i in all_issues if i.severity == Severity.WARNING),
         commit_sha=os.environ.get("GITHUB_SHA", "")[:12],
         branch=os.environ.get("GITHUB_REF_NAME", ""),
     )
+    if workload is not None and workload.measured_energy:
+        current_baseline.workload_name = workload.name
+        current_baseline.workload_j_per_run = workload.j_per_run
+        current_baseline.workload_j_std = workload.j_per_run_std
+        current_baseline.workload_runs = workload.runs
+        current_baseline.workload_throughput = workload.throughput
+        current_baseline.workload_domains = workload.power_domains
     save_baseline(current_baseline)
 
     # ── Generate Report ──
     report = generate_report(
         filtered, len(py_files),
-        hw=hw, cal=cal, change=change, baseline=baseline,
+        hw=hw, cal=cal, change=change, baseline=baseline, workload=workload,
     )
 
     # Output
     print(f"\n{'=' * 60}")
-    print(f"Results: {len(filtered)} issue(s) found")
+    print(f"Results: {len(filtered)} {'new ' if diff else ''}issue(s) found")
     print(f"  Critical: {critical_count}")
     print(f"  Warning:  {warning_count}")
     print(f"  Info:     {len(filtered) - critical_count - warning_count}")
@@ -797,19 +2178,14 @@ def main():
     set_output("passed", str(change.passed).lower())
     set_output("hardware_hash", hw.hardware_hash)
 
-    # Save report to file
-    report_file = os.environ.get("GITHUB_WORKSPACE", ".") + "/ecocompute-audit-report.md"
-    try:
-        with open(report_file, 'w') as f:
-            f.write(report)
-        set_output("report_file", report_file)
-        print(f"Report saved to: {report_file}")
-    except OSError:
-        pass
+    write_report_file(report)
 
-    # Post PR comment
+    # Post PR comment (grouped and size-bounded; the file above has everything)
     if post_comment and os.environ.get("GITHUB_EVENT_PATH"):
-        post_pr_comment(report)
+        post_pr_comment(generate_comment(
+            filtered, len(py_files), hw=hw, change=change, baseline=baseline,
+            workload=workload,
+        ))
 
     # Exit with failure if critical issues or regression threshold exceeded
     if not change.passed:
@@ -820,5 +2196,199 @@ def main():
         sys.exit(1)
 
 
+def run_static_only(paths: list[str], severity_threshold: Severity, post_comment: bool,
+                    merge: Optional[list[str]] = None):
+    """Fast path: rules only. Never imports hardware/calibrate, never shells out
+    to nvidia-smi, never reads or writes the baseline.
+    """
+    print("\nStatic-only mode: hardware detection, calibration and baseline skipped.")
+    diff = None
+    if merge:
+        merged = load_merged_shards(merge)
+        py_files, issues = merged.files, merged.issues
+        diff = merged.diff_result()      # differential shards: gate on new findings
+    else:
+        py_files, scan_mode = discover_files(paths)
+        print(f"  Scan mode: {scan_mode}")
+        print(f"  Files: {len(py_files)}")
+        issues = scan_files(py_files, build_scan_context(files=py_files))
+
+    if diff is not None:
+        filtered = filter_issues(diff.new, severity_threshold)
+        print(f"  Merge base: {diff.base[:7]} — {len(filtered)} new, "
+              f"{len(filter_issues(diff.existing, severity_threshold))} pre-existing, "
+              f"{len(filter_issues(diff.resolved, severity_threshold))} resolved")
+    else:
+        filtered = filter_issues(issues, severity_threshold)
+    critical_count = len([i for i in filtered if i.severity == Severity.CRITICAL])
+    warning_count = len([i for i in filtered if i.severity == Severity.WARNING])
+    passed = critical_count == 0
+
+    report = generate_report(filtered, len(py_files))
+
+    print(f"\n{'=' * 60}")
+    print(f"Results: {len(filtered)} {'new ' if diff else ''}issue(s) found")
+    print(f"  Critical: {critical_count}")
+    print(f"  Warning:  {warning_count}")
+    print(f"  Info:     {len(filtered) - critical_count - warning_count}")
+    print(f"{'=' * 60}\n")
+    print(report)
+
+    set_output("issues_found", str(len(filtered)))
+    set_output("critical_count", str(critical_count))
+    set_output("warning_count", str(warning_count))
+    set_output("passed", str(passed).lower())
+
+    # Only leave an artifact behind in CI; local lint runs stay side-effect free
+    if os.environ.get("GITHUB_WORKSPACE"):
+        write_report_file(report)
+
+    if post_comment and os.environ.get("GITHUB_EVENT_PATH"):
+        post_pr_comment(generate_comment(filtered, len(py_files)))
+
+    if not passed:
+        print(f"\n❌ {critical_count} critical issue(s) found. See report above.")
+        sys.exit(1)
+
+
+def run_shard(paths: list[str], spec: str, static_only: bool):
+    """CI matrix job: audit this shard's share of the file set and write a
+    partial result for `--merge`. No calibration, baseline, report or gate;
+    the merge job does those once for all shards.
+
+    Full scans are not capped at 50 files here: spreading a large tree over
+    the matrix is the point. Every shard builds the whole project index, so
+    cross-file rules see the same project whichever shard a file lands in.
+    """
+    try:
+        index, count = parse_shard(spec)
+    except ValueError as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+    start = time.perf_counter()
+
+    hw = None
+    if not static_only:
+        from hardware import detect_gpu
+        hw = detect_gpu()
+
+    py_files, scan_mode = discover_files(paths, limit=None)
+    files = shard_files(py_files, index, count)
+    print(f"\nShard {index}/{count}: {len(files)} of {len(py_files)} file(s) ({scan_mode})")
+
+    ctx = build_scan_context(hw)
+    result = ShardResult(index=index, count=count, scan_mode=scan_mode, files=files,
+                         hardware_hash=hw.hardware_hash if hw else "")
+    diff = None
+    if not static_only and os.environ.get("DIFFERENTIAL", "false").lower() == "true":
+        diff = differential_audit(files, ctx)
+        if diff is None:
+            print("  No merge base found — falling back to a full audit.")
+    if diff is not None:
+        result.diff_base = diff.base
+        result.issues = diff.new + diff.existing
+        result.new_count = len(diff.new)
+        result.resolved = diff.resolved
+    else:
+        result.issues = scan_files(files, ctx)
+    result.elapsed_s = time.perf_counter() - start
+
+    out = os.environ.get("SHARD_OUTPUT") or os.path.join(
+        os.environ.get("GITHUB_WORKSPACE", "."), f"ecocompute-shard-{index}-of-{count}.json",
+    )
+    write_shard_result(result, out)
+    set_output("shard_file", out)
+    print(f"  {len(result.issues)} finding(s) in {result.elapsed_s:.1f}s → {out}")
+
+
+def index_staged(git, files: list[str], blobs: dict[str, Optional[bytes]],
+                 tracked: list[str]):
+    """Project index of the staged versions: the staged Python files, plus
+    the modules they import, read from the git index as needed."""
+    from project_index import index_sources
+
+    def read(paths: list[str]) -> dict[str, str]:
+        found = git.read_many(f":{p}" for p in paths)
+        return {p: found[f":{p}"].decode("utf-8", errors="ignore")
+                for p in paths if found.get(f":{p}") is not None}
+
+    sources = {p: blobs[f":{p}"].decode("utf-8", errors="ignore")
+               for p in files if p.endswith(".py") and blobs.get(f":{p}") is not None}
+    return index_sources(sources, tracked, read)
+
+
+def run_pre_commit(paths: list[str], severity_threshold: Severity):
+    """Git pre-commit hook: audit what is about to be committed.
+
+    Staged blobs are read with one `git cat-file --batch`, so unstaged edits
+    in the working tree are ignored. Like static-only mode, nothing touches
+    hardware, calibration or the baseline; output is one line per finding.
+    """
+    from gitobjects import CatFileBatch, GitError, staged_files, tracked_files
+
+    start = time.perf_counter()
+    try:
+        if paths:
+            files = [p for p in paths if p.endswith(SOURCE_SUFFIXES)]
+        else:
+            files = [p for p in staged_files() if p.endswith(SOURCE_SUFFIXES)]
+        if not files:
+            return
+        with CatFileBatch() as git:
+            blobs = git.read_many(f":{p}" for p in files)
+            # Imported modules are read from the git index only once a staged
+            # file turns out to import one
+            ctx = build_scan_context(
+                index_loader=lambda: index_staged(git, files, blobs, tracked_files()),
+            )
+            issues: list[Issue] = []
+            for path in files:
+                data = blobs.get(f":{path}")
+                if data is None:
+                    continue          # not in the index (e.g. an untracked file was passed)
+                try:
+                    content, line_map = source_from_bytes(data, path)
+                except ValueError as e:
+                    print(f"ecocompute: {path}: {e}")
+                    continue
+                issues.extend(audit_source(content, line_map, path, ctx))
+    except GitError as e:
+        print(f"ecocompute: {e}")
+        sys.exit(1)
+
+    filtered = filter_issues(issues, severity_threshold)
+
+    for issue in filtered:
+        where = f"{issue.file}:{issue.line or 1}"
+        if issue.cell is not None:
+            where = f"{issue.file} (cell {issue.cell}, line {issue.line or 1})"
+        label = SEVERITY_LABELS[issue.severity]
+        impact = f" [{issue.energy_impact}]" if issue.energy_impact else ""
+        print(f"{where}: {label}: {issue.title}{impact}")
+        fix = issue.fix.strip().split('\n')[0] if issue.fix else ""
+        if fix:
+            print(f"    Fix: {fix}")
+
+    critical_count = len([i for i in filtered if i.severity == Severity.CRITICAL])
+    print(f"ecocompute: {len(files)} staged file(s), {len(filtered)} finding(s), "
+          f"{critical_count} critical ({(time.perf_counter() - start) * 1000:.0f} ms)")
+    if critical_count:
+        print("ecocompute: commit blocked by critical findings "
+              "(fix them, or bypass once with `git commit --no-verify`)")
+        sys.exit(1)
+
+
+def write_report_file(report: str):
+    """Save the report to the workspace and expose its path as an output."""
+    report_file = os.environ.get("GITHUB_WORKSPACE", ".") + "/ecocompute-audit-report.md"
+    try:
+        with open(report_file, 'w') as f:
+            f.write(report)
+        set_output("report_file", report_file)
+        print(f"Report saved to: {report_file}")
+    except OSError:
+        pass
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+EcoCompute — Static-only Startup Benchmark
+
+Times `audit.py --static-only` end to end (interpreter start included) on the
+bundled sample file and fails if the median exceeds the budget. Run it after
+touching imports in audit.py:
+
+    python action/bench_startup.py            # 100 ms budget, 15 runs
+    python action/bench_startup.py --budget-ms 80 --runs 30
+    python action/bench_startup.py --pre-commit   # staged-file hook path
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Optional
+
+ACTION_DIR = os.path.dirname(os.path.abspath(__file__))
+AUDIT_SCRIPT = os.path.join(ACTION_DIR, "audit.py")
+SAMPLE_FILE = os.path.join(ACTION_DIR, "test_sample.py")
+
+DEFAULT_BUDGET_MS = 100.0
+
+# Modules that must never be loaded on the static-only path
+FORBIDDEN_MODULES = ("hardware", "calibrate")
+
+
+def time_run(cmd: list[str], cwd: Optional[str] = None) -> float:
+    """Wall time in ms of one subprocess run."""
+    env = {k: v for k, v in os.environ.items()
+           if k not in ("GITHUB_OUTPUT", "GITHUB_EVENT_PATH", "GITHUB_WORKSPACE")}
+    start = time.perf_counter()
+    subprocess.run(cmd, env=env, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000
+
+
+def staged_sample_repo(target: str) -> str:
+    """Throwaway git repo with `target` staged, for timing --pre-commit."""
+    repo = tempfile.mkdtemp(prefix="ecocompute-bench-")
+    shutil.copy(target, os.path.join(repo, os.path.basename(target)))
+    subprocess.run(["git", "init", "-q"], cwd=repo, check=True)
+    subprocess.run(["git", "add", "."], cwd=repo, check=True)
+    return repo
+
+
+def check_lazy_imports(target: str, mode: str = "--static-only",
+                       cwd: Optional[str] = None) -> list[str]:
+    """Return any heavy sibling modules imported by the given fast path."""
+    probe = (
+        "import sys; sys.argv = ['audit.py', %r, %r]\n"
+        "sys.path.insert(0, %r)\n"
+        "import audit\n"
+        "try:\n"
+        "    audit.main()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print('LOADED:' + ','.join(m for m in %r if m in sys.modules))\n"
+    ) % (mode, target, ACTION_DIR, FORBIDDEN_MODULES)
+    result = subprocess.run(
+        [sys.executable, "-c", probe], cwd=cwd, capture_output=True, text=True,
+    )
+    for line in result.stdout.splitlines():
+        if line.startswith("LOADED:"):
+            return [m for m in line[len("LOADED:"):].split(',') if m]
+    return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--pre-commit", action="store_true",
+                        help="Time the pre-commit hook on a staged copy of the target")
+    parser.add_argument("target", nargs="?", default=SAMPLE_FILE)
+    args = parser.parse_args()
+
+    mode = "--pre-commit" if args.pre_commit else "--static-only"
+    target, cwd = os.path.abspath(args.target), None
+    if args.pre_commit:
+        cwd = staged_sample_repo(target)
+        target = os.path.basename(target)
+    audit_cmd = [sys.executable, AUDIT_SCRIPT, mode, target]
+    bare_cmd = [sys.executable, "-c", "pass"]
+
+    try:
+        time_run(audit_cmd, cwd)  # warm the filesystem and bytecode caches
+        samples = sorted(time_run(audit_cmd, cwd) for _ in range(args.runs))
+        bare = statistics.median(time_run(bare_cmd) for _ in range(args.runs))
+        leaked = check_lazy_imports(target, mode, cwd)
+    finally:
+        if cwd:
+            shutil.rmtree(cwd, ignore_errors=True)
+    median = statistics.median(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    print(f"{mode[2:]} startup: median {median:.1f} ms, p95 {p95:.1f} ms, "
+          f"min {samples[0]:.1f} ms (budget {args.budget_ms:.0f} ms, n={args.runs})")
+    print(f"  bare interpreter: {bare:.1f} ms → audit overhead {median - bare:.1f} ms")
+
+    if leaked:
+        print(f"❌ {mode[2:]} path imported: {', '.join(leaked)}")
+        sys.exit(1)
+
+    if median > args.budget_ms:
+        print(f"❌ Over budget by {median - args.budget_ms:.1f} ms")
+        sys.exit(1)
+    print("✅ Within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,18 +9,21 @@ Provides:
 4. Cross-architecture energy estimation
 
 No ML dependencies — uses raw CUDA matrix ops via PyTorch if available,
-falls back to nvidia-smi power sampling if not.
+NumPy/BLAS on GPU-less runners, and falls back to nvidia-smi power sampling.
 """
 
 import json
 import os
-import subprocess
 import time
 from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Callable, Optional
 
 from hardware import HardwareInfo
+from power import PowerSource, PowerTrace, default_power_source
+
+if TYPE_CHECKING:
+    from workload import WorkloadResult
 
 
 # ---------------------------------------------------------------------------
@@ -52,6 +55,27 @@ BS_ENERGY_SCALE = {
     64: 0.043,  # -95.7%
 }
 
+# Run-to-run spread behind the tables above, for bootstrap intervals
+# (stats.py). Reference cells: (std J/1k, runs), RTX 4090D metadata; cells
+# without a recorded std get no interval.
+REFERENCE_ENERGY_SPREAD = {
+    ("ada", "fp16"): (143, 10),
+    ("ada", "nf4"): (66, 10),
+    ("ada", "int8_default"): (115, 10),
+}
+
+# A800 Mistral-7B Pure INT8 batch sweep, per batch size: (mean J/1k, std, runs)
+# from metadata/batch_size_experiment/*_raw_*.csv
+BS_ENERGY_RUNS = {
+    1: (6907.4, 46.0, 10),
+    2: (3650.6, 16.3, 10),
+    4: (1932.9, 39.7, 10),
+    8: (1108.3, 5.8, 10),
+    16: (802.2, 14.6, 10),
+    32: (392.4, 1.8, 10),
+    64: (296.4, 2.8, 10),
+}
+
 
 @dataclass
 class Baseline:
@@ -62,11 +86,21 @@ class Baseline:
     benchmark_score: float = 0.0     # TFLOPS from matrix benchmark
     power_draw_w: float = 0.0        # Average power during benchmark
     energy_per_tflop: float = 0.0    # J per TFLOP (normalize metric)
+    power_domains: str = ""          # what the watts covered: "gpu", "cpu", "cpu+gpu"
     issues_found: int = 0
     critical_count: int = 0
     warning_count: int = 0
     commit_sha: str = ""
     branch: str = ""
+    # Workload benchmark (workload.py): the user's own code, not the matmul
+    workload_name: str = ""
+    workload_j_per_run: float = 0.0
+    workload_j_std: float = 0.0
+    workload_runs: int = 0
+    workload_throughput: float = 0.0   # units/s
+    workload_domains: str = ""
+    # PowerSummary of the calibration trace: percentiles, min/max, joules
+    power_summary: dict = field(default_factory=dict)
 
     def to_dict(self) -> dict:
         return asdict(self)
@@ -83,7 +117,21 @@ class CalibrationResult:
     power_draw_w: float = 0.0        # Average watts during benchmark
     energy_per_tflop: float = 0.0    # Joules per TFLOP
     duration_s: float = 0.0
-    method: str = "none"             # "pytorch", "nvidia-smi", "estimated"
+    method: str = "none"             # "pytorch", "numpy", "nvidia-smi", "estimated"
+    backend: str = ""                # compute backend that produced the score
+    gflops_by_dtype: dict = field(default_factory=dict)
+    threads: int = 0                 # CPU threads used (numpy backend)
+    power_domains: str = ""          # PowerSource.domain the watts came from
+    power_summary: dict = field(default_factory=dict)   # PowerTrace.summary()
+    # Adaptive calibration (AdaptivePolicy): how trustworthy the number is
+    adaptive: bool = False
+    steady_state: bool = False       # plateau reached (False: warmup cap hit first)
+    warmup_s: float = 0.0            # time spent waiting for the plateau
+    blocks: int = 0                  # measured observations after warmup
+    ci_pct: float = 0.0              # 95% CI half-width of the mean, % of the mean
+    ci_target_pct: float = 0.0
+    ci_metric: str = ""              # "J/TFLOP", "TFLOPS" or "W"
+    stop_reason: str = ""            # "precision" or "budget"
 
 
 @dataclass
@@ -97,6 +145,13 @@ class RelativeChange:
     benchmark_change_pct: float = 0.0
     passed: bool = True
     reason: str = ""
+    differential: bool = False       # issue deltas come from a base-vs-head audit
+    diff_base: str = ""              # merge-base commit the head was compared to
+    new_issues: int = 0
+    resolved_issues: int = 0
+    workload_change_pct: float = 0.0      # J/run vs baseline; + = worse
+    throughput_change_pct: float = 0.0    # + = faster
+    workload_significant: bool = False    # difference exceeds run-to-run noise
 
 
 # ---------------------------------------------------------------------------
@@ -168,119 +223,594 @@ def save_baseline(baseline: Baseline):
 
 
 # ---------------------------------------------------------------------------
-# GPU Benchmark
+# Compute backends
 # ---------------------------------------------------------------------------
 
-def run_pytorch_benchmark(duration_s: float = 5.0) -> CalibrationResult:
-    """Run a lightweight matrix multiplication benchmark using PyTorch.
-    Returns TFLOPS and average power draw.
+class ComputeBackend:
+    """A matrix-multiply benchmark on one kind of device.
+
+    Backends return a CalibrationResult with TFLOPS (`benchmark_score`) and,
+    when the power source yields readings, average watts and J/TFLOP.
     """
-    result = CalibrationResult(method="pytorch")
+    name = "none"
 
-    try:
-        import torch
+    def available(self, hw: HardwareInfo) -> bool:
+        return False
+
+    def run(self, duration_s: float, power_source: PowerSource) -> CalibrationResult:
+        raise NotImplementedError
+
+    def prepare(self) -> Optional[tuple[Callable[[], None], int, str]]:
+        """(op, FLOPs per op, dtype label) for adaptive measurement, with the
+        op warmed up; None if the backend cannot run here.
+        """
+        return None
+
+    def telemetry(self) -> Optional[dict[str, float]]:
+        """Extra steady-state signals (clock, temperature), if the device has them."""
+        return None
+
+    def run_adaptive(self, policy: "AdaptivePolicy", power_source: PowerSource) -> CalibrationResult:
+        """Measure until steady state, then until the CI target or budget."""
+        result = CalibrationResult(method=self.name, backend=self.name)
+        prepared = self.prepare()
+        if prepared is None:
+            return result
+        op, flops, dtype = prepared
+        measure_adaptive(op, flops, power_source, policy, result, self.telemetry)
+        if result.benchmark_score > 0:
+            result.gflops_by_dtype[dtype] = round(result.benchmark_score * 1000, 1)
+        return result
+
+
+class TorchCudaBackend(ComputeBackend):
+    """FP16 2048² matmul on cuda:0 via PyTorch."""
+    name = "pytorch"
+
+    def available(self, hw: HardwareInfo) -> bool:
+        return hw.gpu_count > 0
+
+    def run(self, duration_s: float, power_source: PowerSource) -> CalibrationResult:
+        result = CalibrationResult(method="pytorch", backend=self.name)
+
+        try:
+            import torch
+            if not torch.cuda.is_available():
+                print("  PyTorch available but no CUDA device.")
+                return result
+
+            device = torch.device("cuda:0")
+            # Warmup
+            a = torch.randn(2048, 2048, device=device, dtype=torch.float16)
+            b = torch.randn(2048, 2048, device=device, dtype=torch.float16)
+            for _ in range(5):
+                torch.mm(a, b)
+            torch.cuda.synchronize()
+
+            # Benchmark
+            total_flops = 0
+            trace = PowerTrace()
+            start = time.perf_counter()
+
+            while time.perf_counter() - start < duration_s:
+                torch.mm(a, b)
+                torch.cuda.synchronize()
+                # 2 * N^3 FLOPs for matrix multiply
+                total_flops += 2 * (2048 ** 3)
+                trace.sample(power_source)
+
+            end = time.perf_counter()
+            elapsed = end - start
+            result.benchmark_score = total_flops / elapsed / 1e12  # TFLOPS
+            result.duration_s = elapsed
+            result.gflops_by_dtype = {"float16": round(result.benchmark_score * 1000, 1)}
+            record_power(result, trace, power_source, start, end, total_flops / 1e12)
+
+            del a, b
+            torch.cuda.empty_cache()
+
+        except ImportError:
+            print("  PyTorch not available — skipping compute benchmark.")
+        except Exception as e:
+            print(f"  PyTorch benchmark error: {e}")
+
+        return result
+
+    def prepare(self) -> Optional[tuple[Callable[[], None], int, str]]:
+        try:
+            import torch
+        except ImportError:
+            print("  PyTorch not available — skipping compute benchmark.")
+            return None
         if not torch.cuda.is_available():
             print("  PyTorch available but no CUDA device.")
-            return result
+            return None
 
         device = torch.device("cuda:0")
-        # Warmup
         a = torch.randn(2048, 2048, device=device, dtype=torch.float16)
         b = torch.randn(2048, 2048, device=device, dtype=torch.float16)
-        for _ in range(5):
-            torch.mm(a, b)
-        torch.cuda.synchronize()
 
-        # Benchmark
-        total_flops = 0
-        power_samples = []
-        start = time.time()
-
-        while time.time() - start < duration_s:
+        def op():
             torch.mm(a, b)
             torch.cuda.synchronize()
-            # 2 * N^3 FLOPs for matrix multiply
-            total_flops += 2 * (2048 ** 3)
-
-            # Sample power via nvidia-smi
-            try:
-                r = subprocess.run(
-                    ["nvidia-smi", "--query-gpu=power.draw", "--format=csv,noheader,nounits"],
-                    capture_output=True, text=True, timeout=2,
-                )
-                if r.returncode == 0:
-                    power = float(r.stdout.strip().split('\n')[0])
-                    power_samples.append(power)
-            except (subprocess.CalledProcessError, FileNotFoundError,
-                    subprocess.TimeoutExpired, ValueError):
-                pass
 
-        elapsed = time.time() - start
-        result.benchmark_score = total_flops / elapsed / 1e12  # TFLOPS
-        result.duration_s = elapsed
+        for _ in range(5):
+            op()
+        return op, 2 * (2048 ** 3), "float16"
+
+    def telemetry(self) -> Optional[dict[str, float]]:
+        from hardware import read_gpu_telemetry
+        return read_gpu_telemetry(0)
+
+
+def cpu_thread_count() -> int:
+    """Cores this process may run on (respects cgroup/affinity limits)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+
+class NumpyBackend(ComputeBackend):
+    """BLAS matmul on the CPU for GPU-less runners.
+
+    float32/float64 go through the BLAS sgemm/dgemm NumPy links against;
+    int8 multiplies int8 matrices with int32 accumulation (NumPy's integer
+    matmul does not use BLAS, hence the smaller matrix). The float32 rate is
+    the headline `benchmark_score`; every dtype is reported in
+    `gflops_by_dtype` (GOPS for int8).
+    """
+    name = "numpy"
+
+    # dtype → (matrix size, share of the time budget)
+    DTYPES = {
+        "float32": (1024, 0.5),
+        "float64": (1024, 0.3),
+        "int8": (256, 0.2),
+    }
+
+    def __init__(self, threads: Optional[int] = None):
+        self.threads = threads or cpu_thread_count()
+
+    def available(self, hw: HardwareInfo) -> bool:
+        # On GPU runners the GPU is what we calibrate; the CPU score would be
+        # paired with GPU power readings and mean nothing.
+        if hw.gpu_count > 0:
+            return False
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def _import_numpy(self):
+        # BLAS reads its thread count at load time, so set it before the
+        # first numpy import; afterwards only threadpoolctl can change it.
+        for var in ("OPENBLAS_NUM_THREADS", "OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+            os.environ.setdefault(var, str(self.threads))
+        import numpy as np
+        try:
+            from threadpoolctl import threadpool_limits
+            threadpool_limits(self.threads)
+        except ImportError:
+            pass
+        return np
+
+    @staticmethod
+    def warn_without_cpu_power(power_source: PowerSource) -> bool:
+        """Print a one-line notice when `power_source` reads no CPU domain.
+
+        RAPL's energy_uj is root-only on most kernels, so hosted runners get a
+        TFLOPS baseline but no J/TFLOP and no energy gate. Returns True if warned.
+        """
+        if "cpu" in power_source.domain.split("+"):
+            return False
+        print("  No readable CPU power domain (RAPL energy_uj is root-only) — "
+              "throughput baseline only, energy regression gate disabled.")
+        return True
+
+    def run(self, duration_s: float, power_source: PowerSource) -> CalibrationResult:
+        result = CalibrationResult(method="numpy", backend=self.name, threads=self.threads)
+        self.warn_without_cpu_power(power_source)
+        try:
+            np = self._import_numpy()
+        except ImportError:
+            print("  NumPy not available — skipping CPU benchmark.")
+            return result
+
+        trace = PowerTrace()
+        start = time.perf_counter()
+        window = (start, start, 0.0)    # float32 phase: (t0, t1, TFLOP)
+
+        for dtype, (n, share) in self.DTYPES.items():
+            op = self._matmul(np, dtype)
+            op()  # warmup
+
+            flops, t0 = 0, time.perf_counter()
+            trace.sample(power_source)
+            while time.perf_counter() - t0 < duration_s * share:
+                op()
+                flops += 2 * n ** 3
+                trace.sample(power_source)
+            t1 = time.perf_counter()
+            result.gflops_by_dtype[dtype] = round(flops / (t1 - t0) / 1e9, 1)
+            if dtype == "float32":
+                window = (t0, t1, flops / 1e12)
+
+        result.duration_s = time.perf_counter() - start
+        result.benchmark_score = result.gflops_by_dtype["float32"] / 1000  # TFLOPS
+        # J/TFLOP pairs the float32 score with the energy of the float32 phase
+        record_power(result, trace, power_source, *window)
+        return result
+
+    def _matmul(self, np, dtype: str) -> Callable[[], Any]:
+        n = self.DTYPES[dtype][0]
+        rng = np.random.default_rng(0)
+        if dtype == "int8":
+            a = rng.integers(-128, 128, size=(n, n), dtype=np.int8)
+            b = rng.integers(-128, 128, size=(n, n), dtype=np.int8)
+            return lambda: np.matmul(a, b, dtype=np.int32)
+        a = rng.standard_normal((n, n)).astype(dtype)
+        b = rng.standard_normal((n, n)).astype(dtype)
+        return lambda: a @ b
+
+    def prepare(self) -> Optional[tuple[Callable[[], None], int, str]]:
+        try:
+            np = self._import_numpy()
+        except ImportError:
+            print("  NumPy not available — skipping CPU benchmark.")
+            return None
+        op = self._matmul(np, "float32")
+        op()
+        return op, 2 * self.DTYPES["float32"][0] ** 3, "float32"
+
+    def run_adaptive(self, policy: "AdaptivePolicy", power_source: PowerSource) -> CalibrationResult:
+        """Adaptive float32 headline; float64/int8 rates from a short fixed run."""
+        self.warn_without_cpu_power(power_source)
+        result = super().run_adaptive(policy, power_source)
+        result.threads = self.threads
+        if result.benchmark_score > 0:
+            np = self._import_numpy()
+            for dtype in ("float64", "int8"):
+                op = self._matmul(np, dtype)
+                op()
+                n, ops, t0 = self.DTYPES[dtype][0], 0, time.perf_counter()
+                while time.perf_counter() - t0 < 0.5:
+                    op()
+                    ops += 1
+                rate = 2 * n ** 3 * ops / (time.perf_counter() - t0) / 1e9
+                result.gflops_by_dtype[dtype] = round(rate, 1)
+        return result
+
 
-        if power_samples:
-            result.power_draw_w = sum(power_samples) / len(power_samples)
-            if result.benchmark_score > 0:
-                result.energy_per_tflop = result.power_draw_w / result.benchmark_score
+# Tried in order by calibrate(); the first available backend that produces
+# a score wins. Extend with register_backend().
+COMPUTE_BACKENDS: list[ComputeBackend] = [TorchCudaBackend(), NumpyBackend()]
 
-        del a, b
-        torch.cuda.empty_cache()
 
-    except ImportError:
-        print("  PyTorch not available — skipping compute benchmark.")
-    except Exception as e:
-        print(f"  PyTorch benchmark error: {e}")
+def register_backend(backend: ComputeBackend, first: bool = False):
+    """Add a compute backend (e.g. ROCm, a vendor SDK) to the search order."""
+    if first:
+        COMPUTE_BACKENDS.insert(0, backend)
+    else:
+        COMPUTE_BACKENDS.append(backend)
+
+
+def get_backend(name: str) -> Optional[ComputeBackend]:
+    return next((b for b in COMPUTE_BACKENDS if b.name == name), None)
+
+
+# ---------------------------------------------------------------------------
+# Adaptive measurement
+# ---------------------------------------------------------------------------
+
+@dataclass
+class AdaptivePolicy:
+    """When adaptive calibration starts measuring and when it stops.
+
+    Work is split into blocks of `block_s`; each block yields one TFLOPS /
+    watts / J/TFLOP observation. Blocks are discarded until every signal
+    (power, TFLOPS, SM clock, temperature) stops drifting between two
+    consecutive windows of `plateau_blocks` (SteadyStateDetector), then
+    kept until the 95% confidence interval of the mean is within
+    ±`target_ci_pct`, or `budget_s` (warmup included) runs out. Warmup
+    gives up after `max_warmup_s` or half the budget.
+    """
+    target_ci_pct: float = 2.0
+    budget_s: float = 30.0
+    block_s: float = 0.5
+    min_blocks: int = 6
+    plateau_blocks: int = 3
+    plateau_tolerance_pct: float = 2.0    # allowed drift of power/TFLOPS/clock
+    plateau_temp_c: float = 1.0           # allowed drift of temperature
+    max_warmup_s: float = 15.0
+    power_interval_s: float = 0.1         # power reads inside a block
 
+    @classmethod
+    def from_env(cls) -> Optional["AdaptivePolicy"]:
+        """CALIBRATION_TARGET_CI (%, unset or 0 = fixed-duration benchmark)
+        and CALIBRATION_BUDGET_S. Adaptive runs take up to the budget, so
+        they are opt-in.
+        """
+        target = float(os.environ.get("CALIBRATION_TARGET_CI") or 0)
+        if target <= 0:
+            return None
+        budget = float(os.environ.get("CALIBRATION_BUDGET_S") or cls.budget_s)
+        return cls(target_ci_pct=target, budget_s=budget)
+
+    @property
+    def warmup_cap_s(self) -> float:
+        return min(self.max_warmup_s, self.budget_s / 2)
+
+
+# Two-sided 95% Student t quantiles by degrees of freedom
+_T95 = [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+        2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+        2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042]
+
+
+def ci_half_width_pct(values: list[float]) -> float:
+    """95% CI half-width of the mean as a % of the mean (inf if undefined)."""
+    n = len(values)
+    if n < 2:
+        return float("inf")
+    mean = sum(values) / n
+    if mean == 0:
+        return float("inf")
+    var = sum((v - mean) ** 2 for v in values) / (n - 1)
+    t = _T95[n - 2] if n - 1 <= len(_T95) else 1.96
+    return t * (var / n) ** 0.5 / abs(mean) * 100
+
+
+class SteadyStateDetector:
+    """Plateau test on every signal: the mean of its last `window` values
+    differs from the mean of the `window` before by at most `tolerance_pct`
+    (temperatures: `temp_tolerance_c`), or by no more than two standard
+    errors, so a flat but noisy signal also counts as steady.
+    """
+
+    def __init__(self, window: int = 3, tolerance_pct: float = 2.0, temp_tolerance_c: float = 1.0):
+        self.window = window
+        self.tolerance_pct = tolerance_pct
+        self.temp_tolerance_c = temp_tolerance_c
+        self.history: dict[str, list[float]] = {}
+        self.steady = False
+
+    def add(self, signals: dict[str, Optional[float]]) -> bool:
+        for name, value in signals.items():
+            if value is not None:
+                self.history.setdefault(name, []).append(value)
+        self.steady = bool(self.history) and all(
+            self._flat(name, values[-2 * self.window:])
+            for name, values in self.history.items()
+        )
+        return self.steady
+
+    def _flat(self, name: str, values: list[float]) -> bool:
+        k = self.window
+        if len(values) < 2 * k:
+            return False
+        before, last = values[:k], values[k:]
+        m0, m1 = sum(before) / k, sum(last) / k
+        drift = abs(m1 - m0)
+        if name.startswith("temp"):
+            return drift <= self.temp_tolerance_c
+        var = (sum((v - m0) ** 2 for v in before) + sum((v - m1) ** 2 for v in last)) / (k - 1)
+        noise = 2 * (var / k) ** 0.5
+        return drift <= max(self.tolerance_pct / 100 * abs(m0 + m1) / 2, noise)
+
+
+def measure_adaptive(
+    op: Callable[[], Any],
+    flops_per_op: int,
+    power_source: PowerSource,
+    policy: AdaptivePolicy,
+    result: CalibrationResult,
+    telemetry: Optional[Callable[[], Optional[dict]]] = None,
+) -> CalibrationResult:
+    """Fill `result` from blocks of `op` per `policy` (see AdaptivePolicy)."""
+    detector = SteadyStateDetector(policy.plateau_blocks, policy.plateau_tolerance_pct,
+                                   policy.plateau_temp_c)
+    start = time.perf_counter()
+    measuring = False
+    flops_total = seconds_total = 0.0
+    joules = powered_s = powered_tflop = 0.0    # blocks that had power readings
+    tflops_blocks: list[float] = []
+    watts_blocks: list[Optional[float]] = []
+    trace = PowerTrace()
+    result.adaptive = True
+    result.ci_target_pct = policy.target_ci_pct
+
+    while True:
+        t0 = now = time.perf_counter()
+        next_read = t0
+        flops, readings = 0, trace.count
+        while now - t0 < policy.block_s:
+            op()
+            flops += flops_per_op
+            now = time.perf_counter()
+            if now >= next_read:
+                trace.sample(power_source)
+                next_read = now + policy.power_interval_s
+        block_s = now - t0
+        tflops = flops / block_s / 1e12
+        # Block power = trapezoidal energy over the block / its duration
+        power = trace.mean_power_w(t0, now) if trace.count > readings else None
+        elapsed = now - start
+
+        if not measuring:
+            signals = {"tflops": tflops, "power_w": power}
+            signals.update((telemetry() if telemetry else None) or {})
+            if detector.add(signals) or elapsed >= policy.warmup_cap_s:
+                measuring = True
+                result.steady_state = detector.steady
+                result.warmup_s = elapsed
+                trace = PowerTrace()          # power_summary covers measured blocks only
+            continue                          # warmup blocks are discarded
+
+        flops_total += flops
+        seconds_total += block_s
+        tflops_blocks.append(tflops)
+        watts_blocks.append(power)
+        if power is not None:
+            joules += power * block_s
+            powered_s += block_s
+            powered_tflop += flops / 1e12
+        if all(w is not None for w in watts_blocks):
+            result.ci_metric = "J/TFLOP"
+            values = [w / t for w, t in zip(watts_blocks, tflops_blocks) if t > 0]
+        else:
+            result.ci_metric = "TFLOPS"
+            values = tflops_blocks
+        result.ci_pct = ci_half_width_pct(values)
+
+        if len(values) >= policy.min_blocks and result.ci_pct <= policy.target_ci_pct:
+            result.stop_reason = "precision"
+            break
+        if elapsed >= policy.budget_s and len(values) >= 2:
+            result.stop_reason = "budget"
+            break
+
+    result.blocks = len(tflops_blocks)
+    result.duration_s = time.perf_counter() - start
+    result.benchmark_score = flops_total / seconds_total / 1e12
+    if powered_s > 0:
+        result.power_draw_w = joules / powered_s
+        result.power_domains = power_source.domain
+        result.power_summary = trace.summary().to_dict()
+        result.energy_per_tflop = joules / powered_tflop
     return result
 
 
-def run_power_benchmark(duration_s: float = 3.0) -> CalibrationResult:
-    """Fallback: sample idle and load power via nvidia-smi only."""
-    result = CalibrationResult(method="nvidia-smi")
+def record_power(result: CalibrationResult, trace: PowerTrace, power_source: PowerSource,
+                 start: float, end: float, tflop: float = 0.0):
+    """Fill power fields from `trace` integrated over [start, end]:
+    time-weighted watts, and J/TFLOP as joules over the `tflop` executed.
+    """
+    if not trace.count:
+        return
+    result.power_draw_w = trace.mean_power_w(start, end)
+    result.power_domains = power_source.domain
+    result.power_summary = trace.summary().to_dict()
+    if tflop > 0:
+        result.energy_per_tflop = trace.energy_j(start, end) / tflop
 
-    try:
-        power_samples = []
-        start = time.time()
 
-        while time.time() - start < duration_s:
-            r = subprocess.run(
-                ["nvidia-smi", "--query-gpu=power.draw", "--format=csv,noheader,nounits"],
-                capture_output=True, text=True, timeout=2,
-            )
-            if r.returncode == 0:
-                power = float(r.stdout.strip().split('\n')[0])
-                power_samples.append(power)
-            time.sleep(0.2)  # ~5 Hz
+def run_pytorch_benchmark(duration_s: float = 5.0,
+                          power_source: Optional[PowerSource] = None) -> CalibrationResult:
+    """Run a lightweight matrix multiplication benchmark using PyTorch.
+    Returns TFLOPS and average power draw.
+    """
+    return TorchCudaBackend().run(duration_s, power_source or default_power_source())
+
+
+def run_numpy_benchmark(duration_s: float = 5.0,
+                        power_source: Optional[PowerSource] = None,
+                        threads: Optional[int] = None) -> CalibrationResult:
+    """CPU matrix benchmark across float32/float64/int8 using NumPy/BLAS."""
+    return NumpyBackend(threads).run(duration_s, power_source or default_power_source())
 
-        if power_samples:
-            result.power_draw_w = sum(power_samples) / len(power_samples)
-            result.duration_s = time.time() - start
 
-    except (subprocess.CalledProcessError, FileNotFoundError,
-            subprocess.TimeoutExpired, ValueError):
-        pass
+def run_power_benchmark(duration_s: float = 3.0,
+                        power_source: Optional[PowerSource] = None,
+                        policy: Optional[AdaptivePolicy] = None) -> CalibrationResult:
+    """Fallback: sample power only (no compute benchmark). With a `policy`,
+    sampling waits for a power plateau and then runs until the mean's CI
+    meets the target (or the budget), instead of a fixed `duration_s`.
+    """
+    result = CalibrationResult(method="nvidia-smi")
+    power_source = power_source or default_power_source()
+
+    trace = PowerTrace()
+    start = time.time()
+    measuring = policy is None
+    detector = SteadyStateDetector(
+        policy.plateau_blocks * 2, policy.plateau_tolerance_pct, policy.plateau_temp_c,
+    ) if policy else None       # single power reads are noisier than blocks
+    if policy:
+        result.adaptive = True
+        result.ci_target_pct = policy.target_ci_pct
+        result.ci_metric = "W"
+
+    while policy or time.time() - start < duration_s:
+        power = power_source.read_watts()
+        if power is None:
+            break
+        elapsed = time.time() - start
+        if not measuring:
+            if detector.add({"power_w": power}) or elapsed >= policy.warmup_cap_s:
+                measuring = True
+                result.steady_state = detector.steady
+                result.warmup_s = elapsed
+        else:
+            trace.append(power)
+            if policy:
+                result.ci_pct = ci_half_width_pct([w for _, w in trace.samples()])
+                if trace.count >= policy.min_blocks and result.ci_pct <= policy.target_ci_pct:
+                    result.stop_reason = "precision"
+                    break
+                if elapsed >= policy.budget_s:
+                    result.stop_reason = "budget"
+                    break
+        time.sleep(0.2)  # ~5 Hz
+    result.blocks = trace.count
+
+    if trace.count:
+        record_power(result, trace, power_source, trace.first_t, trace.last_t)
+        result.duration_s = time.time() - start
 
     return result
 
 
-def calibrate(hw: HardwareInfo, force: bool = False) -> CalibrationResult:
-    """Run calibration benchmark. Tries PyTorch first, falls back to nvidia-smi."""
-    if hw.gpu_count == 0:
-        print("No GPU detected — using estimation mode.")
-        return CalibrationResult(method="estimated")
+def calibrate(hw: HardwareInfo, force: bool = False,
+              power_source: Optional[PowerSource] = None,
+              backend: Optional[str] = None,
+              policy: Optional[AdaptivePolicy] = None,
+              adaptive: bool = True) -> CalibrationResult:
+    """Run calibration benchmark. Tries each compute backend in order
+    (PyTorch/CUDA, then NumPy on the CPU), falls back to nvidia-smi power
+    sampling. `backend` (or COMPUTE_BACKEND) forces a specific backend.
+
+    Duration is fixed (5 s / 3 s) unless a policy is given or
+    CALIBRATION_TARGET_CI is set: adaptive calibration measures from steady
+    state until the J/TFLOP confidence interval is tight enough, which can
+    take up to CALIBRATION_BUDGET_S. adaptive=False ignores both.
+    """
+    power_source = power_source or default_power_source()
+    backend = backend or os.environ.get("COMPUTE_BACKEND") or None
+    if adaptive:
+        policy = policy or AdaptivePolicy.from_env()
+    else:
+        policy = None
 
     print("Running calibration benchmark...")
 
-    # Try PyTorch first (more accurate)
-    result = run_pytorch_benchmark(duration_s=5.0)
-    if result.benchmark_score > 0:
-        print(f"  PyTorch benchmark: {result.benchmark_score:.1f} TFLOPS, "
-              f"{result.power_draw_w:.0f}W avg")
-        return result
+    candidates = COMPUTE_BACKENDS
+    if backend:
+        forced = get_backend(backend)
+        if forced is None:
+            print(f"  Unknown compute backend '{backend}' — using auto-detection.")
+        else:
+            candidates = [forced]
+
+    for candidate in candidates:
+        if not backend and not candidate.available(hw):
+            continue
+        if policy:
+            result = candidate.run_adaptive(policy, power_source)
+        else:
+            result = candidate.run(5.0, power_source)
+        if result.benchmark_score > 0:
+            print(f"  {candidate.name} benchmark: {result.benchmark_score:.2f} TFLOPS, "
+                  f"{result.power_draw_w:.0f}W avg")
+            return result
+
+    if hw.gpu_count == 0:
+        print("No GPU or CPU backend available — using estimation mode.")
+        return CalibrationResult(method="estimated")
 
     # Fallback to nvidia-smi power sampling
-    result = run_power_benchmark(duration_s=3.0)
+    result = run_power_benchmark(duration_s=3.0, power_source=power_source, policy=policy)
     if result.power_draw_w > 0:
         print(f"  Power sampling: {result.power_draw_w:.0f}W avg")
         return result
@@ -307,23 +837,54 @@ def compute_relative_change(
     hw: HardwareInfo,
     cal: CalibrationResult,
     threshold_pct: float = 5.0,
+    new_issues: Optional[int] = None,
+    new_critical: int = 0,
+    resolved_issues: int = 0,
+    diff_base: str = "",
+    workload: Optional["WorkloadResult"] = None,
 ) -> RelativeChange:
-    """Compare current audit results against stored baseline."""
+    """Compare current audit results against stored baseline.
+
+    With `new_issues` (from a differential base-vs-head audit) the issue and
+    critical deltas are the fingerprinted new/resolved findings rather than
+    raw count differences, and no stored baseline is needed for them.
+
+    With a `workload` measured the same way as the baseline's (same command,
+    same power domains), the energy gate uses its J/run instead of the
+    synthetic J/TFLOP, and fails only when the regression both exceeds the
+    threshold and is larger than run-to-run noise.
+    """
     baseline = load_baseline(hw.hardware_hash)
+    differential = new_issues is not None
 
-    if baseline is None:
+    if baseline is None and not differential:
         return RelativeChange(
             has_baseline=False,
             reason="No baseline found. This run will be saved as the new baseline.",
         )
 
-    change = RelativeChange(has_baseline=True)
-    change.same_hardware = (baseline.hardware_hash == hw.hardware_hash)
-    change.issues_change = current_issues - baseline.issues_found
-    change.critical_change = current_critical - baseline.critical_count
+    change = RelativeChange(has_baseline=baseline is not None)
+    if differential:
+        change.differential = True
+        change.diff_base = diff_base
+        change.new_issues = new_issues
+        change.resolved_issues = resolved_issues
+        change.issues_change = new_issues - resolved_issues
+        change.critical_change = new_critical
+    else:
+        change.issues_change = current_issues - baseline.issues_found
+        change.critical_change = current_critical - baseline.critical_count
 
-    # Energy comparison (via benchmark score if available)
-    if cal.energy_per_tflop > 0 and baseline.energy_per_tflop > 0:
+    if baseline is None:
+        baseline = Baseline()    # no energy history: only the issue deltas apply
+    else:
+        change.same_hardware = (baseline.hardware_hash == hw.hardware_hash)
+
+    # Energy comparison (via benchmark score if available). J/TFLOP is only
+    # comparable when the same power domains were measured; baselines from
+    # before CPU package power was counted are GPU-only.
+    same_domains = (baseline.power_domains or "gpu") == (cal.power_domains or "gpu")
+    if cal.energy_per_tflop > 0 and baseline.energy_per_tflop > 0 and same_domains:
         change.energy_change_pct = (
             (cal.energy_per_tflop - baseline.energy_per_tflop)
             / baseline.energy_per_tflop * 100
@@ -335,22 +896,53 @@ def compute_relative_change(
             / baseline.benchmark_score * 100
         )
 
+    # Workload benchmark (takes over the energy gate when comparable)
+    gate_on_workload = False
+    if (workload is not None and workload.measured_energy
+            and baseline.workload_j_per_run > 0
+            and baseline.workload_name == workload.name
+            and baseline.workload_domains == workload.power_domains):
+        from workload import change_is_significant
+
+        gate_on_workload = True
+        change.workload_change_pct = (
+            (workload.j_per_run - baseline.workload_j_per_run)
+            / baseline.workload_j_per_run * 100
+        )
+        if baseline.workload_throughput > 0:
+            change.throughput_change_pct = (
+                (workload.throughput - baseline.workload_throughput)
+                / baseline.workload_throughput * 100
+            )
+        change.workload_significant = change_is_significant(
+            workload, baseline.workload_j_per_run,
+            baseline.workload_j_std, baseline.workload_runs,
+        )
+
     # Pass/fail logic
     if change.critical_change > 0:
         change.passed = False
         change.reason = (
             f"❌ {change.critical_change} new critical issue(s) introduced."
         )
-    elif change.energy_change_pct > threshold_pct:
+    elif (gate_on_workload and change.workload_change_pct > threshold_pct
+            and change.workload_significant):
+        change.passed = False
+        change.reason = (
+            f"❌ Workload energy regressed by {change.workload_change_pct:.1f}% per run "
+            f"(threshold: {threshold_pct}%)."
+        )
+    elif not gate_on_workload and change.energy_change_pct > threshold_pct:
         change.passed = False
         change.reason = (
             f"❌ Energy efficiency degraded by {change.energy_change_pct:.1f}% "
             f"(threshold: {threshold_pct}%)."
         )
-    elif change.issues_change > 0:
+    elif change.issues_change > 0 or change.new_issues > 0:
         change.passed = True
+        new = change.new_issues if change.differential else change.issues_change
         change.reason = (
-            f"⚠️ {change.issues_change} new issue(s) found, but no critical regressions."
+            f"⚠️ {new} new issue(s) found, but no critical regressions."
         )
     else:
         change.passed = True
@@ -366,14 +958,59 @@ def compute_relative_change(
 # Energy estimation (cross-architecture)
 # ---------------------------------------------------------------------------
 
+# Reference measurements used 256 prompt + 256 generated tokens
+REFERENCE_INPUT_LEN = 256
+REFERENCE_OUTPUT_LEN = 256
+
+# Energy of one prefill token relative to one BS=1 decode token. Prefill is
+# compute-bound and processes the whole prompt in one pass (A800 Mistral-7B:
+# ~0.4 ms/token prefill vs ~52 ms/token decode, at ~1.5× the power:
+# 0.4 / 52 × 1.5 ≈ 0.0115).
+PREFILL_TOKEN_RATIO = 0.0115
+
+
+def _sequence_profile(model_params_b: float, quantization: str, batch_size: int,
+                      input_len: int, output_len: int) -> tuple[float, float]:
+    """Relative (prefill, decode) energy of one request, in units of one
+    BS=1 decode step at zero context.
+
+    Decode reads the weights once per step (shared across the batch) plus
+    each sequence's KV cache, which grows by one token per step. Prefill
+    cost grows with prompt length, plus quadratic attention.
+    """
+    from memory import DTYPE_BYTES, KV_BYTES, geometry_for
+
+    geo = geometry_for(model_params_b)
+    params = model_params_b * 1e9
+    weight_bytes = params * DTYPE_BYTES.get(quantization, 2.0)
+    kv_bytes_per_token = 2 * geo.layers * geo.kv_heads * geo.head_dim * KV_BYTES
+    kv_ratio = kv_bytes_per_token / weight_bytes
+    attn_ratio = 2 * geo.layers * geo.hidden / params   # attention vs linear FLOPs, per context token
+
+    avg_decode_ctx = input_len + output_len / 2
+    decode = output_len * (1 / batch_size + kv_ratio * avg_decode_ctx)
+    prefill = input_len * PREFILL_TOKEN_RATIO * (1 + attn_ratio * input_len / 2)
+    return prefill, decode
+
+
 def estimate_energy(
     model_params_b: float,
     quantization: str,
     batch_size: int,
     hw: HardwareInfo,
+    input_len: int = REFERENCE_INPUT_LEN,
+    output_len: int = REFERENCE_OUTPUT_LEN,
+    interval: bool = False,
 ) -> dict:
     """Estimate energy consumption based on hardware profile and reference data.
     Returns dict with estimated J/1k tokens and confidence level.
+
+    J/1k tokens counts generated tokens. Prompt (prefill) and generation
+    (decode, with KV-cache growth) are modelled separately relative to the
+    256-in/256-out reference, so the defaults reproduce the reference scaling.
+
+    With `interval`, adds `energy_ci_low`/`energy_ci_high` (see
+    `estimate_interval`) when NumPy is available and the data has spread.
     """
     arch = hw.architecture if hw.known_profile else "ada"  # default to 4090D
 
@@ -401,19 +1038,73 @@ def estimate_energy(
     # Scale by architecture (if not directly measured)
     arch_scale = hw.energy_scale if hw.known_profile else 1.0
 
-    estimated = base_energy * model_scale * bs_scale * arch_scale
+    # Scale by sequence shape (1.0 at the reference 256 in + 256 out)
+    prefill, decode = _sequence_profile(model_params_b, quantization, batch_size,
+                                        input_len, output_len)
+    ref_prefill, ref_decode = _sequence_profile(model_params_b, quantization, batch_size,
+                                                REFERENCE_INPUT_LEN, REFERENCE_OUTPUT_LEN)
+    per_output = (prefill + decode) / max(output_len, 1)
+    ref_per_output = (ref_prefill + ref_decode) / REFERENCE_OUTPUT_LEN
+    seq_scale = per_output / ref_per_output
+    prefill_share = prefill / (prefill + decode) if prefill + decode > 0 else 0.0
+
+    estimated = base_energy * model_scale * bs_scale * arch_scale * seq_scale
+    per_request = estimated * output_len / 1000
     confidence = "HIGH" if hw.known_profile and key[0] == arch else "MEDIUM"
     if not hw.known_profile:
         confidence = "LOW"
 
-    return {
+    est = {
         "energy_j_per_1k_tok": round(estimated, 0),
         "confidence": confidence,
         "reference_key": f"{key[0]}/{key[1]}",
         "model_scale": round(model_scale, 2),
         "bs_scale": round(bs_scale, 3),
         "arch_scale": round(arch_scale, 2),
+        "seq_scale": round(seq_scale, 3),
+        "input_len": input_len,
+        "output_len": output_len,
+        "prefill_share": round(prefill_share, 3),
+        "prefill_j_per_request": round(per_request * prefill_share, 1),
+        "decode_j_per_request": round(per_request * (1 - prefill_share), 1),
     }
+    if interval:
+        try:
+            ci = estimate_interval(estimated, key, batch_size)
+        except ImportError:
+            ci = None
+        if ci is not None:
+            est["energy_ci_low"] = round(ci.low, 0)
+            est["energy_ci_high"] = round(ci.high, 0)
+            est["ci_confidence"] = ci.confidence
+    return est
+
+
+def estimate_interval(estimated: float, reference_key: tuple[str, str], batch_size: int,
+                      n_resamples: Optional[int] = None):
+    """Bootstrap interval (stats.Interval) for an estimate from the run-to-run
+    spread of the data behind it: the reference cell and, for tabulated batch
+    sizes, the BS sweep's energy ratio to BS=1. Model, architecture and
+    sequence scaling are modelled, not measured, and add no spread.
+
+    None when the reference cell has no recorded spread. Raises ImportError
+    without NumPy.
+    """
+    from stats import DEFAULT_RESAMPLES, Group, bootstrap_means, percentile_intervals
+
+    if reference_key not in REFERENCE_ENERGY_SPREAD:
+        return None
+    std, runs = REFERENCE_ENERGY_SPREAD[reference_key]
+    groups = [Group.from_summary("reference", REFERENCE_ENERGY[reference_key], std, runs)]
+    if batch_size != 1 and batch_size in BS_ENERGY_SCALE and batch_size in BS_ENERGY_RUNS:
+        groups += [Group.from_summary(f"bs{bs}", *BS_ENERGY_RUNS[bs]) for bs in (batch_size, 1)]
+
+    means = bootstrap_means(groups, n_resamples or DEFAULT_RESAMPLES)
+    # Relative deviation of each resample from the point values, applied to the estimate
+    factor = means[:, 0] / groups[0].mean
+    if len(groups) == 3:
+        factor = factor * (means[:, 1] / means[:, 2]) / (groups[1].mean / groups[2].mean)
+    return percentile_intervals([estimated], estimated * factor[:, None])[0]
 
 
 # ---------------------------------------------------------------------------
@@ -426,7 +1117,7 @@ def format_relative_change(change: RelativeChange, baseline: Optional[Baseline])
     lines.append("### 📈 Relative Change (vs Baseline)")
     lines.append("")
 
-    if not change.has_baseline:
+    if not change.has_baseline and not change.differential:
         lines.append(f"> {change.reason}")
         lines.append("")
         return '\n'.join(lines)
@@ -438,21 +1129,34 @@ def format_relative_change(change: RelativeChange, baseline: Optional[Baseline])
     lines.append(f"> {change.reason}")
     lines.append("")
 
+    if change.differential:
+        base = change.diff_base[:7] or "unknown"
+        lines.append(
+            f"**vs merge base `{base}`:** {change.new_issues} new, "
+            f"{change.resolved_issues} resolved "
+            f"(pre-existing findings are not counted)."
+        )
+        lines.append("")
+        if not change.has_baseline or (change.energy_change_pct == 0
+                                       and change.workload_change_pct == 0):
+            return '\n'.join(lines)
+
     # Details table
     lines.append("| Metric | Baseline | Current | Change |")
     lines.append("|--------|----------|---------|--------|")
 
     if baseline:
-        lines.append(
-            f"| Issues | {baseline.issues_found} | "
-            f"{baseline.issues_found + change.issues_change} | "
-            f"{'+' if change.issues_change > 0 else ''}{change.issues_change} |"
-        )
-        lines.append(
-            f"| Critical | {baseline.critical_count} | "
-            f"{baseline.critical_count + change.critical_change} | "
-            f"{'+' if change.critical_change > 0 else ''}{change.critical_change} |"
-        )
+        if not change.differential:
+            lines.append(
+                f"| Issues | {baseline.issues_found} | "
+                f"{baseline.issues_found + change.issues_change} | "
+                f"{'+' if change.issues_change > 0 else ''}{change.issues_change} |"
+            )
+            lines.append(
+                f"| Critical | {baseline.critical_count} | "
+                f"{baseline.critical_count + change.critical_change} | "
+                f"{'+' if change.critical_change > 0 else ''}{change.critical_change} |"
+            )
 
         if change.energy_change_pct != 0:
             direction = "📈" if change.energy_change_pct > 0 else "📉"
@@ -461,6 +1165,21 @@ def format_relative_change(change: RelativeChange, baseline: Optional[Baseline])
                 f"— | {direction} {change.energy_change_pct:+.1f}% |"
             )
 
+        if change.workload_change_pct != 0:
+            direction = "📈" if change.workload_change_pct > 0 else "📉"
+            current_j = baseline.workload_j_per_run * (1 + change.workload_change_pct / 100)
+            noise = "" if change.workload_significant else " (within noise)"
+            lines.append(
+                f"| Workload J/run | {baseline.workload_j_per_run:.1f} J | {current_j:.1f} J | "
+                f"{direction} {change.workload_change_pct:+.1f}%{noise} |"
+            )
+        if change.throughput_change_pct != 0:
+            current_tp = baseline.workload_throughput * (1 + change.throughput_change_pct / 100)
+            lines.append(
+                f"| Throughput | {baseline.workload_throughput:.2f}/s | {current_tp:.2f}/s | "
+                f"{change.throughput_change_pct:+.1f}% |"
+            )
+
         if not change.same_hardware:
             lines.append("")
             lines.append(
@@ -489,8 +1208,21 @@ def format_estimation(est: dict, model_name: str, batch_size: int) -> str:
     lines.append(f"| Model | {model_name} |")
     lines.append(f"| Batch Size | {batch_size} |")
     lines.append(f"| Estimated Energy | **{est['energy_j_per_1k_tok']:.0f} J/1k tokens** |")
+    if 'energy_ci_low' in est:
+        lines.append(f"| {est['ci_confidence']:.0%} CI | {est['energy_ci_low']:.0f}–{est['energy_ci_high']:.0f} "
+                     f"J/1k tokens (run-to-run spread of the reference data) |")
     lines.append(f"| Confidence | {est['confidence']} |")
-    lines.append(f"| Reference | {est['reference_key']} × {est['model_scale']}× (model) × {est['bs_scale']}× (BS) × {est['arch_scale']}× (arch) |")
+    if 'input_len' in est:
+        lines.append(
+            f"| Sequence | {est['input_len']} prompt + {est['output_len']} generated tokens "
+            f"(prefill {est['prefill_share']:.1%} / decode {1 - est['prefill_share']:.1%}) |"
+        )
+        lines.append(
+            f"| Per Request | {est['prefill_j_per_request'] + est['decode_j_per_request']:.0f} J "
+            f"({est['prefill_j_per_request']:.0f} J prefill + {est['decode_j_per_request']:.0f} J decode) |"
+        )
+    seq = f" × {est['seq_scale']}× (seq)" if est.get('seq_scale', 1.0) != 1.0 else ""
+    lines.append(f"| Reference | {est['reference_key']} × {est['model_scale']}× (model) × {est['bs_scale']}× (BS) × {est['arch_scale']}× (arch){seq} |")
     lines.append("")
 
     if est['confidence'] == "LOW":
@@ -517,5 +1249,5 @@ if __name__ == "__main__":
     cal = calibrate(hw)
     print(f"Calibration: {cal.method}, {cal.benchmark_score:.1f} TFLOPS")
 
-    est = estimate_energy(7.0, "fp16", 1, hw)
+    est = estimate_energy(7.0, "fp16", 1, hw, interval=True)
     print(f"Estimation: {json.dumps(est, indent=2)}")
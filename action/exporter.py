@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+EcoCompute — Prometheus / OpenMetrics Exporter
+
+Runs power sampling continuously and serves live gauges for a Prometheus
+scrape:
+
+    ecocompute_power_watts                     power per source (GPU board, CPU package)
+    ecocompute_energy_joules_total             integrated energy per source (use rate())
+    ecocompute_energy_per_tflop_joules         from the calibration run
+    ecocompute_energy_per_1k_tokens_joules     live total power ÷ live token rate
+    ecocompute_tokens_total                    tokens reported by the serving process
+
+Power comes from the same `power.PowerSource` classes calibration and the
+profiler use (one nvidia-smi source per GPU, RAPL for CPU packages), so there
+is one nvidia-smi parser. Per-source series are labelled `domain` ("gpu",
+"cpu") and `device` (GPU index, or the source name); every series also
+carries the HardwareInfo labels (gpu_name, architecture, hardware_hash). The
+exposition text is rendered once per sampling interval and scrapes serve the
+cached bytes, so scrape cost stays constant no matter how often Prometheus
+polls.
+
+Serving processes report generated tokens with `add_tokens()` in-process, or
+over HTTP when the exporter runs as its own process:
+
+    python exporter.py --port 9400 --interval 1
+    python exporter.py --port 9400 --fake-watts 250   # no GPU needed
+    curl -d 512 http://localhost:9400/tokens           # 512 tokens generated
+
+No dependencies beyond the standard library and the nvidia-smi CLI.
+"""
+
+import argparse
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from hardware import HardwareInfo
+from power import (
+    CompositePowerSource, FakePowerSource, NvidiaSmiPowerSource, PowerSource, PowerTrace,
+    default_power_source, detect_power_sources,
+)
+
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+MAX_TOKENS_BODY = 64   # bytes; the body is one integer
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _device(source: PowerSource) -> str:
+    if isinstance(source, NvidiaSmiPowerSource):
+        return "all" if source.gpu_index is None else str(source.gpu_index)
+    return source.name
+
+
+class MetricsExporter:
+    """Background sampler + cached exposition text.
+
+    `source` defaults to `default_power_source()`; a composite source is
+    split so each member gets its own series.
+    """
+
+    def __init__(self, hw: HardwareInfo, source: Optional[PowerSource] = None,
+                 interval_s: float = 1.0, energy_per_tflop: float = 0.0,
+                 token_window_s: float = 60.0):
+        self.hw = hw
+        source = source or default_power_source()
+        self.sources = source.sources if isinstance(source, CompositePowerSource) else [source]
+        self.interval_s = interval_s
+        self.energy_per_tflop = energy_per_tflop
+        self.token_window_s = token_window_s
+
+        self._lock = threading.Lock()
+        # Two samples are enough: older segments are folded into the total
+        self._traces = [PowerTrace(capacity=2) for _ in self.sources]
+        self._latest: list[Optional[float]] = [None] * len(self.sources)
+        self._tokens_total = 0
+        self._token_events: deque = deque()   # (time, count)
+        self._last_t: Optional[float] = None
+        self._rendered = {"prometheus": b"", "openmetrics": b""}
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    # -- inputs -------------------------------------------------------------
+
+    def add_tokens(self, count: int):
+        """Report generated tokens so the J/1k-token gauge can be derived."""
+        now = time.monotonic()
+        with self._lock:
+            self._tokens_total += count
+            self._token_events.append((now, count))
+
+    def collect(self):
+        """Take one sample per source, integrate energy and re-render."""
+        readings = [trace.sample(source) for trace, source in zip(self._traces, self.sources)]
+        now = time.monotonic()
+        with self._lock:
+            self._latest = readings
+            self._last_t = now
+            cutoff = now - self.token_window_s
+            while self._token_events and self._token_events[0][0] < cutoff:
+                self._token_events.popleft()
+            self._rendered = {
+                "prometheus": self._render(openmetrics=False).encode(),
+                "openmetrics": self._render(openmetrics=True).encode(),
+            }
+
+    def render(self, openmetrics: bool = False) -> bytes:
+        """Cached exposition bytes (what a scrape returns)."""
+        return self._rendered["openmetrics" if openmetrics else "prometheus"]
+
+    # -- rendering ----------------------------------------------------------
+
+    def _labels(self, source: Optional[PowerSource] = None) -> str:
+        labels = {}
+        if source is not None:
+            labels = {"domain": source.domain, "device": _device(source)}
+        labels.update({
+            "gpu_name": self.hw.gpu_name,
+            "architecture": self.hw.architecture,
+            "hardware_hash": self.hw.hardware_hash,
+        })
+        return ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+
+    def _tokens_per_s(self) -> float:
+        if not self._token_events:
+            return 0.0
+        span = max(self._last_t - self._token_events[0][0], self.interval_s)
+        return sum(c for _, c in self._token_events) / span
+
+    def _render(self, openmetrics: bool) -> str:
+        out: list[str] = []
+
+        def family(name: str, kind: str, help_text: str, series: list[tuple[str, float]]):
+            # OpenMetrics names counter families without the _total suffix
+            family_name = name[:-6] if openmetrics and kind == "counter" else name
+            out.append(f"# HELP {family_name} {help_text}")
+            out.append(f"# TYPE {family_name} {kind}")
+            for labels, value in series:
+                out.append(f"{name}{{{labels}}} {value:.10g}")
+
+        live = [(source, watts, trace)
+                for source, watts, trace in zip(self.sources, self._latest, self._traces)
+                if watts is not None]
+        family("ecocompute_power_watts", "gauge", "Power draw in watts per source.",
+               [(self._labels(s), w) for s, w, _ in live])
+        family("ecocompute_energy_joules_total", "counter",
+               "Energy integrated from power samples since exporter start.",
+               [(self._labels(s), t.energy_j()) for s, _, t in live])
+        if self.energy_per_tflop > 0:
+            family("ecocompute_energy_per_tflop_joules", "gauge",
+                   "Joules per TFLOP from the calibration benchmark.",
+                   [(self._labels(), self.energy_per_tflop)])
+        if self._tokens_total:
+            family("ecocompute_tokens_total", "counter", "Tokens reported by the serving process.",
+                   [(self._labels(), self._tokens_total)])
+            rate = self._tokens_per_s()
+            if rate > 0 and live:
+                family("ecocompute_energy_per_1k_tokens_joules", "gauge",
+                       f"Live power divided by token rate over the last {self.token_window_s:g}s.",
+                       [(self._labels(), sum(w for _, w, _ in live) / rate * 1000)])
+
+        if openmetrics:
+            out.append("# EOF")
+        return "\n".join(out) + "\n"
+
+    # -- lifecycle ----------------------------------------------------------
+
+    def start(self):
+        self.collect()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ecocompute-exporter", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            self.collect()
+
+    def serve(self, port: int = 9400, addr: str = "") -> ThreadingHTTPServer:
+        """Start sampling and an HTTP server in background threads.
+
+        GET /metrics serves the exposition; POST /tokens with an integer body
+        adds generated tokens (same as `add_tokens`).
+        """
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+                body = exporter.render(openmetrics)
+                self.send_response(200)
+                self.send_header(
+                    "Content-Type",
+                    OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE,
+                )
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                if self.path.split('?')[0] != "/tokens":
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                if length > MAX_TOKENS_BODY:
+                    self.send_error(413)
+                    return
+                try:
+                    count = int(self.rfile.read(length).decode().strip())
+                except (UnicodeDecodeError, ValueError):
+                    count = -1
+                if count < 0:
+                    self.send_error(400, "body must be a non-negative token count")
+                    return
+                exporter.add_tokens(count)
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass  # scrapes every few seconds would flood the log
+
+        if self._thread is None:
+            self.start()
+        self._server = ThreadingHTTPServer((addr, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        for source in self.sources:
+            source.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EcoCompute Prometheus exporter")
+    parser.add_argument("--port", type=int, default=9400)
+    parser.add_argument("--interval", type=float, default=1.0, help="Sampling interval (s)")
+    parser.add_argument("--calibrate", action="store_true",
+                        help="Run the calibration benchmark once to publish J/TFLOP")
+    parser.add_argument("--fake-watts", type=float, default=None,
+                        help="Serve a constant fake reading instead of real power sources")
+    args = parser.parse_args()
+
+    from hardware import detect_gpu
+
+    hw = detect_gpu()
+    if args.fake_watts is not None:
+        source = FakePowerSource(args.fake_watts)
+    else:
+        # Every board, each fed by one long-lived nvidia-smi stream, plus RAPL
+        sources = detect_power_sources(gpus=hw.gpu_count,
+                                       stream_interval_ms=int(args.interval * 1000))
+        source = CompositePowerSource(sources) if sources else PowerSource()
+
+    energy_per_tflop = 0.0
+    if args.calibrate:
+        from calibrate import calibrate
+        energy_per_tflop = calibrate(hw).energy_per_tflop
+
+    exporter = MetricsExporter(hw, source, interval_s=args.interval,
+                               energy_per_tflop=energy_per_tflop)
+    exporter.serve(args.port)
+    print(f"Serving EcoCompute metrics on :{args.port}/metrics "
+          f"({hw.gpu_name}, hash {hw.hardware_hash}); POST token counts to /tokens")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        exporter.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+EcoCompute — Fleet Energy Projection
+
+Turns a request-rate time series into kWh, GPU-hours, idle energy and cost
+for a given GPU profile and batching configuration. Intended for capacity
+planning rather than per-PR auditing.
+
+Input CSV, one row per interval:
+
+    timestamp,requests[,input_tokens,output_tokens]
+    2026-01-01T00:00:00,1250,512,256
+
+`requests` is the count in the interval (or use `request_rate` in req/s);
+token columns are per-request means and default to 256/256. The interval is
+inferred from the timestamps.
+
+Per interval:
+    batch     Little's law: concurrency = rate × decode time per request,
+              capped at the configured max batch
+    active J  estimate_energy() at BS=1, scaled by batch and sequence shape
+    busy s    active J ÷ active power at that batch (measured power curve)
+    GPUs      ceil(busy s ÷ interval), at least `min_gpus`
+    idle J    unused GPU-seconds × profile idle_w
+
+Everything is evaluated as NumPy array expressions over the whole series, so
+a year at minute resolution (525k rows) projects in a couple of seconds.
+
+    python fleet.py traffic.csv --gpu a800 --model-params 7 --max-batch 32
+"""
+
+import argparse
+import csv
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from calibrate import (
+    BS_ENERGY_SCALE, REFERENCE_INPUT_LEN, REFERENCE_OUTPUT_LEN,
+    _sequence_profile, estimate_energy,
+)
+from hardware import HardwareInfo, hardware_for_profile
+from memory import BATCH_EXPERIMENT_DIR
+
+
+# ---------------------------------------------------------------------------
+# Measured batch curve (A800, Mistral-7B Pure INT8)
+# ---------------------------------------------------------------------------
+
+REFERENCE_CURVE_TDP_W = 400       # A800 board limit the curve was measured at
+
+
+@dataclass
+class BatchCurve:
+    """Mean throughput / power / utilization per batch size."""
+    batch_sizes: list
+    throughput_tok_s: list
+    power_w: list
+    util_pct: list
+    tdp_w: float = REFERENCE_CURVE_TDP_W
+
+    def per_sequence_tok_s(self, batch_size: int = 1) -> float:
+        """Decode speed seen by one request at the given measured batch size."""
+        i = self.batch_sizes.index(batch_size)
+        return self.throughput_tok_s[i] / batch_size
+
+
+def load_batch_curve(csv_path: Optional[str] = None) -> BatchCurve:
+    """Average the raw batch-size experiment CSV per batch size."""
+    if csv_path is None:
+        matches = sorted(BATCH_EXPERIMENT_DIR.glob("*_raw_*.csv"))
+        if not matches:
+            raise FileNotFoundError(f"no *_raw_*.csv in {BATCH_EXPERIMENT_DIR}")
+        csv_path = str(matches[-1])
+
+    sums: dict[int, list] = {}
+    with open(csv_path, newline='') as f:
+        for row in csv.DictReader(f):
+            acc = sums.setdefault(int(row["batch_size"]), [0, 0.0, 0.0, 0.0])
+            acc[0] += 1
+            acc[1] += float(row["throughput_tok_s"])
+            acc[2] += float(row["avg_power_w"])
+            acc[3] += float(row["avg_gpu_util_pct"])
+
+    sizes = sorted(sums)
+    return BatchCurve(
+        batch_sizes=sizes,
+        throughput_tok_s=[sums[b][1] / sums[b][0] for b in sizes],
+        power_w=[sums[b][2] / sums[b][0] for b in sizes],
+        util_pct=[sums[b][3] / sums[b][0] for b in sizes],
+    )
+
+
+# ---------------------------------------------------------------------------
+# Configuration & result
+# ---------------------------------------------------------------------------
+
+@dataclass
+class BatchingConfig:
+    """How the fleet serves traffic."""
+    max_batch_size: int = 32
+    min_gpus: int = 1               # always-on replicas (idle energy floor)
+    pue: float = 1.0                # datacenter overhead multiplier
+    price_per_kwh: float = 0.0      # currency per kWh, 0 = no cost column
+
+
+@dataclass
+class FleetProjection:
+    """Totals plus per-interval arrays (NumPy) for plotting/export."""
+    intervals: int = 0
+    interval_s: float = 0.0
+    requests: float = 0.0
+    output_tokens: float = 0.0
+    active_kwh: float = 0.0
+    idle_kwh: float = 0.0
+    total_kwh: float = 0.0
+    gpu_hours: float = 0.0
+    busy_gpu_hours: float = 0.0
+    peak_gpus: int = 0
+    mean_batch: float = 0.0
+    cost: float = 0.0
+    series: dict = field(default_factory=dict)
+
+    @property
+    def utilization(self) -> float:
+        return self.busy_gpu_hours / self.gpu_hours if self.gpu_hours else 0.0
+
+    @property
+    def wh_per_1k_tokens(self) -> float:
+        return self.total_kwh * 1e6 / self.output_tokens if self.output_tokens else 0.0
+
+
+# ---------------------------------------------------------------------------
+# Input
+# ---------------------------------------------------------------------------
+
+def load_traffic(csv_path: str, interval_s: Optional[float] = None) -> dict[str, Any]:
+    """Read a traffic CSV into NumPy arrays: requests, input_len, output_len,
+    plus the inferred interval in seconds.
+    """
+    import numpy as np
+
+    with open(csv_path, newline='') as f:
+        reader = csv.reader(f)
+        header = [h.strip() for h in next(reader)]
+        columns: dict[str, list] = {h: [] for h in header}
+        for row in reader:
+            if not row:
+                continue
+            for h, value in zip(header, row):
+                columns[h].append(value)
+
+    if interval_s is None:
+        interval_s = _infer_interval(columns.get("timestamp", []))
+
+    if "requests" in columns:
+        requests = np.asarray(columns["requests"], dtype=float)
+    elif "request_rate" in columns:
+        requests = np.asarray(columns["request_rate"], dtype=float) * interval_s
+    else:
+        raise ValueError(f"{csv_path}: needs a 'requests' or 'request_rate' column")
+
+    def lengths(name: str, default: int):
+        if name in columns:
+            return np.asarray(columns[name], dtype=float)
+        return np.full(len(requests), float(default))
+
+    return {
+        "requests": requests,
+        "input_len": lengths("input_tokens", REFERENCE_INPUT_LEN),
+        "output_len": lengths("output_tokens", REFERENCE_OUTPUT_LEN),
+        "interval_s": interval_s,
+    }
+
+
+def _infer_interval(timestamps: list, default: float = 60.0) -> float:
+    import numpy as np
+
+    if len(timestamps) < 2:
+        return default
+    try:
+        t = np.asarray(timestamps, dtype="datetime64[s]").astype(np.int64).astype(float)
+    except ValueError:
+        try:
+            t = np.asarray(timestamps, dtype=float)
+        except ValueError:
+            return default
+    step = float(np.median(np.diff(t)))
+    return step if step > 0 else default
+
+
+# ---------------------------------------------------------------------------
+# Projection
+# ---------------------------------------------------------------------------
+
+def bs_energy_scale(batch):
+    """BS_ENERGY_SCALE interpolated in log2(batch); power law past the table
+    (same E ∝ BS^-0.78 as estimate_energy). Accepts arrays.
+    """
+    import numpy as np
+
+    sizes = sorted(BS_ENERGY_SCALE)
+    batch = np.maximum(np.asarray(batch, dtype=float), 1.0)
+    inside = np.interp(np.log2(batch), np.log2(sizes), [BS_ENERGY_SCALE[s] for s in sizes])
+    return np.where(batch > sizes[-1], batch ** -0.78, inside)
+
+
+def project(
+    traffic: dict[str, Any],
+    hw: HardwareInfo,
+    model_params_b: float = 7.0,
+    quantization: str = "fp16",
+    config: Optional[BatchingConfig] = None,
+    curve: Optional[BatchCurve] = None,
+) -> FleetProjection:
+    """Project energy, GPU-hours and cost over a traffic series."""
+    import numpy as np
+
+    config = config or BatchingConfig()
+    curve = curve or load_batch_curve()
+    interval = float(traffic["interval_s"])
+    requests = traffic["requests"]
+    input_len = traffic["input_len"]
+    output_len = traffic["output_len"]
+
+    # Achieved batch from Little's law (decode time per request at BS≈1)
+    rate = requests / interval
+    seq_speed = curve.per_sequence_tok_s(curve.batch_sizes[0]) * (7.0 / model_params_b)
+    concurrency = rate * output_len / seq_speed
+    batch = np.clip(concurrency, 1.0, config.max_batch_size)
+
+    # Active energy: reference J/1k tokens at BS=1, scaled by batch and shape
+    base_j_per_1k = estimate_energy(model_params_b, quantization, 1, hw)["energy_j_per_1k_tok"]
+    prefill, decode = _sequence_profile(model_params_b, quantization, batch, input_len, output_len)
+    ref_prefill, ref_decode = _sequence_profile(model_params_b, quantization, batch,
+                                                REFERENCE_INPUT_LEN, REFERENCE_OUTPUT_LEN)
+    seq_scale = ((prefill + decode) / np.maximum(output_len, 1)) / (
+        (ref_prefill + ref_decode) / REFERENCE_OUTPUT_LEN
+    )
+    j_per_1k = base_j_per_1k * bs_energy_scale(batch) * seq_scale
+    tokens = requests * output_len
+    active_j = tokens / 1000 * j_per_1k
+
+    # Busy time from the measured power curve, rescaled to this board's TDP
+    tdp = hw.tdp_w or curve.tdp_w
+    power_fraction = np.interp(
+        np.log2(batch), np.log2(curve.batch_sizes),
+        [p / curve.tdp_w for p in curve.power_w],
+    )
+    busy_s = active_j / (power_fraction * tdp)
+
+    gpus = np.maximum(np.ceil(busy_s / interval), config.min_gpus)
+    idle_s = np.maximum(gpus * interval - busy_s, 0.0)
+    idle_j = idle_s * hw.idle_w
+
+    active_kwh = active_j * config.pue / 3.6e6
+    idle_kwh = idle_j * config.pue / 3.6e6
+
+    result = FleetProjection(
+        intervals=len(requests),
+        interval_s=interval,
+        requests=float(requests.sum()),
+        output_tokens=float(tokens.sum()),
+        active_kwh=float(active_kwh.sum()),
+        idle_kwh=float(idle_kwh.sum()),
+        gpu_hours=float(gpus.sum() * interval / 3600),
+        busy_gpu_hours=float(busy_s.sum() / 3600),
+        peak_gpus=int(gpus.max()) if len(gpus) else 0,
+        mean_batch=float(np.average(batch, weights=tokens)) if tokens.sum() > 0 else 1.0,
+        series={
+            "batch": batch,
+            "gpus": gpus,
+            "active_kwh": active_kwh,
+            "idle_kwh": idle_kwh,
+        },
+    )
+    result.total_kwh = result.active_kwh + result.idle_kwh
+    result.cost = result.total_kwh * config.price_per_kwh
+    return result
+
+
+def format_projection(p: FleetProjection, hw: HardwareInfo, model_name: str,
+                      config: BatchingConfig) -> str:
+    """Markdown summary of a projection."""
+    days = p.intervals * p.interval_s / 86400
+    lines = []
+    lines.append("### 🏭 Fleet Energy Projection")
+    lines.append("")
+    lines.append("| Parameter | Value |")
+    lines.append("|-----------|-------|")
+    lines.append(f"| Hardware | {hw.gpu_name} ({hw.architecture}, idle {hw.idle_w}W) |")
+    lines.append(f"| Model | {model_name} |")
+    lines.append(f"| Period | {days:.1f} days ({p.intervals} × {p.interval_s:g}s) |")
+    lines.append(f"| Requests | {p.requests:,.0f} ({p.output_tokens / 1e6:,.1f}M generated tokens) |")
+    lines.append(f"| Max / mean batch | {config.max_batch_size} / {p.mean_batch:.1f} |")
+    lines.append(f"| Energy | **{p.total_kwh:,.1f} kWh** ({p.active_kwh:,.1f} active + {p.idle_kwh:,.1f} idle) |")
+    lines.append(f"| Wh / 1k tokens | {p.wh_per_1k_tokens:.3f} |")
+    lines.append(f"| GPU-hours | {p.gpu_hours:,.0f} ({p.utilization:.0%} busy, peak {p.peak_gpus} GPUs) |")
+    if config.price_per_kwh:
+        lines.append(f"| Cost | {p.cost:,.2f} |")
+    if config.pue != 1.0:
+        lines.append(f"| PUE | {config.pue:g} |")
+    lines.append("")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EcoCompute fleet energy projection")
+    parser.add_argument("traffic", help="CSV: timestamp,requests[,input_tokens,output_tokens]")
+    parser.add_argument("--gpu", default="a800", help="Profile name from KNOWN_GPUS")
+    parser.add_argument("--model-params", type=float, default=7.0, help="Billions of parameters")
+    parser.add_argument("--quantization", default="fp16")
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--min-gpus", type=int, default=1)
+    parser.add_argument("--pue", type=float, default=1.0)
+    parser.add_argument("--price-per-kwh", type=float, default=0.0)
+    parser.add_argument("--interval", type=float, default=None,
+                        help="Seconds per row (default: inferred from timestamps)")
+    args = parser.parse_args()
+
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        raise SystemExit("fleet.py needs NumPy: pip install numpy")
+
+    hw = hardware_for_profile(args.gpu)
+    if not hw.known_profile:
+        print(f"Warning: '{args.gpu}' is not a known GPU profile — using reference defaults.")
+    config = BatchingConfig(args.max_batch, args.min_gpus, args.pue, args.price_per_kwh)
+    traffic = load_traffic(args.traffic, args.interval)
+    result = project(traffic, hw, args.model_params, args.quantization, config)
+    print(format_projection(result, hw, f"{args.model_params:g}B {args.quantization}", config))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+EcoCompute — Git Object Reader
+
+Reads file versions straight from the object database, without a checkout,
+through one long-lived `git cat-file --batch` process. Any number of blobs
+(`<rev>:<path>`) cost one process start; `read_many` pipelines requests so
+a whole PR's worth of base versions streams back in one round trip.
+
+Used by the differential audit (base vs head) and the pre-commit mode
+(staged blobs, `:<path>`).
+"""
+
+import os
+import subprocess
+import threading
+from typing import Iterable, Optional
+
+
+class GitError(RuntimeError):
+    """A git command failed or git is not available."""
+
+
+def run_git(args: list[str], repo: str = ".") -> str:
+    """Run a short git command and return stdout (text)."""
+    try:
+        r = subprocess.run(["git", *args], cwd=repo, capture_output=True, text=True)
+    except (FileNotFoundError, OSError) as e:
+        raise GitError(f"git not available: {e}") from e
+    if r.returncode != 0:
+        raise GitError(f"git {' '.join(args)}: {r.stderr.strip()}")
+    return r.stdout
+
+
+class CatFileBatch:
+    """One `git cat-file --batch` process serving many object reads.
+
+        with CatFileBatch() as git:
+            base = git.read("origin/main:serve.py")          # bytes or None
+            blobs = git.read_many([":a.py", ":b.py"])        # staged versions
+    """
+
+    def __init__(self, repo: str = "."):
+        self.repo = repo
+        try:
+            self._proc = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=repo, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except (FileNotFoundError, OSError) as e:
+            raise GitError(f"git not available: {e}") from e
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "CatFileBatch":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read_response(self) -> Optional[bytes]:
+        header = self._proc.stdout.readline()
+        if not header:
+            raise GitError("git cat-file exited unexpectedly")
+        # "<spec> missing" echoes the spec, which may itself contain spaces
+        parts = header.split()
+        if parts[-1] in (b"missing", b"ambiguous"):
+            return None
+        size = int(parts[2])
+        data = self._proc.stdout.read(size)
+        self._proc.stdout.read(1)        # trailing LF
+        return data if parts[1] == b"blob" else None
+
+    def read(self, spec: str) -> Optional[bytes]:
+        """Content of one object (`rev:path`, `:path` for the index, or a
+        sha). None if it does not exist or is not a blob.
+        """
+        with self._lock:
+            self._proc.stdin.write(spec.encode() + b"\n")
+            self._proc.stdin.flush()
+            return self._read_response()
+
+    def read_many(self, specs: Iterable[str]) -> dict[str, Optional[bytes]]:
+        """Pipelined bulk read: all requests are written by a feeder thread
+        while responses are consumed here, so large batches cannot deadlock
+        on full pipes.
+        """
+        specs = list(specs)
+        if not specs:
+            return {}
+
+        def feed():
+            try:
+                for spec in specs:
+                    self._proc.stdin.write(spec.encode() + b"\n")
+                self._proc.stdin.flush()
+            except (BrokenPipeError, OSError):
+                pass
+
+        with self._lock:
+            feeder = threading.Thread(target=feed, daemon=True)
+            feeder.start()
+            out = {spec: self._read_response() for spec in specs}
+            feeder.join()
+        return out
+
+    def close(self):
+        if self._proc.poll() is None:
+            try:
+                self._proc.stdin.close()
+                self._proc.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self._proc.kill()
+
+
+# ---------------------------------------------------------------------------
+# Refs and changed files
+# ---------------------------------------------------------------------------
+
+def resolve_base(repo: str = ".", head: str = "HEAD") -> Optional[str]:
+    """Merge base of HEAD with the PR base branch (GITHUB_BASE_REF or
+    DIFF_BASE), falling back to origin/main, origin/master.
+    """
+    candidates = []
+    explicit = os.environ.get("DIFF_BASE") or os.environ.get("GITHUB_BASE_REF")
+    if explicit:
+        candidates += [f"origin/{explicit}", explicit]
+    candidates += ["origin/main", "origin/master"]
+    for ref in candidates:
+        try:
+            return run_git(["merge-base", ref, head], repo).strip()
+        except GitError:
+            continue
+    return None
+
+
+def changed_files(base: str, repo: str = ".", head: Optional[str] = None) -> dict[str, Optional[str]]:
+    """Changed paths between `base` and `head` (working tree if None), as
+    new path → old path (None for added files). Renames are followed.
+    """
+    args = ["diff", "--name-status", "-M", "-z", base]
+    if head:
+        args.append(head)
+    fields = run_git(args, repo).split("\0")
+    out: dict[str, Optional[str]] = {}
+    i = 0
+    while i < len(fields) and fields[i]:
+        status = fields[i]
+        if status[0] in "RC":
+            out[fields[i + 2]] = fields[i + 1]
+            i += 3
+            continue
+        path = fields[i + 1]
+        if status[0] == "A":
+            out[path] = None
+        elif status[0] != "D":
+            out[path] = path
+        i += 2
+    return out
+
+
+def staged_files(repo: str = ".") -> list[str]:
+    """Paths added, copied, modified or renamed in the index (repo-relative)."""
+    out = run_git(["diff", "--cached", "--name-only", "-z", "--diff-filter=ACMR"], repo)
+    return [p for p in out.split("\0") if p]
+
+
+def tracked_files(pattern: str = "*.py", repo: str = ".") -> list[str]:
+    """Paths in the index matching `pattern` (as staged, not the working tree)."""
+    out = run_git(["ls-files", "-z", "--", pattern], repo)
+    return [p for p in out.split("\0") if p]
+
+
+def revision_files(rev: str, suffix: str = ".py", repo: str = ".") -> list[str]:
+    """Paths ending in `suffix` in the tree of commit `rev` (repo-relative)."""
+    out = run_git(["ls-tree", "-r", "-z", "--name-only", rev], repo)
+    return [p for p in out.split("\0") if p.endswith(suffix)]
@@ -11,6 +11,7 @@ No heavy dependencies — uses nvidia-smi CLI only.
 import hashlib
 import json
 import os
+import platform
 import re
 import subprocess
 from dataclasses import asdict, dataclass
@@ -21,31 +22,109 @@ from typing import Optional
 # Known GPU architecture profiles (from hardware_profiles.md)
 # ---------------------------------------------------------------------------
 
-KNOWN_GPUS = {
-    # Blackwell
-    "rtx 5090": {"arch": "blackwell", "sm": 120, "vram_gb": 32, "tdp_w": 575, "idle_w": 22},
-    "rtx 5080": {"arch": "blackwell", "sm": 120, "vram_gb": 16, "tdp_w": 360, "idle_w": 18},
-    # Ada Lovelace
-    "rtx 4090": {"arch": "ada", "sm": 89, "vram_gb": 24, "tdp_w": 450, "idle_w": 17},
-    "rtx 4090d": {"arch": "ada", "sm": 89, "vram_gb": 24, "tdp_w": 425, "idle_w": 17},
-    "rtx 4080": {"arch": "ada", "sm": 89, "vram_gb": 16, "tdp_w": 320, "idle_w": 15},
-    "rtx 4070": {"arch": "ada", "sm": 89, "vram_gb": 12, "tdp_w": 200, "idle_w": 12},
-    # Ampere
-    "a800": {"arch": "ampere", "sm": 80, "vram_gb": 80, "tdp_w": 400, "idle_w": 65},
-    "a100": {"arch": "ampere", "sm": 80, "vram_gb": 80, "tdp_w": 400, "idle_w": 65},
-    "a6000": {"arch": "ampere", "sm": 86, "vram_gb": 48, "tdp_w": 300, "idle_w": 25},
-    "rtx 3090": {"arch": "ampere", "sm": 86, "vram_gb": 24, "tdp_w": 350, "idle_w": 20},
-    "rtx 3080": {"arch": "ampere", "sm": 86, "vram_gb": 10, "tdp_w": 320, "idle_w": 18},
-    # Hopper
-    "h100": {"arch": "hopper", "sm": 90, "vram_gb": 80, "tdp_w": 700, "idle_w": 70},
-    "h200": {"arch": "hopper", "sm": 90, "vram_gb": 141, "tdp_w": 700, "idle_w": 70},
-    # Volta
-    "v100": {"arch": "volta", "sm": 70, "vram_gb": 32, "tdp_w": 300, "idle_w": 40},
-    # Cloud GPUs
-    "t4": {"arch": "turing", "sm": 75, "vram_gb": 16, "tdp_w": 70, "idle_w": 10},
-    "l4": {"arch": "ada", "sm": 89, "vram_gb": 24, "tdp_w": 72, "idle_w": 12},
-    "l40s": {"arch": "ada", "sm": 89, "vram_gb": 48, "tdp_w": 350, "idle_w": 30},
-}
+# Profiles live in gpu_profiles.json next to this module. A repo can add or
+# replace entries with .ecocompute/gpu_profiles.json (or a path in
+# GPU_PROFILES, os.pathsep-separated); later files win by name.
+PROFILES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gpu_profiles.json")
+REPO_PROFILES_FILE = ".ecocompute/gpu_profiles.json"
+
+_TOKEN = re.compile(r'[a-z]+|\d+')
+
+
+def normalize_gpu_name(name: str) -> tuple[str, ...]:
+    """Lowercase tokens with letters and digits split apart, so
+    "RTX4090D", "rtx 4090d" and "RTX 4090 D" all become (rtx, 4090, d).
+    """
+    return tuple(_TOKEN.findall(name.lower()))
+
+
+class GpuProfileIndex:
+    """Token trie over profile names and aliases.
+
+    Lookup tries every start position in the GPU name and keeps the longest
+    token match, so "RTX 4090 D" resolves to "rtx 4090d" rather than
+    "rtx 4090", and "L40S" never matches "l4". Independent of file order.
+    """
+
+    def __init__(self, profiles: dict[str, dict]):
+        self.profiles = profiles
+        self._trie: dict = {}
+        for key, profile in profiles.items():
+            for alias in [key] + list(profile.get("aliases", [])):
+                node = self._trie
+                for token in normalize_gpu_name(alias):
+                    node = node.setdefault(token, {})
+                node[None] = key           # terminal marker
+
+    def lookup(self, gpu_name: str) -> Optional[tuple[str, dict]]:
+        tokens = normalize_gpu_name(gpu_name)
+        best_key, best_len = None, 0
+        for start in range(len(tokens)):
+            node = self._trie
+            for depth, token in enumerate(tokens[start:], 1):
+                node = node.get(token)
+                if node is None:
+                    break
+                if None in node and depth > best_len:
+                    best_key, best_len = node[None], depth
+        if best_key is None:
+            return None
+        return best_key, self.profiles[best_key]
+
+
+def _profile_paths() -> list[str]:
+    workspace = os.environ.get("GITHUB_WORKSPACE", ".")
+    paths = [PROFILES_FILE, os.path.join(workspace, REPO_PROFILES_FILE)]
+    extra = os.environ.get("GPU_PROFILES", "")
+    paths += [os.path.join(workspace, p) for p in extra.split(os.pathsep) if p]
+    return paths
+
+
+def load_gpu_profiles(paths: Optional[list[str]] = None) -> dict[str, dict]:
+    """Merge profile files in order; missing files are skipped."""
+    profiles: dict[str, dict] = {}
+    for path in paths if paths is not None else _profile_paths():
+        if not os.path.isfile(path):
+            continue
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"  Warning: Could not load GPU profiles from {path}: {e}")
+            continue
+        for entry in data.get("profiles", []):
+            if not isinstance(entry, dict) or not entry.get("name") or not entry.get("arch"):
+                print(f"  Warning: GPU profile in {path} needs 'name' and 'arch' — skipped")
+                continue
+            entry = dict(entry)
+            profiles[str(entry.pop("name")).lower()] = entry
+    return profiles
+
+
+_profile_index: Optional[GpuProfileIndex] = None
+
+
+def get_profile_index() -> GpuProfileIndex:
+    """The process-wide profile index, built on first use."""
+    global _profile_index
+    if _profile_index is None:
+        _profile_index = GpuProfileIndex(load_gpu_profiles())
+    return _profile_index
+
+
+def reload_profiles(paths: Optional[list[str]] = None) -> GpuProfileIndex:
+    """Rebuild the index, e.g. after changing GITHUB_WORKSPACE or GPU_PROFILES."""
+    global _profile_index
+    _profile_index = GpuProfileIndex(load_gpu_profiles(paths))
+    return _profile_index
+
+
+def __getattr__(name: str):
+    # KNOWN_GPUS used to be a literal dict here; keep it importable
+    if name == "KNOWN_GPUS":
+        return get_profile_index().profiles
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Cross-architecture energy scaling factors (relative to RTX 4090D FP16 baseline)
 # Derived from paradox_data.md: Mistral-7B FP16, BS=1
@@ -72,6 +151,8 @@ class HardwareInfo:
     idle_w: int = 0
     energy_scale: float = 1.0
     hardware_hash: str = ""
+    cpu_name: str = "Unknown"
+    cpu_count: int = 0
 
     def to_dict(self) -> dict:
         return asdict(self)
@@ -81,9 +162,59 @@ class HardwareInfo:
         return cls(**{k: v for k, v in d.items() if k in cls.__dataclass_fields__})
 
 
+def detect_cpu() -> tuple[str, int]:
+    """CPU model name and usable core count (no subprocess)."""
+    name = ""
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    name = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    name = name or platform.processor() or platform.machine() or "Unknown"
+    try:
+        count = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        count = os.cpu_count() or 0
+    return name, count
+
+
+def match_profile(gpu_name: str) -> Optional[tuple[str, dict]]:
+    """(key, profile) of the longest-matching known GPU, or None."""
+    return get_profile_index().lookup(gpu_name)
+
+
+def apply_profile(info: HardwareInfo) -> HardwareInfo:
+    """Fill architecture/TDP/idle/energy scale from the matching profile."""
+    match = match_profile(info.gpu_name)
+    if match is not None:
+        _, profile = match
+        info.architecture = profile["arch"]
+        info.known_profile = True
+        info.tdp_w = profile["tdp_w"]
+        info.idle_w = profile["idle_w"]
+        info.energy_scale = ARCH_ENERGY_SCALE.get(profile["arch"], 1.0)
+    return info
+
+
+def hardware_for_profile(gpu_name: str, gpu_count: int = 1) -> HardwareInfo:
+    """HardwareInfo for a GPU that is not attached (planning, simulation),
+    e.g. `hardware_for_profile("h100")`. VRAM comes from the profile.
+    """
+    info = apply_profile(HardwareInfo(gpu_name=gpu_name, gpu_count=gpu_count))
+    match = match_profile(gpu_name)
+    if match is not None:
+        info.vram_total_mb = int(match[1]["vram_gb"] * 1024)
+    info.hardware_hash = hashlib.md5(f"profile|{gpu_name}".encode()).hexdigest()[:12]
+    return info
+
+
 def detect_gpu() -> HardwareInfo:
     """Detect GPU hardware using nvidia-smi. Returns HardwareInfo."""
     info = HardwareInfo()
+    info.cpu_name, info.cpu_count = detect_cpu()
 
     # Try nvidia-smi --query-gpu
     try:
@@ -132,23 +263,38 @@ def detect_gpu() -> HardwareInfo:
             pass
 
     # Match against known GPU profiles
-    gpu_lower = info.gpu_name.lower()
-    for key, profile in KNOWN_GPUS.items():
-        if key in gpu_lower:
-            info.architecture = profile["arch"]
-            info.known_profile = True
-            info.tdp_w = profile["tdp_w"]
-            info.idle_w = profile["idle_w"]
-            info.energy_scale = ARCH_ENERGY_SCALE.get(profile["arch"], 1.0)
-            break
-
-    # Generate hardware hash for cache isolation
+    apply_profile(info)
+
+    # Generate hardware hash for cache isolation. GPU-less runners are told
+    # apart by CPU, since their baselines come from the CPU benchmark.
     hash_input = f"{info.gpu_name}|{info.driver_version}|{info.vram_total_mb}"
+    if info.gpu_count == 0:
+        hash_input += f"|{info.cpu_name}|{info.cpu_count}"
     info.hardware_hash = hashlib.md5(hash_input.encode()).hexdigest()[:12]
 
     return info
 
 
+def read_gpu_telemetry(gpu_index: int = 0) -> Optional[dict[str, float]]:
+    """Current SM clock (MHz) and temperature (°C) of one GPU, for steady-state
+    detection during calibration. None without nvidia-smi.
+    """
+    try:
+        result = subprocess.run(
+            [
+                "nvidia-smi", f"--id={gpu_index}",
+                "--query-gpu=clocks.sm,temperature.gpu",
+                "--format=csv,noheader,nounits",
+            ],
+            capture_output=True, text=True, check=True, timeout=2,
+        )
+        clock, temp = (float(p) for p in result.stdout.strip().split(',')[:2])
+    except (subprocess.CalledProcessError, FileNotFoundError,
+            subprocess.TimeoutExpired, ValueError):
+        return None
+    return {"clock_mhz": clock, "temp_c": temp}
+
+
 def format_hardware_section(info: HardwareInfo) -> str:
     """Format hardware info as Markdown section for the audit report."""
     lines = []
@@ -157,8 +303,9 @@ def format_hardware_section(info: HardwareInfo) -> str:
 
     if info.gpu_count == 0:
         lines.append(
-            "> ⚠️ **No GPU detected.** Energy measurement requires NVIDIA GPU. "
-            "This run uses static analysis + estimation only."
+            "> ⚠️ **No GPU detected.** GPU energy measurement requires an NVIDIA GPU. "
+            f"CPU: {info.cpu_name} ({info.cpu_count} cores), hash `{info.hardware_hash}`. "
+            "Calibration, if enabled, uses the CPU (NumPy) benchmark."
         )
         return '\n'.join(lines)
 
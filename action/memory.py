@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+EcoCompute — VRAM Footprint Estimator
+
+Predicts peak GPU memory for an inference configuration so the audit can say
+whether a model fits the detected GPU and how much batch headroom is left
+idle:
+
+    weights      params × bytes/param (fp16/bf16, int8, nf4, fp32); embeddings
+                 and lm_head stay FP16 under bitsandbytes quantization
+    KV cache     2 × layers × kv_heads × head_dim × 2 B × batch × (in + out)
+    activations  prefill logits (FP32, batch × input × vocab) + MLP workspace
+    overhead     allocator / quantization workspace, fitted to the A800 run
+
+Calibrated against the batch-size experiment (A800, Mistral-7B Pure INT8,
+256 in + 256 out tokens, `peak_memory_gb` from torch.cuda.max_memory_allocated):
+
+    python memory.py   # prints estimate vs measured peak per batch size
+"""
+
+import csv
+import math
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+
+GIB = 1024 ** 3
+
+# Bytes per weight. NF4 includes the double-quantized absmax constants.
+DTYPE_BYTES = {
+    "fp32": 4.0,
+    "fp16": 2.0,
+    "bf16": 2.0,
+    "int8": 1.0,
+    "int8_default": 1.0,
+    "int8_pure": 1.0,
+    "nf4": 0.516,
+    "int4": 0.5,
+}
+
+KV_BYTES = 2          # KV cache is kept in the compute dtype (FP16)
+LOGIT_BYTES = 4       # HF generate upcasts prefill logits to FP32
+
+# Fixed allocator/quantization workspace. Fitted so the Mistral-7B Pure INT8
+# BS=1 estimate matches the measured 8.376 GiB peak (batch_size_experiment).
+RUNTIME_OVERHEAD_GB = 1.29
+
+DEFAULT_INPUT_LEN = 256
+DEFAULT_OUTPUT_LEN = 256
+
+
+@dataclass
+class ModelGeometry:
+    """Transformer shape needed for KV-cache and activation sizing."""
+    name: str
+    params_b: float
+    layers: int
+    hidden: int
+    intermediate: int
+    kv_heads: int
+    head_dim: int
+    vocab: int
+
+
+# Reference shapes; other sizes use the nearest one by parameter count
+GEOMETRIES = [
+    ModelGeometry("Qwen2-0.5B", 0.5, 24, 896, 4864, 2, 64, 151936),
+    ModelGeometry("TinyLlama-1.1B", 1.1, 22, 2048, 5632, 4, 64, 32000),
+    ModelGeometry("Qwen2-1.5B", 1.5, 28, 1536, 8960, 2, 128, 151936),
+    ModelGeometry("Phi-2", 2.7, 32, 2560, 10240, 32, 80, 51200),
+    ModelGeometry("Phi-3-mini", 3.8, 32, 3072, 8192, 32, 96, 32064),
+    ModelGeometry("Mistral-7B", 7.24, 32, 4096, 14336, 8, 128, 32000),
+    ModelGeometry("Llama-3-8B", 8.03, 32, 4096, 14336, 8, 128, 128256),
+    ModelGeometry("Llama-2-13B", 13.0, 40, 5120, 13824, 40, 128, 32000),
+    ModelGeometry("CodeLlama-34B", 34.0, 48, 8192, 22016, 8, 128, 32000),
+    ModelGeometry("Llama-2-70B", 69.0, 80, 8192, 28672, 8, 128, 32000),
+]
+
+# Model ids that do not carry their size in the name
+NAMED_SIZES = [
+    (r'[Tt]iny[Ll]lama', 1.1),
+    (r'[Pp]hi-?3-?mini', 3.8),
+    (r'[Pp]hi-?2', 2.7),
+    (r'gpt2-xl', 1.5),
+    (r'gpt2-large', 0.774),
+    (r'gpt2-medium', 0.355),
+    (r'[Gg][Pp][Tt]-?2', 0.124),
+]
+
+_SIZE_IN_NAME = re.compile(r'(?<![\w.])(?:(\d+)x)?(\d+(?:\.\d+)?)\s*([BbMm])(?![a-zA-Z])')
+
+
+@dataclass
+class MemoryEstimate:
+    """Peak VRAM split, in GiB."""
+    weights_gb: float
+    kv_cache_gb: float
+    activations_gb: float
+    overhead_gb: float
+    batch_size: int
+    geometry: str = ""
+
+    @property
+    def total_gb(self) -> float:
+        return self.weights_gb + self.kv_cache_gb + self.activations_gb + self.overhead_gb
+
+
+def parse_model_params_b(model_id: str) -> Optional[float]:
+    """Parameter count (billions) from a model id like `mistralai/Mistral-7B-v0.1`,
+    `Qwen/Qwen2-0.5B` or `facebook/opt-350m`. None if it cannot be inferred.
+    """
+    name = model_id.split('/')[-1]
+    for m in _SIZE_IN_NAME.finditer(name):
+        experts, size, unit = m.groups()
+        value = float(size) * (int(experts) if experts else 1)
+        return value / 1000 if unit in "Mm" else value
+    for pattern, size in NAMED_SIZES:
+        if re.search(pattern, name):
+            return size
+    return None
+
+
+def geometry_for(params_b: float) -> ModelGeometry:
+    """Nearest reference geometry (log distance), carrying the real size."""
+    nearest = min(GEOMETRIES, key=lambda g: abs(math.log(g.params_b / params_b)))
+    return ModelGeometry(
+        nearest.name, params_b, nearest.layers, nearest.hidden,
+        nearest.intermediate, nearest.kv_heads, nearest.head_dim, nearest.vocab,
+    )
+
+
+def estimate_memory(
+    model_params_b: float,
+    quantization: str = "fp16",
+    batch_size: int = 1,
+    input_len: int = DEFAULT_INPUT_LEN,
+    output_len: int = DEFAULT_OUTPUT_LEN,
+    geometry: Optional[ModelGeometry] = None,
+) -> MemoryEstimate:
+    """Peak VRAM for one `generate` call at the given batch and lengths."""
+    geo = geometry or geometry_for(model_params_b)
+    bytes_per_param = DTYPE_BYTES.get(quantization, 2.0)
+
+    params = model_params_b * 1e9
+    embed_params = min(2 * geo.vocab * geo.hidden, params)
+    if bytes_per_param < 2.0:
+        # bitsandbytes leaves embeddings and lm_head unquantized
+        weights = (params - embed_params) * bytes_per_param + embed_params * 2.0
+    else:
+        weights = params * bytes_per_param
+
+    seq = input_len + output_len
+    kv = 2 * geo.layers * geo.kv_heads * geo.head_dim * KV_BYTES * batch_size * seq
+    activations = batch_size * input_len * (
+        geo.vocab * LOGIT_BYTES + geo.intermediate * KV_BYTES
+    )
+
+    return MemoryEstimate(
+        weights_gb=weights / GIB,
+        kv_cache_gb=kv / GIB,
+        activations_gb=activations / GIB,
+        overhead_gb=RUNTIME_OVERHEAD_GB,
+        batch_size=batch_size,
+        geometry=geo.name,
+    )
+
+
+def autograd_activations_gb(
+    model_params_b: float,
+    batch_size: int = 1,
+    seq_len: int = DEFAULT_INPUT_LEN,
+    geometry: Optional[ModelGeometry] = None,
+) -> float:
+    """Activations a forward pass keeps for backward when gradients are on.
+
+    Per layer s·b·h·(34 + 5·a·s/h) bytes at 16-bit (Korthikanti et al. 2022,
+    no recomputation): inference under no_grad/inference_mode frees them as
+    it goes.
+    """
+    geo = geometry or geometry_for(model_params_b)
+    heads = geo.hidden // geo.head_dim
+    per_layer = seq_len * batch_size * geo.hidden * (34 + 5 * heads * seq_len / geo.hidden)
+    return geo.layers * per_layer / GIB
+
+
+def max_batch_size(
+    model_params_b: float,
+    quantization: str,
+    vram_gb: float,
+    input_len: int = DEFAULT_INPUT_LEN,
+    output_len: int = DEFAULT_OUTPUT_LEN,
+    headroom: float = 0.9,
+    extra_gb_per_request: float = 0.0,
+) -> int:
+    """Largest batch whose estimated peak fits in `headroom × vram_gb`.
+    0 means the model does not fit even at BS=1. `extra_gb_per_request` adds
+    memory that grows with the batch (e.g. activations kept for autograd).
+    """
+    one = estimate_memory(model_params_b, quantization, 1, input_len, output_len)
+    fixed = one.weights_gb + one.overhead_gb
+    per_request = one.kv_cache_gb + one.activations_gb + extra_gb_per_request
+    budget = vram_gb * headroom - fixed
+    if budget < per_request:
+        return 0
+    return int(budget // per_request)
+
+
+def largest_power_of_two(n: int) -> int:
+    """Round a batch size down to the power of two people actually configure."""
+    return 1 << (n.bit_length() - 1) if n > 0 else 0
+
+
+# ---------------------------------------------------------------------------
+# Calibration check against recorded peaks
+# ---------------------------------------------------------------------------
+
+BATCH_EXPERIMENT_DIR = Path(__file__).resolve().parent.parent / "metadata" / "batch_size_experiment"
+
+
+def load_peak_memory(csv_path: Optional[str] = None) -> dict[int, float]:
+    """batch_size → peak_memory_gb from a batch-size experiment raw CSV."""
+    if csv_path is None:
+        matches = sorted(BATCH_EXPERIMENT_DIR.glob("*_raw_*.csv"))
+        if not matches:
+            return {}
+        csv_path = str(matches[-1])
+    peaks: dict[int, float] = {}
+    with open(csv_path, newline='') as f:
+        for row in csv.DictReader(f):
+            bs = int(row["batch_size"])
+            peaks[bs] = max(peaks.get(bs, 0.0), float(row["peak_memory_gb"]))
+    return peaks
+
+
+if __name__ == "__main__":
+    peaks = load_peak_memory()
+    print("Mistral-7B Pure INT8, 256+256 tokens (A800)")
+    print(f"{'BS':>4} {'measured':>9} {'estimate':>9} {'error':>7}")
+    for bs, measured in sorted(peaks.items()):
+        est = estimate_memory(7.24, "int8_pure", bs).total_gb
+        print(f"{bs:>4} {measured:>8.2f}G {est:>8.2f}G {(est - measured) / measured * 100:>+6.1f}%")
+    print(f"Max batch on 80 GB: {max_batch_size(7.24, 'int8_pure', 80)}")
@@ -0,0 +1,605 @@
+#!/usr/bin/env python3
+"""
+EcoCompute — Power Sources
+
+Where watts come from. Calibration, the runtime profiler and the exporter read
+power through this small interface, so sources can be combined and tests can
+substitute a deterministic fake or a recorded trace.
+
+Sources:
+- NvidiaSmiPowerSource — GPU board power (nvidia-smi power.draw)
+- RaplPowerSource      — CPU package energy counters via Linux powercap
+                         (/sys/class/powercap/intel-rapl:*, also used by AMD),
+                         with counter wraparound handling
+- FileReplaySource     — replays a recorded `timestamp,watts` CSV
+- FakePowerSource      — constant / scripted values
+- CompositePowerSource — sums several sources (e.g. CPU package + GPU)
+
+`PowerTrace` stores what was read: a fixed-size ring buffer of
+(timestamp, watts) samples with trapezoidal energy integration and a
+compact percentile summary.
+
+`default_power_source()` picks whatever is available on this host, so CPU-side
+tokenization/batching energy is counted alongside the GPU.
+
+No heavy dependencies — reads sysfs and the nvidia-smi CLI only.
+"""
+
+import bisect
+import csv
+import math
+import os
+import subprocess
+import threading
+import time
+from array import array
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Optional, Sequence, Union
+
+
+class PowerSource:
+    """Base class: a readable instantaneous power value in watts."""
+    name = "none"
+    domain = "gpu"          # "gpu", "cpu", or "cpu+gpu" for a composite
+
+    def available(self) -> bool:
+        return self.read_watts() is not None
+
+    def read_watts(self) -> Optional[float]:
+        """Current power draw in watts, or None if unavailable."""
+        return None
+
+    def close(self):
+        """Release any background process/thread."""
+
+
+# ---------------------------------------------------------------------------
+# NVIDIA (nvidia-smi)
+# ---------------------------------------------------------------------------
+
+POWER_QUERY = ["nvidia-smi", "--query-gpu=power.draw", "--format=csv,noheader,nounits"]
+STREAM_QUERY = ["nvidia-smi", "--query-gpu=index,power.draw", "--format=csv,noheader,nounits"]
+
+
+def _parse_power_lines(text: str, gpu_index: Optional[int]) -> Optional[float]:
+    values: list[Optional[float]] = []
+    for line in text.strip().split('\n'):
+        try:
+            values.append(float(line.strip()))
+        except ValueError:
+            values.append(None)  # "[N/A]" on GPUs without power telemetry
+    if gpu_index is None:
+        readings = [v for v in values if v is not None]
+        return sum(readings) if readings else None
+    return values[gpu_index] if gpu_index < len(values) else None
+
+
+class NvidiaSmiPowerSource(PowerSource):
+    """GPU board power via `nvidia-smi --query-gpu=power.draw`.
+
+    gpu_index=None sums all GPUs. With stream_interval_ms set, one long-lived
+    `nvidia-smi -lms` process feeds readings instead of a subprocess per read,
+    which keeps high-rate sampling cheap.
+    """
+    name = "nvidia-smi"
+    domain = "gpu"
+
+    def __init__(self, gpu_index: Optional[int] = 0, stream_interval_ms: Optional[int] = None):
+        self.gpu_index = gpu_index
+        self.stream_interval_ms = stream_interval_ms
+        self._proc: Optional[subprocess.Popen] = None
+        self._latest: Optional[float] = None
+        self._reader: Optional[threading.Thread] = None
+
+    def read_watts(self) -> Optional[float]:
+        if self.stream_interval_ms:
+            return self._read_streamed()
+        try:
+            r = subprocess.run(POWER_QUERY, capture_output=True, text=True, timeout=2)
+        except (subprocess.CalledProcessError, FileNotFoundError,
+                subprocess.TimeoutExpired, OSError):
+            return None
+        if r.returncode != 0:
+            return None
+        return _parse_power_lines(r.stdout, self.gpu_index)
+
+    def _read_streamed(self) -> Optional[float]:
+        if self._proc is None:
+            try:
+                self._proc = subprocess.Popen(
+                    STREAM_QUERY + [f"-lms={self.stream_interval_ms}"],
+                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+                )
+            except (FileNotFoundError, OSError):
+                self.stream_interval_ms = None
+                return self.read_watts()
+            self._reader = threading.Thread(target=self._pump, daemon=True)
+            self._reader.start()
+            # First reading arrives after one interval
+            deadline = time.monotonic() + max(1.0, self.stream_interval_ms / 500)
+            while self._latest is None and time.monotonic() < deadline:
+                time.sleep(0.01)
+        return self._latest
+
+    def _pump(self):
+        """Reader thread: `index, power` lines, one per GPU per interval."""
+        per_gpu: dict[int, float] = {}
+        for line in self._proc.stdout:
+            try:
+                index, watts = (float(p) for p in line.split(','))
+            except ValueError:
+                continue
+            per_gpu[int(index)] = watts
+            if self.gpu_index is None:
+                self._latest = sum(per_gpu.values())
+            elif int(index) == self.gpu_index:
+                self._latest = watts
+
+    def close(self):
+        if self._proc is not None:
+            self._proc.terminate()
+            try:
+                self._proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+            self._proc = None
+
+
+# ---------------------------------------------------------------------------
+# Linux RAPL (powercap)
+# ---------------------------------------------------------------------------
+
+POWERCAP_ROOT = "/sys/class/powercap"
+
+
+class RaplPowerSource(PowerSource):
+    """CPU package power from RAPL energy counters.
+
+    Each top-level `intel-rapl:N` zone exposes a cumulative `energy_uj`
+    counter that wraps at `max_energy_range_uj`. The `package-N` zones (one
+    per socket; the AMD driver uses the same layout) are summed. A `psys`
+    (platform) zone already includes the packages, so when it is readable it
+    is used alone instead. Watts are the counter delta between reads divided
+    by elapsed time, so the value is the exact average over that interval
+    rather than an instantaneous spot sample.
+    """
+    name = "rapl"
+    domain = "cpu"
+
+    def __init__(self, root: str = POWERCAP_ROOT):
+        self.zones: list[Path] = []
+        self._max_range: dict[Path, int] = {}
+        self._last: dict[Path, int] = {}
+        self._total_uj = 0
+        self._last_t: Optional[float] = None
+
+        base = Path(root)
+        names: dict[Path, str] = {}
+        if base.is_dir():
+            for zone in sorted(base.glob("intel-rapl:*")):
+                if zone.name.count(":") != 1:
+                    continue  # sub-zones (core/uncore/dram) are inside the package
+                try:
+                    name = (zone / "name").read_text().strip()
+                    max_range = int((zone / "max_energy_range_uj").read_text())
+                    energy = int((zone / "energy_uj").read_text())
+                except (OSError, ValueError):
+                    continue  # energy_uj is root-only on many kernels
+                if name != "psys" and not name.startswith("package-"):
+                    continue
+                names[zone] = name
+                self._max_range[zone] = max_range
+                self._last[zone] = energy
+            psys = [zone for zone, name in names.items() if name == "psys"]
+            self.zones = psys[:1] or list(names)
+        if self.zones:
+            self._last_t = time.perf_counter()
+
+    def available(self) -> bool:
+        return bool(self.zones)
+
+    def read_energy_j(self) -> Optional[float]:
+        """Cumulative package energy since this source was created."""
+        if not self.zones:
+            return None
+        for zone in self.zones:
+            try:
+                now = int((zone / "energy_uj").read_text())
+            except (OSError, ValueError):
+                return None
+            delta = now - self._last[zone]
+            if delta < 0:  # counter wrapped
+                delta += self._max_range[zone]
+            self._total_uj += delta
+            self._last[zone] = now
+        return self._total_uj / 1e6
+
+    def read_watts(self) -> Optional[float]:
+        if not self.zones:
+            return None
+        before = self._total_uj
+        t0 = self._last_t
+        if self.read_energy_j() is None:
+            return None
+        self._last_t = time.perf_counter()
+        dt = self._last_t - t0
+        if dt <= 0:
+            return None
+        return (self._total_uj - before) / 1e6 / dt
+
+
+# ---------------------------------------------------------------------------
+# File replay (tests / reproducing a recorded run)
+# ---------------------------------------------------------------------------
+
+class FileReplaySource(PowerSource):
+    """Replays a recorded power trace: CSV with `timestamp,watts` columns
+    (seconds, any origin). An optional `domain` column keeps rows for one
+    domain only.
+
+    By default each read returns the next sample (deterministic, fast).
+    With realtime=True reads return the trace value at the wall-clock time
+    elapsed since the first read, linearly interpolated.
+    """
+    name = "replay"
+
+    def __init__(self, path: str, domain: str = "gpu", realtime: bool = False, loop: bool = True):
+        self.path = path
+        self.domain = domain
+        self.realtime = realtime
+        self.loop = loop
+        self.times: list[float] = []
+        self.watts: list[float] = []
+        self._index = 0
+        self._t0: Optional[float] = None
+
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                if row.get("domain") and row["domain"] != domain:
+                    continue
+                try:
+                    self.times.append(float(row["timestamp"]))
+                    self.watts.append(float(row["watts"]))
+                except (KeyError, ValueError):
+                    continue
+
+    def read_watts(self) -> Optional[float]:
+        if not self.watts:
+            return None
+        if not self.realtime:
+            if self._index >= len(self.watts):
+                if not self.loop:
+                    return None
+                self._index = 0
+            value = self.watts[self._index]
+            self._index += 1
+            return value
+
+        if self._t0 is None:
+            self._t0 = time.perf_counter()
+        span = self.times[-1] - self.times[0]
+        t = self.times[0] + (time.perf_counter() - self._t0)
+        if t > self.times[-1]:
+            if not self.loop or span <= 0:
+                return None if not self.loop else self.watts[-1]
+            t = self.times[0] + (t - self.times[0]) % span
+        i = bisect.bisect_right(self.times, t)
+        if i <= 0:
+            return self.watts[0]
+        if i >= len(self.times):
+            return self.watts[-1]
+        t0, t1 = self.times[i - 1], self.times[i]
+        w0, w1 = self.watts[i - 1], self.watts[i]
+        return w0 if t1 == t0 else w0 + (w1 - w0) * (t - t0) / (t1 - t0)
+
+
+# ---------------------------------------------------------------------------
+# Fake source (tests / dry runs)
+# ---------------------------------------------------------------------------
+
+class FakePowerSource(PowerSource):
+    """Deterministic power for tests.
+
+    `watts` may be a constant, a sequence (cycled through, one value per
+    read) or a callable of elapsed seconds since the source was created.
+    """
+    name = "fake"
+
+    def __init__(self, watts: Union[float, Sequence[float], Callable[[float], float]] = 100.0,
+                 domain: str = "gpu"):
+        self.watts = watts
+        self.domain = domain
+        self._reads = 0
+        self._t0 = time.perf_counter()
+
+    def read_watts(self) -> Optional[float]:
+        if callable(self.watts):
+            return float(self.watts(time.perf_counter() - self._t0))
+        if isinstance(self.watts, (int, float)):
+            return float(self.watts)
+        value = self.watts[self._reads % len(self.watts)]
+        self._reads += 1
+        return float(value)
+
+
+# ---------------------------------------------------------------------------
+# Combination & auto-detection
+# ---------------------------------------------------------------------------
+
+class CompositePowerSource(PowerSource):
+    """Sum of several sources, e.g. CPU package + GPU board power.
+
+    Reads return None only if every source does; `last_by_domain` keeps the
+    latest per-domain split for reporting.
+    """
+    name = "composite"
+
+    def __init__(self, sources: list[PowerSource]):
+        self.sources = sources
+        self.domain = "+".join(sorted({s.domain for s in sources})) or "none"
+        self.last_by_domain: dict[str, float] = {}
+
+    def read_watts(self) -> Optional[float]:
+        total, seen = 0.0, False
+        by_domain: dict[str, float] = {}
+        for source in self.sources:
+            watts = source.read_watts()
+            if watts is None:
+                continue
+            total += watts
+            by_domain[source.domain] = by_domain.get(source.domain, 0.0) + watts
+            seen = True
+        if not seen:
+            return None
+        self.last_by_domain = by_domain
+        return total
+
+    def close(self):
+        for source in self.sources:
+            source.close()
+
+
+def detect_power_sources(powercap_root: str = POWERCAP_ROOT, gpus: int = 1,
+                         stream_interval_ms: Optional[int] = None) -> list[PowerSource]:
+    """All power sources that yield readings on this host.
+
+    By default the GPU source stays on GPU 0, which is where the calibration
+    benchmark runs; idle boards would otherwise inflate its J/TFLOP. `gpus`
+    adds one source per board (GPUs 0..gpus-1), e.g. for the exporter.
+    """
+    found: list[PowerSource] = []
+    for index in range(max(gpus, 1)):
+        gpu = NvidiaSmiPowerSource(index, stream_interval_ms)
+        if gpu.read_watts() is None:
+            gpu.close()
+            continue  # "[N/A]" board, or no nvidia-smi at all
+        found.append(gpu)
+    rapl = RaplPowerSource(powercap_root)
+    if rapl.available():
+        found.append(rapl)
+    return found
+
+
+def default_power_source() -> PowerSource:
+    """The power source calibration and profiling use when none is given.
+
+    ECOCOMPUTE_POWER_REPLAY=<csv> replays a recorded trace. Otherwise every
+    detected source (GPU boards, CPU packages) is combined; with none
+    available, reads simply return None.
+    """
+    replay = os.environ.get("ECOCOMPUTE_POWER_REPLAY")
+    if replay:
+        return FileReplaySource(replay)
+
+    sources = detect_power_sources()
+    if not sources:
+        return PowerSource()
+    if len(sources) == 1:
+        return sources[0]
+    return CompositePowerSource(sources)
+
+
+# ---------------------------------------------------------------------------
+# Sample storage & integration
+# ---------------------------------------------------------------------------
+
+@dataclass
+class PowerSummary:
+    """Compact description of a power trace (stored with the baseline)."""
+    samples: int = 0
+    duration_s: float = 0.0
+    energy_j: float = 0.0
+    mean_w: float = 0.0              # time-weighted: energy / duration
+    min_w: float = 0.0
+    max_w: float = 0.0
+    p05_w: float = 0.0
+    p50_w: float = 0.0
+    p95_w: float = 0.0
+    p99_w: float = 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class PowerTrace:
+    """Fixed-capacity ring buffer of (timestamp, watts) samples.
+
+    Samples live in two `array('d')` columns (16 bytes each), so a long
+    session costs `capacity` × 16 B however long it runs. When the buffer is
+    full the oldest segment's trapezoid is folded into a running total
+    before it is overwritten: `energy_j()` over the whole session stays
+    exact, and windows still in the buffer can be integrated precisely.
+    Every sample also lands in a `bin_w`-watt histogram, which gives
+    session-wide percentiles without keeping samples.
+
+    Energy is trapezoidal over the actual timestamps, so irregular sampling
+    (slow nvidia-smi calls, a busy sampler thread) does not bias it the way
+    a plain average of readings does.
+    """
+
+    def __init__(self, capacity: int = 65536, bin_w: float = 1.0, max_w: float = 5000.0):
+        if capacity < 2:
+            raise ValueError("capacity must be at least 2")
+        self.capacity = capacity
+        self.bin_w = bin_w
+        self._t = array('d', bytes(8 * capacity))
+        self._w = array('d', bytes(8 * capacity))
+        self._start = 0
+        self._len = 0
+        self._evicted_j = 0.0
+        self._first_t: Optional[float] = None
+        self._hist = array('Q', bytes(8 * (int(max_w / bin_w) + 1)))
+        self.count = 0
+        self.min_w = math.inf
+        self.max_w = -math.inf
+
+    def __len__(self) -> int:
+        return self._len
+
+    def append(self, watts: float, t: Optional[float] = None):
+        """Add one reading (t defaults to time.perf_counter())."""
+        t = time.perf_counter() if t is None else t
+        cap = self.capacity
+        if self._len == cap:
+            i, j = self._start, (self._start + 1) % cap
+            self._evicted_j += (self._t[j] - self._t[i]) * (self._w[i] + self._w[j]) / 2
+            self._start = j
+            self._len -= 1
+        k = (self._start + self._len) % cap
+        self._t[k] = t
+        self._w[k] = watts
+        self._len += 1
+        if self._first_t is None:
+            self._first_t = t
+
+        self.count += 1
+        self.min_w = min(self.min_w, watts)
+        self.max_w = max(self.max_w, watts)
+        b = min(max(int(watts / self.bin_w), 0), len(self._hist) - 1)
+        self._hist[b] += 1
+
+    def sample(self, source: PowerSource) -> Optional[float]:
+        """Read `source` and append the value (if any)."""
+        watts = source.read_watts()
+        if watts is not None:
+            self.append(watts)
+        return watts
+
+    # -- buffered samples (logical index 0 = oldest) -------------------------
+
+    def _at(self, i: int) -> tuple[float, float]:
+        k = (self._start + i) % self.capacity
+        return self._t[k], self._w[k]
+
+    def _bisect(self, t: float, right: bool) -> int:
+        lo, hi = 0, self._len
+        while lo < hi:
+            mid = (lo + hi) // 2
+            tm = self._at(mid)[0]
+            if tm < t or (right and tm == t):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def samples(self) -> list[tuple[float, float]]:
+        """Buffered (t, watts) pairs, oldest first."""
+        return [self._at(i) for i in range(self._len)]
+
+    @property
+    def first_t(self) -> Optional[float]:
+        return self._first_t
+
+    @property
+    def oldest_t(self) -> Optional[float]:
+        """Timestamp of the oldest sample still in the buffer."""
+        return self._at(0)[0] if self._len else None
+
+    @property
+    def last_t(self) -> Optional[float]:
+        return self._at(self._len - 1)[0] if self._len else None
+
+    def power_at(self, t: float) -> Optional[float]:
+        """Linearly interpolated power at t (held constant beyond the ends)."""
+        if not self._len:
+            return None
+        i = self._bisect(t, right=False)
+        if i <= 0:
+            return self._at(0)[1]
+        if i >= self._len:
+            return self._at(self._len - 1)[1]
+        (t0, w0), (t1, w1) = self._at(i - 1), self._at(i)
+        return w1 if t1 == t0 else w0 + (w1 - w0) * (t - t0) / (t1 - t0)
+
+    def energy_j(self, start: Optional[float] = None, end: Optional[float] = None) -> float:
+        """Trapezoidal joules between two timestamps (default: the whole
+        session). A window from the session start includes the evicted
+        segments' energy; any other window must start within the buffer
+        (ValueError otherwise). Edges are interpolated.
+        """
+        if not self._len:
+            return 0.0
+        start = self._first_t if start is None else start
+        end = self.last_t if end is None else end
+        if end <= start:
+            return 0.0
+
+        total = 0.0
+        oldest = self._at(0)[0]
+        if start < oldest and self._first_t < oldest:       # window reaches evicted samples
+            if start > self._first_t or end < oldest:
+                raise ValueError("window starts or ends in evicted samples; "
+                                 "only windows from the session start include them")
+            total, start = self._evicted_j, oldest
+
+        lo, hi = self._bisect(start, right=True), self._bisect(end, right=False)
+        t0, w0 = start, self.power_at(start)
+        for i in range(lo, hi):
+            t1, w1 = self._at(i)
+            total += (t1 - t0) * (w0 + w1) / 2
+            t0, w0 = t1, w1
+        return total + (end - t0) * (w0 + self.power_at(end)) / 2
+
+    def mean_power_w(self, start: Optional[float] = None, end: Optional[float] = None) -> float:
+        """Time-weighted mean power (same windows as `energy_j`); the single
+        reading if there is only one."""
+        if not self._len:
+            return 0.0
+        start = self._first_t if start is None else start
+        end = self.last_t if end is None else end
+        if end <= start:
+            return self.power_at(end) or 0.0
+        return self.energy_j(start, end) / (end - start)
+
+    def percentile(self, q: float) -> float:
+        """Session-wide percentile (0–100) of readings at histogram
+        resolution: the centre of the `bin_w`-wide bin holding the q-th
+        reading (clamped to min/max), so within ±bin_w/2 of the exact value.
+        """
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for b, n in enumerate(self._hist):
+            seen += n
+            if n and seen >= rank:
+                return min(max((b + 0.5) * self.bin_w, self.min_w), self.max_w)
+        return self.max_w
+
+    def summary(self) -> PowerSummary:
+        if not self.count:
+            return PowerSummary()
+        duration = (self.last_t - self._first_t) if self._len else 0.0
+        return PowerSummary(
+            samples=self.count,
+            duration_s=duration,
+            energy_j=self.energy_j(),
+            mean_w=self.mean_power_w(),
+            min_w=self.min_w,
+            max_w=self.max_w,
+            p05_w=self.percentile(5),
+            p50_w=self.percentile(50),
+            p95_w=self.percentile(95),
+            p99_w=self.percentile(99),
+        )
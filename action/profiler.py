@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+EcoCompute — Runtime Energy Profiler
+
+Measures real inference calls instead of inferring waste from code patterns.
+A background thread samples power from the same sources calibration uses;
+each wrapped call only records two timestamps, and joules are attributed to
+each call by integrating the samples over its window. Samples are kept in a
+fixed-size `PowerTrace` ring buffer and a call is settled as soon as a sample
+past its end arrives: its energy is folded into running per-name totals and
+only the most recent `history` calls are kept as records, so an hours-long
+session uses constant memory.
+
+    profiler = EnergyProfiler()
+    with profiler:
+        with profiler.measure("generate") as call:
+            out = model.generate(**inputs)
+            call.tokens = out.shape[0] * (out.shape[-1] - inputs["input_ids"].shape[-1])
+
+        @profiler.track(name="generate")
+        def run(batch): ...
+
+    print(profiler.report(hw, model_params_b=7.0, quantization="fp16"))
+
+Calls are assumed not to overlap on the same device; concurrent calls are
+each charged the full device power for their window.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from functools import wraps
+from typing import Any, Callable, Iterator, Optional
+
+from power import PowerSource, PowerTrace, default_power_source
+
+
+@dataclass
+class CallRecord:
+    """One measured call. `tokens` may be filled in by the caller."""
+    name: str
+    start: float
+    end: float = 0.0
+    tokens: int = 0
+    joules: Optional[float] = None   # set once the window is integrated
+
+
+@dataclass
+class ProfileStats:
+    """Aggregated energy for all calls with the same name."""
+    name: str
+    calls: int = 0
+    wall_s: float = 0.0
+    joules: float = 0.0
+    tokens: int = 0
+    avg_power_w: float = 0.0
+    j_per_1k_tokens: float = 0.0
+
+
+def _add_call(stats: ProfileStats, record: CallRecord, joules: float):
+    stats.calls += 1
+    stats.wall_s += record.end - record.start
+    stats.joules += joules
+    stats.tokens += record.tokens
+
+
+def count_generated_tokens(args: tuple, kwargs: dict, result: Any) -> int:
+    """Best-effort token count for `model.generate`-style calls.
+
+    Uses `result.sequences` or `result` as a (batch, seq) tensor and subtracts
+    the prompt length when `input_ids` is passed. Returns 0 if unknown.
+    """
+    output = getattr(result, "sequences", result)
+    shape = getattr(output, "shape", None)
+    if not shape or len(shape) < 2:
+        return 0
+    batch, total = int(shape[0]), int(shape[-1])
+
+    prompt = kwargs.get("input_ids")
+    if prompt is None and args:
+        prompt = args[0]
+    prompt_shape = getattr(prompt, "shape", None)
+    prompt_len = int(prompt_shape[-1]) if prompt_shape and len(prompt_shape) >= 2 else 0
+    return batch * max(total - prompt_len, 0)
+
+
+class EnergyProfiler:
+    """Background power sampler with per-call energy attribution."""
+
+    def __init__(self, source: Optional[PowerSource] = None, interval_s: float = 0.1,
+                 capacity: int = 65536, history: int = 1024):
+        self.source = source or default_power_source()
+        self._owns_source = source is None      # a caller's source stays open
+        self.interval_s = interval_s
+        self.records: deque[CallRecord] = deque(maxlen=history)   # most recent calls
+        self.trace = PowerTrace(capacity)
+        self._pending: list[CallRecord] = []
+        self._totals: dict[str, ProfileStats] = {}    # settled calls, per name
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # -- sampling -----------------------------------------------------------
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._sample()  # one sample before the first call starts
+        self._thread = threading.Thread(target=self._run, name="ecocompute-power", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._sample()  # close the last window
+        self._settle(final=True)
+        if self._owns_source:
+            self.source.close()
+
+    def __enter__(self) -> "EnergyProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _sample(self):
+        # Read outside the lock (nvidia-smi can be slow); append under it,
+        # since readers integrate the same ring buffer
+        watts = self.source.read_watts()
+        if watts is None:
+            return
+        with self._lock:
+            self.trace.append(watts)
+        self._settle()
+
+    def _settle(self, final: bool = False):
+        """Integrate finished calls whose window is covered by samples,
+        before the ring buffer can overwrite them."""
+        with self._lock:
+            last = self.trace.last_t
+            if last is None or not self._pending:
+                return
+            keep = []
+            for record in self._pending:
+                if final or record.end <= last:
+                    record.joules = self._window_j(record.start, record.end)
+                    _add_call(self._totals.setdefault(record.name, ProfileStats(name=record.name)),
+                              record, record.joules)
+                else:
+                    keep.append(record)
+            self._pending = keep
+
+    def _finish(self, record: CallRecord):
+        with self._lock:
+            self.records.append(record)
+            self._pending.append(record)
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            self._sample()
+
+    # -- instrumentation ----------------------------------------------------
+
+    @contextmanager
+    def measure(self, name: str = "call", tokens: int = 0) -> Iterator[CallRecord]:
+        """Time one call. Set `record.tokens` inside the block if not known upfront."""
+        record = CallRecord(name=name, start=time.perf_counter(), tokens=tokens)
+        try:
+            yield record
+        finally:
+            record.end = time.perf_counter()
+            self._finish(record)
+
+    def track(self, fn: Optional[Callable] = None, *, name: Optional[str] = None,
+              count_tokens: Optional[Callable[[tuple, dict, Any], int]] = None):
+        """Decorator form of `measure`. Token count defaults to
+        `count_generated_tokens(args, kwargs, result)`.
+        """
+        counter = count_tokens or count_generated_tokens
+
+        def decorate(func: Callable) -> Callable:
+            label = name or getattr(func, "__qualname__", "call")
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                record = CallRecord(name=label, start=time.perf_counter())
+                try:
+                    result = func(*args, **kwargs)
+                    record.end = time.perf_counter()
+                    record.tokens = counter(args, kwargs, result)
+                    return result
+                finally:
+                    # A call that raised still drew power, as in `measure`
+                    record.end = record.end or time.perf_counter()
+                    self._finish(record)
+            return wrapper
+
+        return decorate(fn) if fn is not None else decorate
+
+    # -- attribution --------------------------------------------------------
+
+    def _window_j(self, start: float, end: float) -> float:
+        # Caller holds the lock
+        try:
+            return self.trace.energy_j(start, end)
+        except ValueError:
+            # Started before the oldest buffered sample (a call longer than
+            # the buffer): charge the buffered part's mean power throughout
+            return self.trace.mean_power_w(self.trace.oldest_t, end) * (end - start)
+
+    def energy_between(self, start: float, end: float) -> float:
+        """Joules between two perf_counter timestamps (trapezoidal)."""
+        with self._lock:
+            return self._window_j(start, end)
+
+    def call_joules(self, record: CallRecord) -> float:
+        """Energy of one call: the settled value, or integrated now."""
+        if record.joules is None:
+            return self.energy_between(record.start, record.end)
+        return record.joules
+
+    def stats(self) -> dict[str, ProfileStats]:
+        """Per-name totals over the whole session (not just `records`):
+        calls, wall time, joules, tokens, J/1k tokens. Calls not settled yet
+        are integrated over the samples so far.
+        """
+        with self._lock:
+            out = {name: replace(s) for name, s in self._totals.items()}
+            for record in self._pending:
+                _add_call(out.setdefault(record.name, ProfileStats(name=record.name)),
+                          record, self._window_j(record.start, record.end))
+        for s in out.values():
+            s.avg_power_w = s.joules / s.wall_s if s.wall_s > 0 else 0.0
+            s.j_per_1k_tokens = s.joules / s.tokens * 1000 if s.tokens else 0.0
+        return out
+
+    def report(self, hw=None, model_params_b: float = 7.0,
+               quantization: str = "fp16", batch_size: int = 1) -> str:
+        """Markdown table of measured energy next to the reference estimate
+        (`estimate_energy`, i.e. REFERENCE_ENERGY scaled to this model/GPU).
+        """
+        from calibrate import estimate_energy
+        from hardware import HardwareInfo
+
+        est = estimate_energy(model_params_b, quantization, batch_size, hw or HardwareInfo(),
+                              interval=True)
+        reference = est["energy_j_per_1k_tok"]
+
+        lines = []
+        lines.append("### 🔬 Measured Inference Energy")
+        lines.append("")
+        lines.append("| Call | Calls | Wall (s) | Energy (J) | Avg Power | Tokens | J/1k tok | vs Reference |")
+        lines.append("|------|-------|----------|------------|-----------|--------|----------|--------------|")
+        for s in self.stats().values():
+            if s.j_per_1k_tokens and reference:
+                delta = f"{(s.j_per_1k_tokens - reference) / reference * 100:+.1f}%"
+            else:
+                delta = "—"
+            lines.append(
+                f"| `{s.name}` | {s.calls} | {s.wall_s:.2f} | {s.joules:.1f} | "
+                f"{s.avg_power_w:.0f}W | {s.tokens} | "
+                f"{s.j_per_1k_tokens:.0f} | {delta} |"
+            )
+        lines.append("")
+        ci = ""
+        if "energy_ci_low" in est:
+            ci = (f", {est['ci_confidence']:.0%} CI {est['energy_ci_low']:.0f}–"
+                  f"{est['energy_ci_high']:.0f}")
+        lines.append(
+            f"*Reference: {reference:.0f} J/1k tokens{ci} ({est['reference_key']}, "
+            f"{model_params_b:g}B, BS={batch_size}, confidence {est['confidence']}).*"
+        )
+        lines.append("")
+        return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    from power import FakePowerSource
+
+    profiler = EnergyProfiler(FakePowerSource(150.0), interval_s=0.01)
+    with profiler:
+        for _ in range(3):
+            with profiler.measure("demo", tokens=256):
+                time.sleep(0.05)
+    print(profiler.report())
@@ -0,0 +1,569 @@
+#!/usr/bin/env python3
+"""
+EcoCompute — Project Symbol Index
+
+Maps module-level names (quantization configs, model-ID constants) to their
+definitions across the whole project, so rules can follow
+`from config import bnb_config` into another file instead of seeing each file
+in isolation.
+
+Files are keyed by their path relative to the index root, so findings name
+`pkg/config.py`, not the runner's checkout directory. In CI the index is
+persisted as JSON next to the baseline and refreshed incrementally: a file is
+re-parsed only when its mtime or size changes. Local runs keep it in memory.
+The fast paths never walk the tree: static-only mode indexes the scanned files
+and the project modules they import, and the pre-commit hook indexes staged
+blobs (`index_sources`).
+Resolving a name is a couple of dict lookups per import hop.
+
+No dependencies beyond the standard library (`ast`).
+"""
+
+import ast
+import json
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+
+INDEX_DIR = ".ecocompute"
+INDEX_FILE = "project_index.json"
+INDEX_VERSION = 2              # 2: keys relative to the index root
+
+# Directories never worth indexing
+SKIP_DIRS = {
+    'venv', '.venv', 'node_modules', '__pycache__', '.git',
+    '.tox', '.nox', '.mypy_cache', '.pytest_cache', 'site-packages',
+}
+
+# Hugging Face repo id, e.g. "mistralai/Mistral-7B-Instruct-v0.3"
+MODEL_ID_PATTERN = re.compile(r'^[\w.-]+/[\w.-]+$')
+
+# Re-export chains (`__init__.py` importing from a submodule) are followed at
+# most this many hops
+MAX_RESOLVE_DEPTH = 8
+
+
+@dataclass
+class Symbol:
+    """A module-level definition the rules care about."""
+    name: str
+    file: str
+    line: int
+    kind: str                  # "quant_config", "model_id" or "alias"
+    quant: dict = field(default_factory=dict)  # literal BitsAndBytesConfig kwargs
+    value: str = ""            # model id string, or target name for aliases
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Symbol":
+        return cls(**{k: v for k, v in d.items() if k in cls.__dataclass_fields__})
+
+
+@dataclass
+class CallSite:
+    """A `from_pretrained(...)` call and how its model/config are referenced."""
+    line: int
+    callee: str = ""           # e.g. "AutoModelForCausalLM.from_pretrained"
+    model_name: str = ""       # name passed as the model argument, if a name
+    model_value: str = ""      # string literal passed as the model argument
+    quant_name: str = ""       # name passed as quantization_config=, if a name
+    quant_inline: dict = field(default_factory=dict)  # inline BitsAndBytesConfig kwargs
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "CallSite":
+        return cls(**{k: v for k, v in d.items() if k in cls.__dataclass_fields__})
+
+
+@dataclass
+class FileEntry:
+    """Everything the index remembers about one source file."""
+    module: str
+    mtime_ns: int = 0
+    size: int = 0
+    symbols: dict = field(default_factory=dict)   # name -> Symbol
+    imports: dict = field(default_factory=dict)   # local name -> [module, name or ""]
+    calls: list = field(default_factory=list)     # [CallSite]
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "FileEntry":
+        entry = cls(**{k: v for k, v in d.items() if k in cls.__dataclass_fields__})
+        entry.symbols = {k: Symbol.from_dict(v) for k, v in entry.symbols.items()}
+        entry.calls = [CallSite.from_dict(c) for c in entry.calls]
+        return entry
+
+
+# ---------------------------------------------------------------------------
+# Source analysis
+# ---------------------------------------------------------------------------
+
+def module_name_for(path: str, root: str = ".") -> str:
+    """Dotted module name of `path` relative to the project root."""
+    rel = os.path.relpath(path, root)
+    if rel.endswith(".py"):
+        rel = rel[:-3]
+    parts = [p for p in Path(rel).parts if p not in (".", "")]
+    if parts and parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(parts)
+
+
+def _callee_name(node: ast.AST) -> str:
+    """`a.b.c(...)` → "a.b.c"."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        base = _callee_name(node.value)
+        return f"{base}.{node.attr}" if base else node.attr
+    return ""
+
+
+def _literal_kwargs(call: ast.Call) -> dict:
+    """Keyword arguments of a call that are plain literals."""
+    kwargs = {}
+    for kw in call.keywords:
+        if kw.arg is None:
+            continue
+        try:
+            kwargs[kw.arg] = ast.literal_eval(kw.value)
+        except (ValueError, SyntaxError, TypeError):
+            continue
+    return kwargs
+
+
+def _resolve_relative(module: str, is_package: bool, level: int, target: str) -> str:
+    """Resolve `from ..x import y` against the importing module's package."""
+    if level == 0:
+        return target
+    parts = module.split(".") if module else []
+    if not is_package:
+        parts = parts[:-1]
+    if level > 1:
+        parts = parts[:len(parts) - (level - 1)]
+    if target:
+        parts.append(target)
+    return ".".join(parts)
+
+
+def analyze_source(content: str, module: str = "", is_package: bool = False,
+                   filename: str = "") -> Optional[FileEntry]:
+    """Extract module-level symbols, imports and from_pretrained call sites.
+
+    Returns None if the source does not parse (rules then fall back to their
+    regex-only view of the file).
+    """
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return None
+
+    entry = FileEntry(module=module)
+
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom):
+            source = _resolve_relative(module, is_package, node.level, node.module or "")
+            for alias in node.names:
+                if alias.name != "*":
+                    entry.imports[alias.asname or alias.name] = [source, alias.name]
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                local = alias.asname or alias.name.split(".")[0]
+                entry.imports[local] = [alias.name if alias.asname else local, ""]
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            value = node.value
+            if value is None:
+                continue
+            for target in targets:
+                if isinstance(target, ast.Name):
+                    symbol = _symbol_for(target.id, value, filename)
+                    if symbol:
+                        entry.symbols[target.id] = symbol
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            callee = _callee_name(node.func)
+            if callee.endswith("from_pretrained") and "Tokenizer" not in callee:
+                entry.calls.append(_call_site(node, callee))
+
+    return entry
+
+
+def _symbol_for(name: str, value: ast.AST, filename: str) -> Optional[Symbol]:
+    """Classify a module-level assignment, or None if rules don't need it."""
+    line = getattr(value, "lineno", 0)
+    if isinstance(value, ast.Call) and _callee_name(value.func).endswith("BitsAndBytesConfig"):
+        return Symbol(name=name, file=filename, line=line, kind="quant_config",
+                      quant=_literal_kwargs(value))
+    if isinstance(value, ast.Constant) and isinstance(value.value, str):
+        if MODEL_ID_PATTERN.match(value.value) or "model" in name.lower():
+            return Symbol(name=name, file=filename, line=line, kind="model_id",
+                          value=value.value)
+    if isinstance(value, (ast.Name, ast.Attribute)):
+        return Symbol(name=name, file=filename, line=line, kind="alias",
+                      value=_callee_name(value))
+    return None
+
+
+def _call_site(call: ast.Call, callee: str) -> CallSite:
+    site = CallSite(line=call.lineno, callee=callee)
+    # Legacy `from_pretrained(..., load_in_4bit=True)` is the same config inline
+    site.quant_inline = {k: v for k, v in _literal_kwargs(call).items()
+                         if k.startswith(("load_in_", "llm_int8_", "bnb_4bit_"))}
+    model_arg = call.args[0] if call.args else None
+    for kw in call.keywords:
+        if kw.arg == "pretrained_model_name_or_path":
+            model_arg = kw.value
+        elif kw.arg == "quantization_config":
+            if isinstance(kw.value, ast.Call):
+                site.quant_inline.update(_literal_kwargs(kw.value))
+            else:
+                site.quant_name = _callee_name(kw.value)
+    if isinstance(model_arg, ast.Constant) and isinstance(model_arg.value, str):
+        site.model_value = model_arg.value
+    elif model_arg is not None:
+        site.model_name = _callee_name(model_arg)
+    return site
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+class ProjectIndex:
+    """Incremental, persisted map of module-level names across the project."""
+
+    def __init__(self, root: str = "."):
+        self.root = root
+        self.files: dict[str, FileEntry] = {}  # root-relative path → entry
+        self._modules: dict[str, str] = {}   # dotted module (and suffixes) → file
+        self._parsed: Optional[tuple[str, str, Optional[FileEntry]]] = None  # last parse()
+
+    def key(self, path: str) -> str:
+        """Index key for a path given relative to the cwd (or absolute)."""
+        return os.path.normpath(os.path.relpath(path, self.root))
+
+    def path(self, key: str) -> str:
+        """Path of an indexed file as the caller names it (relative to the cwd)."""
+        return os.path.normpath(os.path.relpath(os.path.join(self.root, key)))
+
+    # -- persistence --------------------------------------------------------
+
+    @classmethod
+    def load(cls, path: Path, root: str = ".") -> "ProjectIndex":
+        index = cls(root)
+        if path.exists():
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                if data.get("version") == INDEX_VERSION:
+                    index.files = {
+                        k: FileEntry.from_dict(v) for k, v in data.get("files", {}).items()
+                    }
+            except (json.JSONDecodeError, KeyError, TypeError) as e:
+                print(f"Warning: Could not load project index: {e}")
+        index._rebuild_modules()
+        return index
+
+    def save(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": INDEX_VERSION,
+            "files": {k: v.to_dict() for k, v in self.files.items()},
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, separators=(",", ":"))
+
+    # -- maintenance --------------------------------------------------------
+
+    def update(self, paths: list[str]) -> int:
+        """Bring the index in line with `paths`. Returns files re-parsed."""
+        seen = set()
+        reparsed = 0
+        for path in paths:
+            seen.add(self.key(path))
+            reparsed += self._refresh_file(path)
+
+        for stale in set(self.files) - seen:
+            del self.files[stale]
+            reparsed += 1
+
+        if reparsed:
+            self._rebuild_modules()
+        return reparsed
+
+    def refresh(self, paths: list[str]) -> int:
+        """Re-check only `paths` (e.g. files a watcher reported), dropping
+        those that no longer exist; every other entry is left alone.
+        """
+        before = set(self.files)
+        reparsed = 0
+        for path in paths:
+            if os.path.exists(path):
+                reparsed += self._refresh_file(path)
+            elif self.files.pop(self.key(path), None) is not None:
+                reparsed += 1
+        # Module names depend on paths only, so edits need no rebuild
+        if set(self.files) != before:
+            self._rebuild_modules()
+        return reparsed
+
+    def _refresh_file(self, path: str) -> int:
+        """Re-parse one file if its mtime/size changed. Returns 1 if it was."""
+        key = self.key(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return 0
+        cached = self.files.get(key)
+        if cached and cached.mtime_ns == st.st_mtime_ns and cached.size == st.st_size:
+            return 0
+        try:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read()
+        except OSError:
+            return 0
+        entry = self._analyze(key, content)
+        entry.mtime_ns, entry.size = st.st_mtime_ns, st.st_size
+        self.files[key] = entry
+        return 1
+
+    def add_source(self, path: str, content: str):
+        """Index `content` as the text of `path` (no stat; e.g. a staged blob)."""
+        key = self.key(path)
+        self.files[key] = self._analyze(key, content)
+
+    def _analyze(self, key: str, content: str) -> FileEntry:
+        module = module_name_for(key)
+        return analyze_source(content, module, is_package=key.endswith("__init__.py"),
+                              filename=key) or FileEntry(module=module)
+
+    def _rebuild_modules(self):
+        """Register each file under its dotted name and every dotted suffix,
+        so `from config import x` finds `src/config.py` whatever the sys.path.
+        Exact names win over suffixes; shorter paths win among suffixes.
+        """
+        self._modules = module_map({key: entry.module for key, entry in self.files.items()})
+
+    # -- lookup -------------------------------------------------------------
+
+    def file_for_module(self, module: str) -> Optional[str]:
+        return self._modules.get(module)
+
+    def importers(self, paths: list[str]) -> set[str]:
+        """Indexed files that import from any of `paths` (one hop)."""
+        targets = {self.key(p) for p in paths}
+        found = set()
+        for key, entry in self.files.items():
+            for module, name in entry.imports.values():
+                if (self.file_for_module(module) in targets
+                        or (name and self.file_for_module(f"{module}.{name}") in targets)):
+                    found.add(key)
+                    break
+        return {self.path(key) for key in found - targets}
+
+    def resolve(self, entry: FileEntry, name: str) -> Optional[Symbol]:
+        """Resolve `name` as seen from `entry`, following imports and aliases."""
+        for _ in range(MAX_RESOLVE_DEPTH):
+            if not name:
+                return None
+            head, _, attr = name.partition(".")
+
+            symbol = entry.symbols.get(name)
+            if symbol is not None:
+                if symbol.kind != "alias":
+                    return symbol
+                name = symbol.value
+                continue
+
+            imported = entry.imports.get(head)
+            if imported is None:
+                return None
+            module, imported_name = imported
+
+            if imported_name:
+                # from m import x   → x lives in m, or m.x is a submodule
+                target = self.file_for_module(module)
+                if attr == "" and target is not None:
+                    entry, name = self.files[target], imported_name
+                    continue
+                sub = self.file_for_module(f"{module}.{imported_name}")
+                if sub is None or not attr:
+                    return None
+                entry, name = self.files[sub], attr
+            else:
+                # import m          → m.x
+                target = self.file_for_module(module)
+                if target is None or not attr:
+                    return None
+                entry, name = self.files[target], attr
+        return None
+
+    def resolve_in_file(self, filename: str, content: str, name: str) -> Optional[Symbol]:
+        """Resolve a name used in `filename`, whose current text is `content`."""
+        return self.resolve(self.entry_for(filename, content), name)
+
+    def parse(self, filename: str, content: str) -> Optional[FileEntry]:
+        """`content` analyzed as the text of `filename` (None if it does not
+        parse). The last result is kept, so every rule auditing one file
+        shares a single parse.
+        """
+        key = self.key(filename)
+        if self._parsed is not None and self._parsed[0] == key and self._parsed[1] is content:
+            return self._parsed[2]
+        entry = analyze_source(
+            content, module_name_for(key),
+            is_package=key.endswith("__init__.py"), filename=key,
+        )
+        self._parsed = (key, content, entry)
+        return entry
+
+    def entry_for(self, filename: str, content: str) -> FileEntry:
+        """Index entry for the file being audited, re-analyzed from `content`
+        (which may differ from disk, e.g. staged blobs).
+        """
+        entry = self.parse(filename, content)
+        if entry is None:
+            key = self.key(filename)
+            return self.files.get(key) or FileEntry(module=module_name_for(key))
+        return entry
+
+
+def module_map(modules: dict[str, str]) -> dict[str, str]:
+    """Dotted module name (and every dotted suffix) → file key, for
+    `{file key: module}`. Exact names win over suffixes; shorter paths win
+    among suffixes.
+    """
+    by_depth = sorted(modules, key=lambda k: (k.count(os.sep), k))
+    out = {}
+    for key in by_depth:
+        if modules[key]:
+            out[modules[key]] = key
+    for key in by_depth:
+        parts = modules[key].split(".")
+        for i in range(1, len(parts)):
+            out.setdefault(".".join(parts[i:]), key)
+    return out
+
+
+def find_module_file(module: str, importer: str, root: str = ".") -> Optional[str]:
+    """File defining dotted `module`, looked up from the importer's directory
+    (a root-relative key) up to `root`, as a path relative to the cwd; None
+    for anything outside the project (site-packages, the stdlib).
+    """
+    rel = module.replace(".", os.sep)
+    base = os.path.dirname(importer)
+    while True:
+        for candidate in (rel + ".py", os.path.join(rel, "__init__.py")):
+            path = os.path.join(root, base, candidate)
+            if os.path.isfile(path):
+                return os.path.normpath(os.path.relpath(path))
+        if not base:
+            return None
+        base = os.path.dirname(base)
+
+
+def get_index_path() -> Path:
+    """Index lives next to the baseline, respecting GITHUB_WORKSPACE."""
+    override = os.environ.get("ECOCOMPUTE_INDEX_PATH")
+    if override:
+        return Path(override)
+    workspace = os.environ.get("GITHUB_WORKSPACE", ".")
+    return Path(workspace) / INDEX_DIR / INDEX_FILE
+
+
+def iter_python_files(root: str = ".") -> list[str]:
+    """All Python files under `root` (paths include `root`), pruning
+    virtualenvs and VCS dirs."""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        for name in filenames:
+            if name.endswith(".py"):
+                found.append(os.path.normpath(os.path.join(dirpath, name)))
+    found.sort()
+    return found
+
+
+def build_index(root: str = ".", path: Optional[Path] = None,
+                files: Optional[list[str]] = None, persist: bool = False) -> ProjectIndex:
+    """Index the project under `root`.
+
+    With `files`, only those files and the project modules they import
+    (found on disk like the interpreter would, one import hop at a time) are
+    indexed: no walk, nothing loaded or saved. Otherwise the whole tree is
+    walked; with `persist`, the saved index is loaded first and written back
+    if anything changed.
+    """
+    if files is not None:
+        index = ProjectIndex(root)
+        index.update([f for f in files if f.endswith(".py")])
+        probed = set()
+        for _ in range(MAX_RESOLVE_DEPTH):
+            wanted = set()
+            for key, entry in list(index.files.items()):
+                for module, name in entry.imports.values():
+                    for target in (module, f"{module}.{name}" if name else ""):
+                        if not target or (key, target) in probed:
+                            continue
+                        probed.add((key, target))
+                        path = find_module_file(target, key, root)
+                        if path and index.key(path) not in index.files:
+                            wanted.add(path)
+            if not wanted:
+                break
+            index.refresh(sorted(wanted))
+        return index
+
+    path = path or get_index_path()
+    index = ProjectIndex.load(path, root) if persist else ProjectIndex(root)
+    changed = index.update(iter_python_files(root))
+    if persist and changed:
+        try:
+            index.save(path)
+        except OSError as e:
+            print(f"Warning: Could not save project index: {e}")
+    return index
+
+
+def index_sources(sources: dict[str, str], candidates: list[str] = (),
+                  read: Optional[Callable[[list[str]], dict[str, str]]] = None,
+                  root: str = ".") -> ProjectIndex:
+    """In-memory index of given file contents (e.g. staged blobs).
+
+    Modules they import are looked up among `candidates` (paths, e.g. from
+    `git ls-files`) and pulled in through `read(paths) → {path: content}`,
+    one import hop at a time, so only what resolution needs is read.
+    """
+    index = ProjectIndex(root)
+    known = module_map({index.key(p): module_name_for(index.key(p)) for p in candidates})
+    pending = dict(sources)
+    for _ in range(MAX_RESOLVE_DEPTH):
+        for path, content in pending.items():
+            index.add_source(path, content)
+        index._rebuild_modules()
+        if read is None:
+            break
+        wanted = set()
+        for entry in list(index.files.values()):
+            for module, name in entry.imports.values():
+                for target in (module, f"{module}.{name}" if name else ""):
+                    key = known.get(target) if target else None
+                    if key and key not in index.files:
+                        wanted.add(index.path(key))
+        if not wanted:
+            break
+        pending = read(sorted(wanted))
+    return index
+
+
+if __name__ == "__main__":
+    index = build_index(persist=True)
+    for key, entry in sorted(index.files.items()):
+        for name, symbol in entry.symbols.items():
+            if symbol.kind != "alias":
+                print(f"{entry.module}.{name}  [{symbol.kind}]  {key}:{symbol.line}")
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+EcoCompute — Declarative Rule Specifications
+
+Lets teams add audit rules as data instead of Python. Each spec names
+trigger patterns plus optional required / forbidden co-occurring patterns:
+
+    # .ecocompute/rules/org.toml
+    [[rules]]
+    id = "org-fp32-serving"
+    title = "FP32 weights in serving code"
+    severity = "warning"              # critical | warning | info
+    trigger = ['torch_dtype\\s*=\\s*torch\\.float32']
+    require = ['\\.generate\\(']        # all must appear somewhere in the file
+    forbid = ['device_map\\s*=\\s*"cpu"']  # none may appear in the file
+    description = "FP32 doubles weight bandwidth vs FP16."
+    fix = "Use `torch_dtype=torch.float16`."
+    energy_impact = "~2× weight traffic vs FP16"
+
+YAML files (`rules:` list, same keys) are supported when PyYAML is installed.
+
+Every pattern from every loaded spec is compiled into ONE alternation regex
+that is run over the file once. A hit is dispatched to its pattern by a named
+group (`m.lastgroup`); that pattern is then dropped from the alternation,
+since only its first line matters, so adding rules does not add passes over
+the file.
+Patterns match within a single line (`^`/`$` anchor at line boundaries);
+`#` comments are stripped first, like the built-in rules. Patterns with named
+groups or backreferences cannot share the alternation (group names must be
+unique and group numbers shift), so they get their own scan.
+"""
+
+import bisect
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+
+RULES_DIR = ".ecocompute/rules"
+SEVERITIES = ("info", "warning", "critical")
+SPEC_SUFFIXES = (".toml", ".yaml", ".yml")
+
+# Named groups, backreferences and group conditionals: unsafe to concatenate
+_GROUP_REFS = re.compile(r'\(\?P<|\(\?P=|\(\?\(|\\[1-9]')
+
+
+@dataclass
+class RuleSpec:
+    """One declarative rule, as loaded from TOML/YAML."""
+    id: str
+    title: str
+    severity: str = "warning"
+    trigger: list = field(default_factory=list)
+    require: list = field(default_factory=list)
+    forbid: list = field(default_factory=list)
+    description: str = ""
+    fix: str = ""
+    energy_impact: str = ""
+    ignore_case: bool = False
+    source: str = ""             # file the spec was loaded from
+
+
+@dataclass
+class RuleHit:
+    """A spec that fired on a file, at its first trigger line."""
+    spec: RuleSpec
+    line: int
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return list(value)
+
+
+def _parse_file(path: Path) -> list[dict]:
+    """Raw rule dicts from one TOML/YAML file."""
+    if path.suffix == ".toml":
+        try:
+            import tomllib
+        except ImportError:              # Python < 3.11
+            try:
+                import tomli as tomllib
+            except ImportError:
+                print(f"  tomli not installed (needed before Python 3.11) — skipping rule file {path}")
+                return []
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    else:
+        try:
+            import yaml
+        except ImportError:
+            print(f"  PyYAML not installed — skipping rule file {path}")
+            return []
+        with open(path) as f:
+            data = yaml.safe_load(f) or {}
+    rules = data.get("rules", []) if isinstance(data, dict) else data
+    return rules if isinstance(rules, list) else []
+
+
+def load_rule_specs(paths: list[str]) -> list[RuleSpec]:
+    """Load specs from files and/or directories. Invalid specs are reported
+    and skipped so one bad org rule never breaks the whole audit.
+    """
+    files: list[Path] = []
+    for p in paths:
+        path = Path(p)
+        if path.is_dir():
+            files.extend(sorted(f for f in path.iterdir() if f.suffix in SPEC_SUFFIXES))
+        elif path.is_file():
+            files.append(path)
+
+    specs: list[RuleSpec] = []
+    seen_ids = set()
+    for path in files:
+        try:
+            raw_rules = _parse_file(path)
+        except Exception as e:  # tomllib/yaml raise their own error types
+            print(f"  Warning: Could not parse rule file {path}: {e}")
+            continue
+
+        for raw in raw_rules:
+            spec = _build_spec(raw, str(path))
+            if spec is None:
+                continue
+            if spec.id in seen_ids:
+                print(f"  Warning: duplicate rule id '{spec.id}' in {path} — skipped")
+                continue
+            seen_ids.add(spec.id)
+            specs.append(spec)
+    return specs
+
+
+def _build_spec(raw: dict, source: str) -> Optional[RuleSpec]:
+    if not isinstance(raw, dict) or not raw.get("id") or not raw.get("title"):
+        print(f"  Warning: rule in {source} needs 'id' and 'title' — skipped")
+        return None
+    severity = str(raw.get("severity", "warning")).lower()
+    if severity not in SEVERITIES:
+        print(f"  Warning: rule '{raw['id']}' has unknown severity '{severity}' — skipped")
+        return None
+    spec = RuleSpec(
+        id=str(raw["id"]),
+        title=str(raw["title"]),
+        severity=severity,
+        trigger=_as_list(raw.get("trigger")),
+        require=_as_list(raw.get("require")),
+        forbid=_as_list(raw.get("forbid")),
+        description=str(raw.get("description", "")),
+        fix=str(raw.get("fix", "")),
+        energy_impact=str(raw.get("energy_impact", "")),
+        ignore_case=bool(raw.get("ignore_case", False)),
+        source=source,
+    )
+    if not spec.trigger:
+        print(f"  Warning: rule '{spec.id}' has no trigger patterns — skipped")
+        return None
+    for pattern in spec.trigger + spec.require + spec.forbid:
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            print(f"  Warning: rule '{spec.id}' has invalid pattern {pattern!r}: {e} — skipped")
+            return None
+    return spec
+
+
+# ---------------------------------------------------------------------------
+# Combined matcher
+# ---------------------------------------------------------------------------
+
+class CompiledRuleSet:
+    """All specs compiled into a single alternation regex."""
+
+    def __init__(self, specs: list[RuleSpec]):
+        self.specs = specs
+        self.patterns: list[re.Pattern] = []
+        pattern_ids: dict[tuple[str, bool], int] = {}
+
+        def intern(pattern: str, ignore_case: bool) -> int:
+            key = (pattern, ignore_case)
+            if key not in pattern_ids:
+                pattern_ids[key] = len(self.patterns)
+                self.patterns.append(re.compile(pattern, re.IGNORECASE if ignore_case else 0))
+            return pattern_ids[key]
+
+        # Per spec: pattern ids for trigger / require / forbid
+        self._compiled = [
+            (
+                spec,
+                [intern(p, spec.ignore_case) for p in spec.trigger],
+                [intern(p, spec.ignore_case) for p in spec.require],
+                [intern(p, spec.ignore_case) for p in spec.forbid],
+            )
+            for spec in specs
+        ]
+
+        # Patterns that refer to their own groups are scanned on their own.
+        # The rest share one scan.
+        shared = [pid for pid, p in enumerate(self.patterns) if not _GROUP_REFS.search(p.pattern)]
+        solo = [pid for pid, p in enumerate(self.patterns) if _GROUP_REFS.search(p.pattern)]
+        self._inline = {
+            pid: f"(?i:{self.patterns[pid].pattern})" if self.patterns[pid].flags & re.IGNORECASE
+            else f"(?:{self.patterns[pid].pattern})"
+            for pid in shared
+        }
+        if shared:
+            try:
+                self._alternation(tuple(shared))
+            except re.error:
+                # Valid on their own but not together: fall back to one scan each
+                solo, self._inline = list(range(len(self.patterns))), {}
+        self._solo = [
+            (pid, re.compile(self.patterns[pid].pattern, self.patterns[pid].flags | re.MULTILINE))
+            for pid in solo
+        ]
+
+    def __len__(self) -> int:
+        return len(self.specs)
+
+    def _alternation(self, pids: tuple[int, ...]) -> tuple[re.Pattern, re.Pattern]:
+        """(scan, dispatch) regexes over the shared patterns `pids` (re caches
+        them). The scan uses non-capturing groups: capturing ones would cost
+        it the literal-prefix fast path. The dispatch puts each pattern in a
+        named group, so a match at a known position names its pattern
+        (m.lastgroup "p<id>").
+        """
+        return (
+            re.compile("|".join(self._inline[pid] for pid in pids), re.MULTILINE),
+            re.compile("|".join(f"(?P<p{pid}>{self._inline[pid]})" for pid in pids)),
+        )
+
+    def evaluate(self, content: str) -> list[RuleHit]:
+        """Single pass over `content`; returns the specs that fire."""
+        if not self.patterns:
+            return []
+
+        lines = [line.split('#')[0] for line in content.split('\n')]
+        text = '\n'.join(lines)
+        starts = [0]
+        for line in lines[:-1]:
+            starts.append(starts[-1] + len(line) + 1)
+
+        # Scan for the patterns not seen yet, as one alternation. At a hit
+        # the dispatch regex names the pattern (matched on the hit's line,
+        # so patterns stay within one line); it is dropped from the
+        # alternation and the scan resumes at the same spot for the rest.
+        # A pattern is found once, at its first line, and never re-run.
+        first_line: dict[int, int] = {}     # pattern id → first 1-based line
+        unseen, pos = tuple(self._inline), 0
+        while unseen:
+            scan, dispatch = self._alternation(unseen)
+            m = scan.search(text, pos)
+            if m is None:
+                break
+            idx = bisect.bisect_right(starts, m.start()) - 1
+            hit = dispatch.match(lines[idx], m.start() - starts[idx])
+            if hit is None:
+                pos = m.start() + 1     # only matches across a line break
+                continue
+            pid = int(hit.lastgroup[1:])
+            first_line[pid] = idx + 1
+            unseen = tuple(p for p in unseen if p != pid)
+            pos = m.start()
+
+        for pid, scan in self._solo:
+            for m in scan.finditer(text):
+                idx = bisect.bisect_right(starts, m.start()) - 1
+                if self.patterns[pid].search(lines[idx]):
+                    first_line[pid] = idx + 1
+                    break
+        if not first_line:
+            return []
+
+        hits = []
+        for spec, trigger, require, forbid in self._compiled:
+            trigger_lines = [first_line[p] for p in trigger if p in first_line]
+            if not trigger_lines:
+                continue
+            if any(p not in first_line for p in require):
+                continue
+            if any(p in first_line for p in forbid):
+                continue
+            hits.append(RuleHit(spec=spec, line=min(trigger_lines)))
+        return hits
+
+
+def get_rules_paths() -> list[str]:
+    """Rule files/dirs from RULES_PATH (os.pathsep-separated), relative to the
+    workspace. Defaults to `.ecocompute/rules`.
+    """
+    workspace = os.environ.get("GITHUB_WORKSPACE", ".")
+    raw = os.environ.get("RULES_PATH", RULES_DIR)
+    return [os.path.join(workspace, p) for p in raw.split(os.pathsep) if p]
+
+
+def load_compiled_rules(paths: Optional[list[str]] = None) -> Optional[CompiledRuleSet]:
+    """Load and compile all declarative rules, or None if there are none."""
+    specs = load_rule_specs(paths if paths is not None else get_rules_paths())
+    return CompiledRuleSet(specs) if specs else None
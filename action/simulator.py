@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+EcoCompute — Dynamic Batching Simulator
+
+Evaluates the latency / energy trade-off of a batching policy before it is
+deployed. Requests arrive from a trace (or a Poisson process); a server
+collects them until either `max_batch` requests are queued or the oldest has
+waited `max_wait_s`, then runs the batch to completion (static batching, as
+with `model.generate`).
+
+Batch duration and power come from the measured batch-size curves
+(fleet.load_batch_curve: A800, Mistral-7B Pure INT8, 256 generated tokens),
+interpolated in log2(batch size). Between batches the GPU draws `idle_w`.
+
+Per policy: latency percentiles, J/request (busy + idle energy), GPU
+utilization and mean batch size. A policy whose capacity (max_batch per
+batch duration) is below the offered rate is saturated: its queue grows for
+the whole trace, so its latencies only measure the trace length and it is
+left out of the Pareto front. Static batches of 256 tokens take ~14 s, so
+the A800 curve serves ~0.07 req/s at max_batch 1 and ~4 req/s at 64.
+
+The event loop touches each *batch* once (queue positions come from bisect
+on the sorted arrival times) and latencies are computed with NumPy: about
+2 µs per dispatched batch, i.e. a million requests in ~0.2–0.4 s per policy
+when they batch, ~2 s at max_batch 1. Sweeps fan out over a process pool:
+
+    python simulator.py --rate 1 --requests 1000000 \\
+        --max-batch 8,16,32,64 --max-wait 0,0.2,1
+"""
+
+import argparse
+import bisect
+import csv
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+from fleet import REFERENCE_CURVE_TDP_W, BatchCurve, load_batch_curve
+
+
+@dataclass(frozen=True)
+class BatchPolicy:
+    """Dispatch when `max_batch` are queued or the oldest waited `max_wait_s`."""
+    max_batch: int
+    max_wait_s: float
+
+    def __str__(self) -> str:
+        return f"B≤{self.max_batch}, wait≤{self.max_wait_s * 1000:g}ms"
+
+
+@dataclass
+class ServiceModel:
+    """Per-batch-size duration (s) and power (W) of one static batch."""
+    durations: list              # index b → seconds for a batch of b
+    power_w: list                # index b → watts while running a batch of b
+    idle_w: float
+
+    @classmethod
+    def from_curve(cls, curve: BatchCurve, max_batch: int, output_len: int = 256,
+                   speed_scale: float = 1.0, tdp_w: Optional[float] = None,
+                   idle_w: float = 65.0) -> "ServiceModel":
+        """Interpolate the measured curve for batch sizes 1..max_batch.
+
+        Per-sequence decode speed and power are interpolated in log2(batch);
+        beyond the largest measured batch both are held at the last point.
+        `speed_scale` rescales throughput (e.g. 7B → 13B ≈ 0.54) and `tdp_w`
+        rescales power to another board.
+        """
+        logs = [math.log2(b) for b in curve.batch_sizes]
+        per_seq = [t / b for t, b in zip(curve.throughput_tok_s, curve.batch_sizes)]
+        power_scale = (tdp_w / curve.tdp_w) if tdp_w else 1.0
+
+        def interp(x: float, ys: list) -> float:
+            if x <= logs[0]:
+                return ys[0]
+            if x >= logs[-1]:
+                return ys[-1]
+            i = bisect.bisect_right(logs, x)
+            frac = (x - logs[i - 1]) / (logs[i] - logs[i - 1])
+            return ys[i - 1] + (ys[i] - ys[i - 1]) * frac
+
+        durations, power = [0.0], [0.0]
+        for b in range(1, max_batch + 1):
+            speed = interp(math.log2(b), per_seq) * speed_scale
+            durations.append(output_len / speed)
+            power.append(interp(math.log2(b), curve.power_w) * power_scale)
+        return cls(durations, power, idle_w)
+
+    def capacity(self, max_batch: int) -> float:
+        """Sustainable requests/s when every batch is full."""
+        return max_batch / self.durations[max_batch]
+
+
+@dataclass
+class SimResult:
+    """Outcome of one policy over one arrival trace."""
+    policy: BatchPolicy
+    requests: int = 0
+    batches: int = 0
+    mean_batch: float = 0.0
+    latency_p50_s: float = 0.0
+    latency_p90_s: float = 0.0
+    latency_p99_s: float = 0.0
+    latency_mean_s: float = 0.0
+    j_per_request: float = 0.0
+    busy_j: float = 0.0
+    idle_j: float = 0.0
+    utilization: float = 0.0
+    makespan_s: float = 0.0
+    saturated: bool = False      # offered rate ≥ policy capacity
+
+
+# ---------------------------------------------------------------------------
+# Arrivals
+# ---------------------------------------------------------------------------
+
+def poisson_arrivals(rate: float, n: int, seed: int = 0):
+    """n arrival times (s) of a Poisson process with `rate` req/s."""
+    import numpy as np
+
+    return np.cumsum(np.random.default_rng(seed).exponential(1.0 / rate, n))
+
+
+def load_arrivals(csv_path: str):
+    """Sorted arrival times in seconds from a CSV `timestamp` column
+    (numeric seconds or ISO-8601), shifted to start at 0.
+    """
+    import numpy as np
+
+    with open(csv_path, newline='') as f:
+        values = [row["timestamp"] for row in csv.DictReader(f)]
+    try:
+        t = np.asarray(values, dtype=float)
+    except ValueError:
+        t = np.asarray(values, dtype="datetime64[ms]").astype(np.int64) / 1000.0
+    t = np.sort(t)
+    return t - t[0] if len(t) else t
+
+
+# ---------------------------------------------------------------------------
+# Simulation
+# ---------------------------------------------------------------------------
+
+def simulate(arrivals, policy: BatchPolicy, service: ServiceModel) -> SimResult:
+    """Run one policy over sorted arrival times (NumPy array, seconds)."""
+    import numpy as np
+
+    n = len(arrivals)
+    result = SimResult(policy=policy, requests=n)
+    if n == 0:
+        return result
+
+    times = arrivals.tolist()       # list indexing is much faster in the loop
+    max_batch = policy.max_batch
+    max_wait = policy.max_wait_s
+    durations = service.durations
+    power = service.power_w
+
+    sizes: list[int] = []
+    ends: list[float] = []
+    busy_s = busy_j = 0.0
+    t_free = 0.0
+    i = 0
+    while i < n:
+        first = times[i]
+        full_at = times[i + max_batch - 1] if i + max_batch - 1 < n else math.inf
+        dispatch = max(t_free, min(first + max_wait, full_at))
+        # Everyone who has arrived by dispatch time, up to max_batch
+        j = min(i + max_batch, bisect.bisect_right(times, dispatch, i))
+        b = j - i
+        duration = durations[b]
+        t_free = dispatch + duration
+        busy_s += duration
+        busy_j += duration * power[b]
+        sizes.append(b)
+        ends.append(t_free)
+        i = j
+
+    latencies = np.repeat(np.asarray(ends), sizes) - arrivals
+    makespan = t_free - float(arrivals[0])
+    idle_j = max(makespan - busy_s, 0.0) * service.idle_w
+
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+    result.batches = len(sizes)
+    result.mean_batch = n / len(sizes)
+    result.latency_p50_s = float(p50)
+    result.latency_p90_s = float(p90)
+    result.latency_p99_s = float(p99)
+    result.latency_mean_s = float(latencies.mean())
+    result.busy_j = busy_j
+    result.idle_j = idle_j
+    result.j_per_request = (busy_j + idle_j) / n
+    result.utilization = busy_s / makespan if makespan > 0 else 1.0
+    result.makespan_s = makespan
+    span = float(arrivals[-1] - arrivals[0])
+    if span > 0:
+        result.saturated = (n - 1) / span >= service.capacity(max_batch)
+    return result
+
+
+# Worker state for sweeps: the trace is sent to each process once
+_worker_arrivals = None
+_worker_service: Optional[ServiceModel] = None
+
+
+def _init_worker(arrivals, service: ServiceModel):
+    global _worker_arrivals, _worker_service
+    _worker_arrivals, _worker_service = arrivals, service
+
+
+def _simulate_in_worker(policy: BatchPolicy) -> SimResult:
+    return simulate(_worker_arrivals, policy, _worker_service)
+
+
+def sweep(arrivals, policies: list[BatchPolicy], service: ServiceModel,
+          processes: Optional[int] = None) -> list[SimResult]:
+    """Simulate many policies; processes=1 runs in-process."""
+    if processes == 1 or len(policies) == 1:
+        return [simulate(arrivals, p, service) for p in policies]
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                             initargs=(arrivals, service)) as pool:
+        return list(pool.map(_simulate_in_worker, policies,
+                             chunksize=max(1, len(policies) // 32)))
+
+
+def pareto_front(results: list[SimResult]) -> list[SimResult]:
+    """Policies not beaten on both p99 latency and J/request. Saturated
+    policies are not ranked: their latencies grow with the trace length.
+    """
+    front, best_j = [], math.inf
+    stable = [r for r in results if not r.saturated]
+    for r in sorted(stable, key=lambda r: (r.latency_p99_s, r.j_per_request)):
+        if r.j_per_request < best_j:
+            front.append(r)
+            best_j = r.j_per_request
+    return front
+
+
+def format_sweep(results: list[SimResult], limit: int = 20) -> str:
+    """Markdown table, Pareto-optimal policies marked with ★."""
+    front = {id(r) for r in pareto_front(results)}
+    lines = []
+    lines.append("### 🧮 Batching Policy Simulation")
+    lines.append("")
+    lines.append("| Policy | Mean batch | p50 | p90 | p99 | J/request | GPU util |")
+    lines.append("|--------|------------|-----|-----|-----|-----------|----------|")
+    ranked = sorted(results, key=lambda r: (id(r) not in front, r.j_per_request))
+    for r in ranked[:limit]:
+        mark = "★ " if id(r) in front else ""
+        if r.saturated:
+            mark += "⚠️ "   # the queue grows for the whole trace
+        lines.append(
+            f"| {mark}{r.policy} | {r.mean_batch:.1f} | {r.latency_p50_s:.2f}s | "
+            f"{r.latency_p90_s:.2f}s | {r.latency_p99_s:.2f}s | "
+            f"{r.j_per_request:.0f} | {r.utilization:.0%} |"
+        )
+    lines.append("")
+    lines.append("*★ = Pareto-optimal (no unsaturated policy has both lower p99 latency and "
+                 "lower J/request). ⚠️ = saturated: arrivals exceed capacity, latency grows "
+                 "with trace length, not ranked.*")
+    lines.append("")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EcoCompute dynamic batching simulator")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--trace", help="CSV with a per-request `timestamp` column")
+    source.add_argument("--rate", type=float, default=1.0, help="Poisson arrival rate (req/s)")
+    parser.add_argument("--requests", type=int, default=100_000, help="Poisson trace length")
+    parser.add_argument("--max-batch", default="8,16,32,64",
+                        help="Comma-separated max batch sizes to sweep")
+    parser.add_argument("--max-wait", default="0,0.05,0.1,0.5,1",
+                        help="Comma-separated max queue waits (s) to sweep")
+    parser.add_argument("--output-len", type=int, default=256)
+    parser.add_argument("--gpu", default=None, help="Rescale power to a KNOWN_GPUS profile")
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        raise SystemExit("simulator.py needs NumPy: pip install numpy")
+
+    arrivals = load_arrivals(args.trace) if args.trace else poisson_arrivals(args.rate, args.requests)
+    batches = [int(b) for b in args.max_batch.split(',')]
+    waits = [float(w) for w in args.max_wait.split(',')]
+    policies = [BatchPolicy(b, w) for b in batches for w in waits]
+
+    tdp_w, idle_w = REFERENCE_CURVE_TDP_W, 65.0
+    if args.gpu:
+        from hardware import hardware_for_profile
+        hw = hardware_for_profile(args.gpu)
+        if hw.known_profile:
+            tdp_w, idle_w = hw.tdp_w, hw.idle_w
+        else:
+            print(f"Warning: '{args.gpu}' is not a known GPU profile — using the A800 curve.")
+    service = ServiceModel.from_curve(load_batch_curve(), max(batches), args.output_len,
+                                      tdp_w=tdp_w, idle_w=idle_w)
+
+    results = sweep(arrivals, policies, service, args.processes)
+    print(f"{len(arrivals):,} requests, {len(policies)} policies")
+    if all(r.saturated for r in results):
+        print(f"Warning: every policy is saturated (capacity at max_batch {max(batches)}: "
+              f"{service.capacity(max(batches)):.2f} req/s) — lower --rate or raise --max-batch.")
+    print(format_sweep(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+EcoCompute — Bootstrap Confidence Intervals
+
+Published figures such as "BS=64 → −95.7%" or "INT8 +17–147%" are ratios of
+group means (J/1k tokens of one configuration over another) measured over a
+handful of runs. This module attaches percentile bootstrap intervals to them:
+
+    groups = [Group.from_summary("fp16", 5661, 143, 10),
+              Group.from_summary("int8", 7401, 115, 10)]
+    ci = bootstrap_ratios(groups, [("int8", "fp16")])[0]
+    ci.as_pct_change().format_pct()      # "+30.7% (95% CI +28.3 to +33.2%)"
+
+A group is either per-run samples (resampled with replacement) or, where only
+mean ± std over n runs was published, a parametric draw of its mean from
+N(mean, std/√n). All groups are resampled together: one index matrix of
+shape (resamples, total samples) plus one normal matrix of shape
+(resamples, summary groups) give every group's resampled mean in a single
+(resamples, groups) array, and every requested ratio or difference is one
+column operation on it. Ten thousand resamples over all published groups
+take a few milliseconds. No Python loop runs per resample.
+
+Groups with no recorded spread (std missing, or a single run) get no
+interval rather than a zero-width one.
+
+NumPy is imported lazily; callers that format reports treat ImportError as
+"no intervals".
+"""
+
+import math
+from dataclasses import asdict, dataclass
+from typing import Optional, Sequence
+
+DEFAULT_RESAMPLES = 10_000
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_SEED = 0
+
+
+@dataclass
+class Group:
+    """One measurement group: per-run samples, or mean ± std over n runs."""
+    name: str
+    mean: float
+    std: Optional[float] = None
+    n: int = 0
+    samples: Optional[tuple] = None
+
+    @classmethod
+    def from_samples(cls, name: str, samples: Sequence[float]) -> "Group":
+        values = tuple(float(x) for x in samples)
+        if not values:
+            raise ValueError(f"group {name!r} has no samples")
+        mean = math.fsum(values) / len(values)
+        std = (math.sqrt(math.fsum((x - mean) ** 2 for x in values) / (len(values) - 1))
+               if len(values) > 1 else None)
+        return cls(name, mean, std, len(values), values)
+
+    @classmethod
+    def from_summary(cls, name: str, mean: float, std: Optional[float], n: int) -> "Group":
+        return cls(name, float(mean), None if std is None else float(std), int(n))
+
+    @property
+    def has_spread(self) -> bool:
+        return self.n > 1 and self.std is not None
+
+
+@dataclass
+class Interval:
+    """Point estimate with a percentile bootstrap interval."""
+    estimate: float
+    low: float
+    high: float
+    confidence: float = DEFAULT_CONFIDENCE
+
+    def scaled(self, factor: float) -> "Interval":
+        return Interval(self.estimate * factor, self.low * factor, self.high * factor, self.confidence)
+
+    def as_pct_change(self) -> "Interval":
+        """Ratio → percent change (1.307 → +30.7)."""
+        return Interval((self.estimate - 1) * 100, (self.low - 1) * 100,
+                        (self.high - 1) * 100, self.confidence)
+
+    def format(self, spec: str = ".0f", unit: str = "") -> str:
+        return (f"{self.estimate:{spec}}{unit} ({self.confidence:.0%} CI "
+                f"{self.low:{spec}}–{self.high:{spec}}{unit})")
+
+    def format_pct(self, digits: int = 1) -> str:
+        return (f"{self.estimate:+.{digits}f}% ({self.confidence:.0%} CI "
+                f"{self.low:+.{digits}f} to {self.high:+.{digits}f}%)")
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def bootstrap_means(groups: Sequence[Group], n_resamples: int = DEFAULT_RESAMPLES,
+                    seed: int = DEFAULT_SEED):
+    """Resampled group means, shape (n_resamples, len(groups)).
+
+    Sample groups are resampled with replacement through one index matrix
+    (every group's columns offset into the concatenated samples) and summed
+    per group with `np.add.reduceat`; summary groups are drawn from
+    N(mean, std/√n). Groups without spread stay at their mean.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    means = np.tile(np.array([g.mean for g in groups], dtype=float), (n_resamples, 1))
+
+    sampled = [i for i, g in enumerate(groups) if g.samples is not None and g.n > 1]
+    if sampled:
+        sizes = np.array([groups[i].n for i in sampled])
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        values = np.concatenate([np.asarray(groups[i].samples, dtype=float) for i in sampled])
+        column_start = np.repeat(starts, sizes)
+        column_size = np.repeat(sizes, sizes)
+        idx = column_start + (rng.random((n_resamples, len(values))) * column_size).astype(np.intp)
+        means[:, sampled] = np.add.reduceat(values[idx], starts, axis=1) / sizes
+
+    summary = [i for i, g in enumerate(groups) if g.samples is None and g.has_spread]
+    if summary:
+        mu = np.array([groups[i].mean for i in summary])
+        se = np.array([groups[i].std / math.sqrt(groups[i].n) for i in summary])
+        means[:, summary] = mu + se * rng.standard_normal((n_resamples, len(summary)))
+    return means
+
+
+def percentile_intervals(estimates, draws, confidence: float = DEFAULT_CONFIDENCE) -> list[Interval]:
+    """Percentile intervals for each column of `draws` (n_resamples, k)."""
+    import numpy as np
+
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(draws, [tail, 100 - tail], axis=0)
+    return [Interval(float(e), float(lo), float(hi), confidence)
+            for e, lo, hi in zip(estimates, low, high)]
+
+
+def _pair_intervals(groups: Sequence[Group], pairs: Sequence[tuple[str, str]], op: str,
+                    n_resamples: int, confidence: float, seed: int) -> list[Optional[Interval]]:
+    index = {g.name: i for i, g in enumerate(groups)}
+    missing = {name for pair in pairs for name in pair if name not in index}
+    if missing:
+        raise KeyError(f"unknown group(s): {', '.join(sorted(missing))}")
+
+    # Only pairs whose groups both have spread get an interval
+    usable = [k for k, (a, b) in enumerate(pairs)
+              if groups[index[a]].has_spread and groups[index[b]].has_spread]
+    out: list[Optional[Interval]] = [None] * len(pairs)
+    if not usable:
+        return out
+
+    means = bootstrap_means(groups, n_resamples, seed)
+    num = [index[pairs[k][0]] for k in usable]
+    den = [index[pairs[k][1]] for k in usable]
+    point_num = [groups[i].mean for i in num]
+    point_den = [groups[i].mean for i in den]
+    if op == "ratio":
+        draws = means[:, num] / means[:, den]
+        estimates = [a / b for a, b in zip(point_num, point_den)]
+    else:
+        draws = means[:, num] - means[:, den]
+        estimates = [a - b for a, b in zip(point_num, point_den)]
+    for k, interval in zip(usable, percentile_intervals(estimates, draws, confidence)):
+        out[k] = interval
+    return out
+
+
+def bootstrap_ratios(groups: Sequence[Group], pairs: Sequence[tuple[str, str]],
+                     n_resamples: int = DEFAULT_RESAMPLES,
+                     confidence: float = DEFAULT_CONFIDENCE,
+                     seed: int = DEFAULT_SEED) -> list[Optional[Interval]]:
+    """Intervals for mean(a) / mean(b) per (a, b) pair of group names.
+
+    None where either group has no recorded spread.
+    """
+    return _pair_intervals(groups, pairs, "ratio", n_resamples, confidence, seed)
+
+
+def bootstrap_deltas(groups: Sequence[Group], pairs: Sequence[tuple[str, str]],
+                     n_resamples: int = DEFAULT_RESAMPLES,
+                     confidence: float = DEFAULT_CONFIDENCE,
+                     seed: int = DEFAULT_SEED) -> list[Optional[Interval]]:
+    """Intervals for mean(a) − mean(b) per (a, b) pair of group names.
+
+    None where either group has no recorded spread.
+    """
+    return _pair_intervals(groups, pairs, "delta", n_resamples, confidence, seed)
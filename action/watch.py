@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+EcoCompute — Watch Mode
+
+Re-audits files as you save them, for the edit–run loop on inference scripts:
+
+    python action/watch.py              # watch the current directory
+    python action/watch.py src/ scripts/ --severity info
+    python action/watch.py --polling    # network filesystems, macOS
+
+Change events come from inotify (Linux, through ctypes — no dependencies),
+or from polling mtimes where inotify is unavailable. Bursts of events (an
+editor's write + rename, a `git checkout`) are debounced into one batch.
+Only the files in the batch are re-read and re-audited, plus files that
+import from them, because cross-file rules see their definitions. The
+project index is refreshed for those files alone. Findings are kept per
+file in memory and only the difference is printed:
+
+    [14:02:11] serve.py (6 ms)
+      + 🔴 line 12  Default INT8 (bitsandbytes mixed-precision decomposition)
+      - 🟡 line 30  Missing device_map (resolved)
+
+Static rules only: no hardware probing, calibration or baseline I/O.
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from typing import Optional
+
+from audit import (
+    SEVERITY_LABELS, SEVERITY_THRESHOLD_MAP, SOURCE_SUFFIXES, Issue, Severity,
+    audit_source, build_scan_context, read_source, split_new_issues,
+)
+from project_index import SKIP_DIRS
+
+DEFAULT_DEBOUNCE_S = 0.05
+MAX_DEBOUNCE_S = 1.0          # flush even if events keep coming
+DEFAULT_POLL_INTERVAL_S = 0.5
+INITIAL_LISTING = 20          # findings printed after the first full scan
+
+
+def is_source(path: str) -> bool:
+    return path.endswith(SOURCE_SUFFIXES)
+
+
+def iter_source_dirs(root: str):
+    """`root` and its subdirectories, pruning virtualenvs and VCS dirs."""
+    for dirpath, dirnames, _ in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and d != '.ecocompute']
+        yield dirpath
+
+
+def iter_source_files(roots: list[str]) -> list[str]:
+    """All .py/.ipynb files under `roots`."""
+    found = []
+    for root in roots:
+        for dirpath in iter_source_dirs(root):
+            try:
+                names = os.listdir(dirpath)
+            except OSError:
+                continue
+            found.extend(os.path.normpath(os.path.join(dirpath, n)) for n in names if is_source(n))
+    return sorted(set(found))
+
+
+# ---------------------------------------------------------------------------
+# Watchers
+#
+# read(timeout) → set of changed source paths (empty on timeout), or None when
+# events were lost and everything must be rescanned.
+# ---------------------------------------------------------------------------
+
+class PollingWatcher:
+    """Stat-walks the tree every `interval` seconds and diffs (mtime, size)."""
+    name = "polling"
+
+    def __init__(self, roots: list[str], interval: float = DEFAULT_POLL_INTERVAL_S):
+        self.roots = roots
+        self.interval = interval
+        self._snapshot = self._scan()
+        self._next = time.monotonic() + interval
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        snap = {}
+        for path in iter_source_files(self.roots):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            snap[path] = (st.st_mtime_ns, st.st_size)
+        return snap
+
+    def read(self, timeout: Optional[float] = None) -> Optional[set[str]]:
+        wait = self._next - time.monotonic()
+        if timeout is not None:
+            wait = min(wait, timeout)
+        if wait > 0:
+            time.sleep(wait)
+        if time.monotonic() < self._next:
+            return set()
+        self._next = time.monotonic() + self.interval
+        snap = self._scan()
+        old = self._snapshot
+        self._snapshot = snap
+        return {p for p in snap.keys() | old.keys() if snap.get(p) != old.get(p)}
+
+    def close(self):
+        pass
+
+
+# <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+# IN_CLOSE_WRITE rather than IN_MODIFY: the file is complete when we read it
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+              | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR)
+EVENT_HEADER = struct.Struct("iIII")   # wd, mask, cookie, len
+
+
+class InotifyWatcher:
+    """Linux inotify through libc, one watch per directory.
+
+    Raises OSError when inotify is unavailable (non-Linux, or the
+    fs.inotify.max_user_watches limit is hit) so the caller can fall back
+    to polling.
+    """
+    name = "inotify"
+
+    def __init__(self, roots: list[str]):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        try:
+            self._add = self._libc.inotify_add_watch
+        except AttributeError:
+            raise OSError(errno.ENOSYS, "inotify not available")
+        self._add.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs: dict[int, str] = {}
+        try:
+            for root in roots:
+                self._watch_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def _watch_tree(self, root: str) -> set[str]:
+        """Watch `root` recursively; returns source files already in it."""
+        found = set()
+        for dirpath in iter_source_dirs(root):
+            wd = self._add(self.fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err in (errno.ENOENT, errno.ENOTDIR, errno.EACCES):
+                    continue          # vanished or unreadable: nothing to watch
+                raise OSError(err, f"inotify_add_watch {dirpath}: {os.strerror(err)}")
+            self.dirs[wd] = dirpath
+            try:
+                found.update(os.path.normpath(os.path.join(dirpath, n))
+                             for n in os.listdir(dirpath) if is_source(n))
+            except OSError:
+                pass
+        return found
+
+    def read(self, timeout: Optional[float] = None) -> Optional[set[str]]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            buf = os.read(self.fd, 256 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed: set[str] = set()
+        offset = 0
+        while offset < len(buf):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(buf, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(buf[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            parent = self.dirs.get(wd)
+            if parent is None or not name:
+                continue
+            path = os.path.normpath(os.path.join(parent, name))
+            if mask & IN_ISDIR:
+                # New or moved-in directory: watch it and audit what it holds
+                if mask & (IN_CREATE | IN_MOVED_TO) and os.path.basename(path) not in SKIP_DIRS:
+                    try:
+                        changed |= self._watch_tree(path)
+                    except OSError:
+                        return None
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    return None       # a subtree left: simplest to rescan
+                continue
+            if is_source(name):
+                changed.add(path)
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def open_watcher(roots: list[str], polling: bool = False,
+                 interval: float = DEFAULT_POLL_INTERVAL_S):
+    """inotify where available, polling otherwise."""
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(roots)
+        except OSError as e:
+            print(f"inotify unavailable ({e}); falling back to polling.")
+    return PollingWatcher(roots, interval)
+
+
+def next_batch(watcher, debounce: float = DEFAULT_DEBOUNCE_S) -> Optional[set[str]]:
+    """Block for the first change, then keep collecting until `debounce`
+    seconds pass without events (at most MAX_DEBOUNCE_S). None = rescan.
+    """
+    changed = watcher.read(None)
+    while changed is not None and not changed:
+        changed = watcher.read(None)
+    if changed is None:
+        return None
+    deadline = time.monotonic() + MAX_DEBOUNCE_S
+    while time.monotonic() < deadline:
+        more = watcher.read(debounce)
+        if more is None:
+            return None
+        if not more:
+            break
+        changed |= more
+    return changed
+
+
+# ---------------------------------------------------------------------------
+# Incremental audit state
+# ---------------------------------------------------------------------------
+
+class WatchSession:
+    """Per-file findings kept in memory, updated one batch at a time."""
+
+    def __init__(self, roots: list[str], threshold: Severity = Severity.WARNING):
+        self.roots = roots
+        self.threshold = threshold
+        self.ctx = build_scan_context()
+        self.results: dict[str, list[Issue]] = {}
+
+    def audit_file(self, path: str) -> Optional[list[Issue]]:
+        """Current findings for one file, None if it is gone or unreadable."""
+        try:
+            content, line_map = read_source(path)
+        except (OSError, ValueError):
+            return None
+        issues = audit_source(content, line_map, path, self.ctx)
+        return [i for i in issues if i.severity >= self.threshold]
+
+    def scan_all(self) -> int:
+        """(Re)build results for every source file. Returns files scanned."""
+        files = iter_source_files(self.roots)
+        if self.ctx.index is not None:
+            indexed = [self.ctx.index.path(k) for k in self.ctx.index.files]
+            self.ctx.index.refresh(files + [p for p in indexed if p not in files])
+        self.results = {}
+        for path in files:
+            issues = self.audit_file(path)
+            if issues is not None:
+                self.results[path] = issues
+        return len(files)
+
+    def update(self, changed: set[str]) -> list[tuple[str, list[Issue], list[Issue]]]:
+        """Re-audit changed files (and their importers). Returns
+        (path, new findings, resolved findings) for files whose findings moved.
+        """
+        paths = set(changed)
+        if self.ctx.index is not None:
+            py = [p for p in changed if p.endswith('.py')]
+            if py:
+                self.ctx.index.refresh(py)
+                paths |= self.ctx.index.importers(py) & self.results.keys()
+
+        diffs = []
+        for path in sorted(paths):
+            old = self.results.get(path, [])
+            current = self.audit_file(path)
+            if current is None:
+                self.results.pop(path, None)
+                current = []
+            else:
+                self.results[path] = current
+            diff = split_new_issues(current, old)
+            if diff.new or diff.resolved:
+                diffs.append((path, diff.new, diff.resolved))
+        return diffs
+
+    def totals(self) -> tuple[int, int]:
+        """(findings, files with findings)"""
+        with_issues = [v for v in self.results.values() if v]
+        return sum(len(v) for v in with_issues), len(with_issues)
+
+
+def format_issue_line(issue: Issue, sign: str) -> str:
+    icon = SEVERITY_LABELS[issue.severity].split()[0]
+    where = f"cell {issue.cell}, " if issue.cell is not None else ""
+    where += f"line {issue.line}" if issue.line else "file"
+    suffix = " (resolved)" if sign == "-" else ""
+    return f"  {sign} {icon} {where:<10} {issue.title}{suffix}"
+
+
+def print_diffs(diffs, elapsed_ms: float, files: int):
+    stamp = time.strftime("%H:%M:%S")
+    if not diffs:
+        print(f"[{stamp}] {files} file(s) re-audited, no change in findings ({elapsed_ms:.0f} ms)")
+        return
+    for path, new, resolved in diffs:
+        print(f"[{stamp}] {path} ({elapsed_ms:.0f} ms)")
+        for issue in sorted(new, key=lambda i: i.line or 0):
+            print(format_issue_line(issue, "+"))
+        for issue in sorted(resolved, key=lambda i: i.line or 0):
+            print(format_issue_line(issue, "-"))
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="EcoCompute watch mode: re-audit on save")
+    parser.add_argument("roots", nargs="*", default=["."], help="Directories to watch")
+    parser.add_argument("--severity", default=os.environ.get("SEVERITY_THRESHOLD", "warning"),
+                        choices=sorted(SEVERITY_THRESHOLD_MAP), help="Minimum severity shown")
+    parser.add_argument("--polling", action="store_true", help="Poll mtimes instead of inotify")
+    parser.add_argument("--interval", type=float, default=DEFAULT_POLL_INTERVAL_S,
+                        help="Polling interval (s)")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE_S,
+                        help="Quiet period (s) that ends a burst of events")
+    args = parser.parse_args(argv)
+
+    roots = [os.path.normpath(r) for r in args.roots if os.path.isdir(r)]
+    if not roots:
+        raise SystemExit("watch.py: no directories to watch")
+
+    session = WatchSession(roots, SEVERITY_THRESHOLD_MAP[args.severity])
+    start = time.perf_counter()
+    scanned = session.scan_all()
+    findings, files = session.totals()
+    print(f"Scanned {scanned} file(s) in {(time.perf_counter() - start) * 1000:.0f} ms: "
+          f"{findings} finding(s) in {files} file(s).")
+    listed = [(path, issue) for path, issues in sorted(session.results.items()) for issue in issues]
+    for path, issue in listed[:INITIAL_LISTING]:
+        print(f"  {path}{format_issue_line(issue, '')[2:]}")
+    if len(listed) > INITIAL_LISTING:
+        print(f"  … and {len(listed) - INITIAL_LISTING} more")
+
+    watcher = open_watcher(roots, args.polling, args.interval)
+    print(f"Watching {', '.join(roots)} ({watcher.name}). Ctrl-C to stop.")
+    try:
+        while True:
+            changed = next_batch(watcher, args.debounce)
+            start = time.perf_counter()
+            if changed is None:
+                scanned = session.scan_all()
+                findings, files = session.totals()
+                print(f"[{time.strftime('%H:%M:%S')}] events lost, rescanned {scanned} file(s): "
+                      f"{findings} finding(s) in {files} file(s)")
+            else:
+                diffs = session.update(changed)
+                print_diffs(diffs, (time.perf_counter() - start) * 1000, len(changed))
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+    findings, files = session.totals()
+    print(f"\n{findings} finding(s) in {files} file(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+EcoCompute — Workload Benchmark Harness
+
+Measures the energy of *your* code instead of a synthetic matmul, so the CI
+gate can tell whether a PR made inference more expensive:
+
+    python workload.py --command "python bench/generate.py --max-new-tokens 64" --runs 5
+    python workload.py --callable bench.serve:run_batch --runs 10 --warmup 2
+    python workload.py --command "sleep 0.2" --fake-watts 150     # no power sensor needed
+
+A command is run through the shell; a callable is `module:function`, imported
+from the workspace. A callable may return the number of work units it
+processed (tokens, requests), which makes throughput units/s; otherwise
+`--units` per run is used (default 1, i.e. runs/s).
+
+Each repetition is timed while the profiler's background thread samples
+power (any PowerSource: nvidia-smi, RAPL, a replayed trace, a fake), and
+joules are integrated over each run's window. Warmup runs are executed but
+not recorded. Results: mean J/run with its standard deviation, throughput,
+and J per unit. In the Action they are stored in the baseline (per hardware
+hash), and the gate compares J/run against it.
+"""
+
+import argparse
+import importlib
+import math
+import os
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Optional, Union
+
+from power import FakePowerSource, PowerSource, default_power_source
+from profiler import EnergyProfiler
+
+DEFAULT_RUNS = 5
+DEFAULT_WARMUP = 1
+DEFAULT_INTERVAL_S = 0.05
+
+
+class WorkloadError(RuntimeError):
+    """The benchmark command failed or the callable could not be loaded."""
+
+
+@dataclass
+class WorkloadResult:
+    """Energy and speed of one workload over N measured repetitions."""
+    name: str = ""
+    runs: int = 0
+    warmup: int = 0
+    j_per_run: float = 0.0
+    j_per_run_std: float = 0.0
+    seconds_per_run: float = 0.0
+    seconds_per_run_std: float = 0.0
+    units_per_run: float = 0.0
+    throughput: float = 0.0          # units/s
+    j_per_unit: float = 0.0
+    avg_power_w: float = 0.0
+    power_domains: str = ""
+    run_joules: list = field(default_factory=list)
+    run_seconds: list = field(default_factory=list)
+
+    @property
+    def measured_energy(self) -> bool:
+        return self.j_per_run > 0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "WorkloadResult":
+        return cls(**{k: v for k, v in d.items() if k in cls.__dataclass_fields__})
+
+
+def load_callable(spec: str, search_path: str = ".") -> Callable:
+    """Resolve `package.module:function` (imported from `search_path`)."""
+    module_name, _, attr = spec.partition(":")
+    if not module_name or not attr:
+        raise WorkloadError(f"callable must be 'module:function', got '{spec}'")
+    if search_path not in sys.path:
+        sys.path.insert(0, search_path)
+    try:
+        target = importlib.import_module(module_name)
+    except ImportError as e:
+        raise WorkloadError(f"cannot import {module_name}: {e}") from e
+    for part in attr.split("."):
+        target = getattr(target, part, None)
+        if target is None:
+            raise WorkloadError(f"{module_name} has no attribute {attr}")
+    if not callable(target):
+        raise WorkloadError(f"{spec} is not callable")
+    return target
+
+
+def command_runner(command: str, cwd: Optional[str] = None) -> Callable[[], None]:
+    """A zero-argument runner for a shell command; raises on non-zero exit."""
+    def run():
+        r = subprocess.run(command, shell=True, cwd=cwd,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if r.returncode != 0:
+            tail = ' / '.join(r.stderr.strip().splitlines()[-3:])
+            raise WorkloadError(f"`{command}` exited {r.returncode}" + (f": {tail}" if tail else ""))
+    return run
+
+
+def run_workload(
+    target: Union[str, Callable],
+    runs: int = DEFAULT_RUNS,
+    warmup: int = DEFAULT_WARMUP,
+    units: float = 1.0,
+    power_source: Optional[PowerSource] = None,
+    interval_s: float = DEFAULT_INTERVAL_S,
+    name: Optional[str] = None,
+    cwd: Optional[str] = None,
+) -> WorkloadResult:
+    """Run `target` (shell command or callable) `warmup` + `runs` times and
+    attribute sampled energy to each measured run.
+    """
+    if runs < 1:
+        raise WorkloadError(f"runs must be at least 1, got {runs}")
+    if warmup < 0:
+        raise WorkloadError(f"warmup must not be negative, got {warmup}")
+    if isinstance(target, str):
+        fn, label = command_runner(target, cwd), name or target
+    else:
+        fn, label = target, name or getattr(target, "__qualname__", "workload")
+
+    for _ in range(warmup):
+        fn()
+
+    profiler = EnergyProfiler(power_source or default_power_source(), interval_s)
+    records, unit_counts = [], []
+    with profiler:
+        for _ in range(runs):
+            with profiler.measure(label) as record:
+                returned = fn()
+            records.append(record)
+            unit_counts.append(
+                float(returned) if isinstance(returned, (int, float)) and returned > 0 else units
+            )
+
+    result = WorkloadResult(name=label, runs=runs, warmup=warmup,
+                            power_domains=profiler.source.domain)
+    result.run_seconds = [r.end - r.start for r in records]
+    result.run_joules = [profiler.call_joules(r) for r in records]
+    result.seconds_per_run = statistics.fmean(result.run_seconds)
+    result.seconds_per_run_std = statistics.stdev(result.run_seconds) if runs > 1 else 0.0
+    result.j_per_run = statistics.fmean(result.run_joules)
+    result.j_per_run_std = statistics.stdev(result.run_joules) if runs > 1 else 0.0
+    result.units_per_run = statistics.fmean(unit_counts)
+    total_s = sum(result.run_seconds)
+    if total_s > 0:
+        result.throughput = sum(unit_counts) / total_s
+        result.avg_power_w = sum(result.run_joules) / total_s
+    if result.units_per_run > 0:
+        result.j_per_unit = result.j_per_run / result.units_per_run
+    if not result.measured_energy:
+        result.power_domains = ""
+    return result
+
+
+def workload_from_env(power_source: Optional[PowerSource] = None) -> Optional[WorkloadResult]:
+    """Run the workload configured by the Action inputs, if any
+    (WORKLOAD_COMMAND or WORKLOAD_CALLABLE, WORKLOAD_RUNS, WORKLOAD_WARMUP,
+    WORKLOAD_UNITS). Returns None when no workload is configured.
+    """
+    command = os.environ.get("WORKLOAD_COMMAND", "").strip()
+    spec = os.environ.get("WORKLOAD_CALLABLE", "").strip()
+    if not command and not spec:
+        return None
+    workspace = os.environ.get("GITHUB_WORKSPACE", ".")
+    try:
+        runs = int(os.environ.get("WORKLOAD_RUNS") or DEFAULT_RUNS)
+        warmup = int(os.environ.get("WORKLOAD_WARMUP") or DEFAULT_WARMUP)
+        units = float(os.environ.get("WORKLOAD_UNITS") or 1)
+    except ValueError as e:
+        raise WorkloadError(f"invalid workload-runs/warmup/units: {e}") from e
+    target = command or load_callable(spec, workspace)
+    return run_workload(
+        target,
+        runs=runs,
+        warmup=warmup,
+        units=units,
+        power_source=power_source,
+        name=command or spec,
+        cwd=workspace,
+    )
+
+
+def change_is_significant(current: WorkloadResult, baseline_mean: float,
+                          baseline_std: float, baseline_runs: int, z: float = 2.0) -> bool:
+    """Whether the J/run difference exceeds `z` standard errors of the
+    difference of means, so run-to-run noise alone does not fail the gate.
+    """
+    se = math.sqrt(
+        (current.j_per_run_std ** 2) / max(current.runs, 1)
+        + (baseline_std ** 2) / max(baseline_runs, 1)
+    )
+    diff = abs(current.j_per_run - baseline_mean)
+    return diff > z * se if se > 0 else diff > 0
+
+
+def format_workload(result: WorkloadResult) -> str:
+    """Markdown section for the audit report."""
+    cv = result.j_per_run_std / result.j_per_run * 100 if result.j_per_run else 0.0
+    lines = []
+    lines.append("### 🏋️ Workload Benchmark")
+    lines.append("")
+    lines.append("| Metric | Value |")
+    lines.append("|--------|-------|")
+    lines.append(f"| Workload | `{result.name}` |")
+    lines.append(f"| Runs | {result.runs} (+{result.warmup} warmup) |")
+    if result.measured_energy:
+        lines.append(f"| Energy / run | **{result.j_per_run:.1f} J** ± {result.j_per_run_std:.1f} "
+                     f"(CV {cv:.1f}%) |")
+        lines.append(f"| Avg power | {result.avg_power_w:.0f}W ({result.power_domains}) |")
+    else:
+        lines.append("| Energy / run | — (no power readings on this runner) |")
+    lines.append(f"| Time / run | {result.seconds_per_run:.3f}s ± {result.seconds_per_run_std:.3f} |")
+    lines.append(f"| Throughput | {result.throughput:.2f} units/s ({result.units_per_run:g} units/run) |")
+    if result.j_per_unit:
+        lines.append(f"| Energy / unit | {result.j_per_unit:.3f} J |")
+    lines.append("")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EcoCompute workload energy benchmark")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--command", help="Shell command to benchmark")
+    target.add_argument("--callable", help="Python callable as module:function")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    parser.add_argument("--units", type=float, default=1.0,
+                        help="Work units per run when the callable does not return a count")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL_S,
+                        help="Power sampling interval (s)")
+    parser.add_argument("--fake-watts", type=float, default=None,
+                        help="Use a constant fake power source (testing)")
+    args = parser.parse_args()
+
+    source = FakePowerSource(args.fake_watts) if args.fake_watts else None
+    try:
+        fn = args.command or load_callable(args.callable)
+        start = time.perf_counter()
+        result = run_workload(fn, args.runs, args.warmup, args.units, source,
+                              args.interval, name=args.command or args.callable)
+    except WorkloadError as e:
+        raise SystemExit(f"workload.py: {e}")
+    print(format_workload(result))
+    print(f"*{time.perf_counter() - start:.1f}s total including warmup.*")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,42 @@
-import React, { useState } from 'react';
+import React, { useEffect, useMemo, useState } from 'react';
 import {
   LineChart, Line, BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip,
   Legend, ResponsiveContainer, ComposedChart, Area
 } from 'recharts';
 import { Zap, TrendingUp, Cpu, DollarSign, AlertTriangle, ArrowRight, Download } from 'lucide-react';
+import { BatchSizeCurve, loadDashboardBundle } from '../services/dashboardData';
 
 // ── A800 Batch Size Experiment Data (Real measurements, 2026-02-15) ──────────
-const BATCH_SIZE_DATA = [
-  { bs: 1,  throughput: 19.0,   energy: 1768, gpu_util: 45.3, memory: 8.4,  power: 252 },
-  { bs: 2,  throughput: 37.7,   energy: 935,  gpu_util: 47.4, memory: 8.5,  power: 264 },
-  { bs: 4,  throughput: 75.6,   energy: 495,  gpu_util: 50.9, memory: 8.6,  power: 280 },
-  { bs: 8,  throughput: 150.3,  energy: 284,  gpu_util: 50.4, memory: 9.0,  power: 282 },
-  { bs: 16, throughput: 296.4,  energy: 205,  gpu_util: 76.8, memory: 9.7,  power: 296 },
-  { bs: 32, throughput: 577.4,  energy: 100,  gpu_util: 63.6, memory: 11.4, power: 305 },
-  { bs: 64, throughput: 1052.5, energy: 76,   gpu_util: 91.0, memory: 14.6, power: 314 },
+interface BatchRow {
+  bs: number; throughput: number; energy: number; gpu_util: number; memory: number; power: number;
+  delta_ci?: [number, number] | null;   // 95% bootstrap CI of the change vs BS=1, in %
+}
+
+// Shown until the dashboard bundle (built from metadata/) has loaded
+const BATCH_SIZE_DATA: BatchRow[] = [
+  { bs: 1,  throughput: 19.0,   energy: 1768, gpu_util: 45.3, memory: 8.4,  power: 131 },
+  { bs: 2,  throughput: 37.7,   energy: 935,  gpu_util: 47.4, memory: 8.5,  power: 138 },
+  { bs: 4,  throughput: 75.6,   energy: 495,  gpu_util: 50.9, memory: 8.6,  power: 146 },
+  { bs: 8,  throughput: 150.3,  energy: 284,  gpu_util: 50.4, memory: 9.0,  power: 167 },
+  { bs: 16, throughput: 296.4,  energy: 205,  gpu_util: 76.8, memory: 9.7,  power: 238 },
+  { bs: 32, throughput: 577.4,  energy: 100,  gpu_util: 63.6, memory: 11.4, power: 227 },
+  { bs: 64, throughput: 1052.5, energy: 76,   gpu_util: 91.0, memory: 14.6, power: 312 },
 ];
 
-const CHART_DATA = BATCH_SIZE_DATA.map(d => ({
+const BUNDLE_CURVE = /^a800_batch_size_/;
+
+const rowsFromCurve = (curve: BatchSizeCurve): BatchRow[] =>
+  curve.points.map(p => ({
+    bs: p.batch_size,
+    throughput: Math.round(p.throughput_tok_s * 10) / 10,
+    energy: Math.round(p.energy_per_request_j),
+    gpu_util: Math.round(p.gpu_util_pct * 10) / 10,
+    memory: Math.round(p.peak_memory_gb * 10) / 10,
+    power: Math.round(p.power_w),
+    delta_ci: p.energy_change_ci_pct,
+  }));
+
+const toChartData = (rows: BatchRow[]) => rows.map(d => ({
   name: `BS=${d.bs}`,
   batchSize: d.bs,
   'Energy/Request (J)': d.energy,
@@ -52,13 +72,29 @@ export const BatchSizeAnalysis: React.FC = () => {
   const [requests, setRequests] = useState(1_000_000);
   const [price, setPrice] = useState(0.12);
 
-  const bs1Cost = calcDailyCost(1768, requests, price);
-  const bs16Cost = calcDailyCost(205, requests, price);
-  const bs64Cost = calcDailyCost(76, requests, price);
+  const [data, setData] = useState<BatchRow[]>(BATCH_SIZE_DATA);
+
+  useEffect(() => {
+    let cancelled = false;
+    loadDashboardBundle()
+      .then(bundle => {
+        const curve = bundle.batch_size_curves.find(c => BUNDLE_CURVE.test(c.id));
+        if (!cancelled && curve && curve.points.length) setData(rowsFromCurve(curve));
+      })
+      .catch(() => undefined);   // keep the built-in figures
+    return () => { cancelled = true; };
+  }, []);
+
+  const chartData = useMemo(() => toChartData(data), [data]);
+  const energyAt = (bs: number) => data.find(d => d.bs === bs)?.energy ?? 0;
+  const bs1Energy = energyAt(1);
+  const bs1Cost = calcDailyCost(bs1Energy, requests, price);
+  const bs16Cost = calcDailyCost(energyAt(16), requests, price);
+  const bs64Cost = calcDailyCost(energyAt(64), requests, price);
 
   const downloadCsv = () => {
     const headers = ['batch_size', 'throughput_tok_s', 'energy_per_request_j', 'gpu_util_pct', 'memory_gb', 'avg_power_w'];
-    const rows = BATCH_SIZE_DATA.map(d => [d.bs, d.throughput, d.energy, d.gpu_util, d.memory, d.power]);
+    const rows = data.map(d => [d.bs, d.throughput, d.energy, d.gpu_util, d.memory, d.power]);
     const csv = [headers, ...rows].map(r => r.join(',')).join('\n');
     const blob = new Blob([csv], { type: 'text/csv' });
     const url = URL.createObjectURL(blob);
@@ -148,7 +184,7 @@ export const BatchSizeAnalysis: React.FC = () => {
         <div className="bg-white rounded-2xl p-5 border border-slate-200 shadow-sm">
           <h3 className="text-sm font-semibold text-slate-700 mb-4">Energy per Request (J) vs Batch Size</h3>
           <ResponsiveContainer width="100%" height={280}>
-            <ComposedChart data={CHART_DATA}>
+            <ComposedChart data={chartData}>
               <CartesianGrid strokeDasharray="3 3" stroke="#e2e8f0" />
               <XAxis dataKey="name" tick={{ fontSize: 11 }} />
               <YAxis tick={{ fontSize: 11 }} />
@@ -181,7 +217,7 @@ export const BatchSizeAnalysis: React.FC = () => {
         <div className="bg-white rounded-2xl p-5 border border-slate-200 shadow-sm">
           <h3 className="text-sm font-semibold text-slate-700 mb-4">Throughput (tokens/s) vs Batch Size</h3>
           <ResponsiveContainer width="100%" height={280}>
-            <ComposedChart data={CHART_DATA}>
+            <ComposedChart data={chartData}>
               <CartesianGrid strokeDasharray="3 3" stroke="#e2e8f0" />
               <XAxis dataKey="name" tick={{ fontSize: 11 }} />
               <YAxis tick={{ fontSize: 11 }} />
@@ -217,7 +253,7 @@ export const BatchSizeAnalysis: React.FC = () => {
         <div className="bg-white rounded-2xl p-5 border border-slate-200 shadow-sm">
           <h3 className="text-sm font-semibold text-slate-700 mb-4">GPU Utilization (%) vs Batch Size</h3>
           <ResponsiveContainer width="100%" height={280}>
-            <BarChart data={CHART_DATA}>
+            <BarChart data={chartData}>
               <CartesianGrid strokeDasharray="3 3" stroke="#e2e8f0" />
               <XAxis dataKey="name" tick={{ fontSize: 11 }} />
               <YAxis domain={[0, 100]} tick={{ fontSize: 11 }} />
@@ -241,7 +277,7 @@ export const BatchSizeAnalysis: React.FC = () => {
         <div className="bg-white rounded-2xl p-5 border border-slate-200 shadow-sm">
           <h3 className="text-sm font-semibold text-slate-700 mb-4">Peak Memory (GB) & Power (W) vs Batch Size</h3>
           <ResponsiveContainer width="100%" height={280}>
-            <ComposedChart data={CHART_DATA}>
+            <ComposedChart data={chartData}>
               <CartesianGrid strokeDasharray="3 3" stroke="#e2e8f0" />
               <XAxis dataKey="name" tick={{ fontSize: 11 }} />
               <YAxis yAxisId="left" tick={{ fontSize: 11 }} />
@@ -391,15 +427,16 @@ export const BatchSizeAnalysis: React.FC = () => {
               </tr>
             </thead>
             <tbody>
-              {BATCH_SIZE_DATA.map((d, i) => {
-                const delta = i === 0 ? '—' : `−${((1 - d.energy / 1768) * 100).toFixed(1)}%`;
+              {data.map((d, i) => {
+                const delta = i === 0 ? '—' : `−${((1 - d.energy / bs1Energy) * 100).toFixed(1)}%`;
+                const ci = i > 0 && d.delta_ci ? `95% CI ${d.delta_ci[0].toFixed(1)}% to ${d.delta_ci[1].toFixed(1)}%` : undefined;
                 const rowBg = i % 2 === 0 ? 'bg-slate-50/50' : '';
                 return (
                   <tr key={d.bs} className={`${rowBg} border-b border-slate-100 hover:bg-slate-50`}>
                     <td className="py-2.5 px-3 font-semibold text-slate-700">{d.bs}</td>
                     <td className="py-2.5 px-3 text-right text-slate-600">{d.throughput.toLocaleString()}</td>
                     <td className="py-2.5 px-3 text-right text-slate-600">{d.energy.toLocaleString()}</td>
-                    <td className={`py-2.5 px-3 text-right font-semibold ${i === 0 ? 'text-slate-400' : 'text-green-600'}`}>{delta}</td>
+                    <td title={ci} className={`py-2.5 px-3 text-right font-semibold ${i === 0 ? 'text-slate-400' : 'text-green-600'}`}>{delta}</td>
                     <td className="py-2.5 px-3 text-right text-slate-600">{d.gpu_util}</td>
                     <td className="py-2.5 px-3 text-right text-slate-600">{d.memory}</td>
                     <td className="py-2.5 px-3 text-right text-slate-600">{d.power}</td>
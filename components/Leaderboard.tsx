@@ -3,6 +3,7 @@ import { INITIAL_MODELS } from '../constants';
 import { ModelData, SortField, SortDirection, DataConfidence } from '../types';
 import { ArrowUpDown, ArrowUp, ArrowDown, Sparkles, Filter, Activity, Play, Pause, ArrowRight, Layers, SlidersHorizontal, Info } from 'lucide-react';
 import { analyzeLeaderboard } from '../services/geminiService';
+import { applyMeasurements, loadDashboardBundle } from '../services/dashboardData';
 import { ApiConfig } from './SettingsPanel';
 
 // Confidence badge styling
@@ -98,6 +99,17 @@ export const Leaderboard: React.FC<LeaderboardProps> = ({ apiConfig, onOpenTempl
     energyEfficiency: 15,
   });
 
+  // Measured entries follow the dashboard bundle built from metadata/
+  useEffect(() => {
+    let cancelled = false;
+    loadDashboardBundle()
+      .then(bundle => {
+        if (!cancelled) setModels(prev => applyMeasurements(prev, bundle));
+      })
+      .catch(() => undefined);   // keep the built-in figures
+    return () => { cancelled = true; };
+  }, []);
+
   // Support URL parameter for filtering
   useEffect(() => {
     const params = new URLSearchParams(window.location.search);
@@ -159,6 +159,7 @@ export const INITIAL_MODELS: ModelData[] = [
   // Yi-1.5-6B-Chat
   {
     id: 'yi-1.5-6b-fp16',
+    bundleKey: 'RTX 4090D/yi_1.5_6b/bs1/fp16',
     name: 'Yi-1.5-6B-Chat (FP16)',
     provider: 'RTX 4090D Benchmark',
     accuracy: 88.5,
@@ -195,6 +196,7 @@ export const INITIAL_MODELS: ModelData[] = [
   },
   {
     id: 'yi-1.5-6b-int8',
+    bundleKey: 'RTX 4090D/yi_1.5_6b/bs1/int8_default',
     name: 'Yi-1.5-6B-Chat (INT8) ⚠️',
     provider: 'RTX 4090D Benchmark',
     accuracy: 87.8,
@@ -214,6 +216,7 @@ export const INITIAL_MODELS: ModelData[] = [
   // Mistral-7B-Instruct-v0.3
   {
     id: 'mistral-7b-fp16',
+    bundleKey: 'RTX 4090D/mistral_7b/bs1/fp16',
     name: 'Mistral-7B-Instruct-v0.3 (FP16)',
     provider: 'RTX 4090D Benchmark',
     accuracy: 92.8,
@@ -250,6 +253,7 @@ export const INITIAL_MODELS: ModelData[] = [
   },
   {
     id: 'mistral-7b-int8',
+    bundleKey: 'RTX 4090D/mistral_7b/bs1/int8_default',
     name: 'Mistral-7B-Instruct-v0.3 (INT8) ⚠️',
     provider: 'RTX 4090D Benchmark',
     accuracy: 91.9,
@@ -438,13 +442,14 @@ export const INITIAL_MODELS: ModelData[] = [
   // Mistral-7B-Instruct-v0.2, Pure INT8 (threshold=0.0), 7 batch sizes
   {
     id: 'mistral-7b-int8-a800-bs1',
+    bundleKey: 'a800_batch_size_20260215_131345/bs1',
     name: 'Mistral-7B Pure INT8 (BS=1)',
     provider: 'A800 Batch Size',
     accuracy: 91.9,
     executionTime: 0.0526,  // 1000/19.0
     cost: 0.00018,
     carbonImpact: 0.070,    // 1768 J/1k * 0.4 / 3600 * 1000
-    energyEfficiency: 60,   // 19.0 / 252 * 1000 ≈ 75, adjusted for per-request
+    energyEfficiency: 145,  // 19.0 / 131 * 1000
     tags: ['8bit', 'pure-int8', 'bs1', 'a800-verified', 'inefficient'],
     provenance: {
       source: 'EcoCompute A800 Batch Size Experiment',
@@ -456,13 +461,14 @@ export const INITIAL_MODELS: ModelData[] = [
   },
   {
     id: 'mistral-7b-int8-a800-bs8',
+    bundleKey: 'a800_batch_size_20260215_131345/bs8',
     name: 'Mistral-7B Pure INT8 (BS=8)',
     provider: 'A800 Batch Size',
     accuracy: 91.9,
     executionTime: 0.0067,  // 1000/150.3
     cost: 0.00003,
     carbonImpact: 0.011,    // 284 J/1k
-    energyEfficiency: 533,   // 150.3 / 282 * 1000
+    energyEfficiency: 902,  // 150.3 / 167 * 1000
     tags: ['8bit', 'pure-int8', 'bs8', 'a800-verified'],
     provenance: {
       source: 'EcoCompute A800 Batch Size Experiment',
@@ -474,13 +480,14 @@ export const INITIAL_MODELS: ModelData[] = [
   },
   {
     id: 'mistral-7b-int8-a800-bs16',
+    bundleKey: 'a800_batch_size_20260215_131345/bs16',
     name: 'Mistral-7B Pure INT8 (BS=16) ⭐',
     provider: 'A800 Batch Size',
     accuracy: 91.9,
     executionTime: 0.0034,  // 1000/296.4
     cost: 0.00002,
     carbonImpact: 0.008,    // 205 J/1k
-    energyEfficiency: 1002,  // 296.4 / 296 * 1000
+    energyEfficiency: 1247, // 296.4 / 238 * 1000
     tags: ['8bit', 'pure-int8', 'bs16', 'a800-verified', 'energy-efficient'],
     provenance: {
       source: 'EcoCompute A800 Batch Size Experiment',
@@ -492,13 +499,14 @@ export const INITIAL_MODELS: ModelData[] = [
   },
   {
     id: 'mistral-7b-int8-a800-bs64',
+    bundleKey: 'a800_batch_size_20260215_131345/bs64',
     name: 'Mistral-7B Pure INT8 (BS=64) ⭐',
     provider: 'A800 Batch Size',
     accuracy: 91.9,
     executionTime: 0.00095, // 1000/1052.5
     cost: 0.000008,
     carbonImpact: 0.003,    // 76 J/1k
-    energyEfficiency: 3354,  // 1052.5 / 314 * 1000
+    energyEfficiency: 3373, // 1052.5 / 312 * 1000
     tags: ['8bit', 'pure-int8', 'bs64', 'a800-verified', 'energy-efficient'],
     provenance: {
       source: 'EcoCompute A800 Batch Size Experiment',
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+EcoCompute — Streaming Run Aggregator
+
+Turns raw per-run experiment CSVs into a per-group summary with one header
+row (the pandas groupby summaries in `metadata/` have three):
+
+    python scripts/aggregate_runs.py metadata/batch_size_experiment/*_raw_*.csv \\
+        --group-by batch_size -o summary.csv
+
+    # aggregate each day's log separately, combine later
+    python scripts/aggregate_runs.py day1_raw.csv --group-by batch_size --save-state day1.json
+    python scripts/aggregate_runs.py day1.json day2.json --group-by batch_size -o summary.csv
+
+Rows are read one at a time and folded into a Welford accumulator per
+(group, column), so memory depends on the number of groups, not on how many
+runs were logged. Saved states (JSON) hold count/mean/M2/min/max and merge
+exactly (Chan et al.'s parallel update), so summaries of separate runs or
+files combine into the same numbers as one pass over all rows. CSV and
+state inputs can be mixed.
+
+Output columns: the group-by columns, `runs`, then `<column>_mean`,
+`_std` (sample, n−1, as pandas reports), `_min` and `_max` for every
+numeric column.
+"""
+
+import argparse
+import csv
+import json
+import math
+import sys
+from pathlib import Path
+from typing import Iterable, Optional, TextIO
+
+STATE_VERSION = 1
+
+
+class RunningStats:
+    """Welford's online mean/variance, plus min and max."""
+
+    __slots__ = ("count", "mean", "m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, x: float):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+
+    def merge(self, other: "RunningStats"):
+        """Combine with another accumulator (Chan et al.)."""
+        if not other.count:
+            return
+        if not self.count:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / n
+        self.m2 += other.m2 + delta * delta * self.count * other.count / n
+        self.count = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (n−1); 0 for fewer than two values."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "mean": self.mean, "m2": self.m2,
+                "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "RunningStats":
+        stats = cls()
+        stats.count, stats.mean, stats.m2 = int(d["count"]), float(d["mean"]), float(d["m2"])
+        stats.min, stats.max = float(d["min"]), float(d["max"])
+        return stats
+
+
+class Aggregator:
+    """Per-group RunningStats for every numeric column of streamed rows."""
+
+    def __init__(self, group_by: list[str], columns: Optional[list[str]] = None):
+        self.group_by = list(group_by)
+        self.columns = list(columns) if columns else None
+        self.groups: dict[tuple, dict[str, RunningStats]] = {}
+        self.runs: dict[tuple, int] = {}
+        self._seen_columns: list[str] = []     # numeric columns in first-seen order
+
+    def _key(self, row: dict) -> tuple:
+        try:
+            return tuple(row[c] for c in self.group_by)
+        except KeyError as e:
+            raise ValueError(f"group-by column {e} not in the input") from None
+
+    def _note_column(self, column: str):
+        if column not in self._seen_columns:
+            self._seen_columns.append(column)
+
+    def add_row(self, row: dict):
+        key = self._key(row)
+        stats = self.groups.setdefault(key, {})
+        self.runs[key] = self.runs.get(key, 0) + 1
+        for column in self.columns or row:
+            if column in self.group_by:
+                continue
+            value = row.get(column)
+            if value is None or value == "":
+                continue
+            try:
+                x = float(value)
+            except ValueError:
+                continue                       # non-numeric column (labels, paths)
+            if math.isnan(x):
+                continue
+            self._note_column(column)
+            stats.setdefault(column, RunningStats()).add(x)
+
+    def add_csv(self, f: TextIO):
+        for row in csv.DictReader(f):
+            self.add_row(row)
+
+    def merge(self, other: "Aggregator"):
+        if other.group_by != self.group_by:
+            raise ValueError(f"cannot merge states grouped by {other.group_by} into {self.group_by}")
+        for column in other._seen_columns:
+            self._note_column(column)
+        for key, columns in other.groups.items():
+            mine = self.groups.setdefault(key, {})
+            self.runs[key] = self.runs.get(key, 0) + other.runs.get(key, 0)
+            for column, stats in columns.items():
+                mine.setdefault(column, RunningStats()).merge(stats)
+
+    # -- persistence ---------------------------------------------------------
+
+    def to_dict(self) -> dict:
+        return {
+            "version": STATE_VERSION,
+            "group_by": self.group_by,
+            "columns": self._seen_columns,
+            "groups": [
+                {"key": list(key), "runs": self.runs[key],
+                 "stats": {c: s.to_dict() for c, s in columns.items()}}
+                for key, columns in self.groups.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Aggregator":
+        if d.get("version") != STATE_VERSION:
+            raise ValueError(f"unsupported aggregate state version {d.get('version')}")
+        agg = cls(d["group_by"])
+        agg._seen_columns = list(d.get("columns", []))
+        for group in d["groups"]:
+            key = tuple(group["key"])
+            agg.runs[key] = int(group["runs"])
+            agg.groups[key] = {c: RunningStats.from_dict(s) for c, s in group["stats"].items()}
+        return agg
+
+    # -- output --------------------------------------------------------------
+
+    def sorted_keys(self) -> list[tuple]:
+        """Group keys, numerically where the values are numbers."""
+        def sort_key(key):
+            out = []
+            for v in key:
+                try:
+                    out.append((0, float(v), ""))
+                except ValueError:
+                    out.append((1, 0.0, v))
+            return out
+        return sorted(self.groups, key=sort_key)
+
+    def summary_columns(self) -> list[str]:
+        return self.columns or self._seen_columns
+
+    def write_summary(self, f: TextIO, digits: Optional[int] = None):
+        """One header row: group-by columns, runs, <col>_mean/_std/_min/_max."""
+        def fmt(x: float) -> str:
+            if math.isinf(x):
+                return ""
+            return repr(round(x, digits)) if digits is not None else repr(x)
+
+        columns = self.summary_columns()
+        writer = csv.writer(f, lineterminator="\n")
+        header = self.group_by + ["runs"]
+        for c in columns:
+            header += [f"{c}_mean", f"{c}_std", f"{c}_min", f"{c}_max"]
+        writer.writerow(header)
+        for key in self.sorted_keys():
+            row = list(key) + [self.runs[key]]
+            for c in columns:
+                s = self.groups[key].get(c)
+                row += [fmt(s.mean), fmt(s.std), fmt(s.min), fmt(s.max)] if s else ["", "", "", ""]
+            writer.writerow(row)
+
+
+def aggregate_paths(paths: Iterable[Path], group_by: list[str],
+                    columns: Optional[list[str]] = None) -> Aggregator:
+    """Stream CSVs and fold in saved states (*.json) into one Aggregator."""
+    agg = Aggregator(group_by, columns)
+    for path in paths:
+        if path.suffix == ".json":
+            agg.merge(Aggregator.from_dict(json.loads(path.read_text())))
+        else:
+            with open(path, newline="") as f:
+                agg.add_csv(f)
+    return agg
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming per-group summary of raw run CSVs")
+    parser.add_argument("inputs", nargs="+", type=Path,
+                        help="Raw CSVs and/or saved states (*.json) to combine")
+    parser.add_argument("--group-by", required=True,
+                        help="Comma-separated grouping column(s), e.g. batch_size")
+    parser.add_argument("--columns", default=None,
+                        help="Comma-separated columns to summarize (default: every numeric column)")
+    parser.add_argument("-o", "--output", type=Path, default=None,
+                        help="Summary CSV (default: stdout)")
+    parser.add_argument("--save-state", type=Path, default=None,
+                        help="Also write the mergeable aggregate state (JSON)")
+    parser.add_argument("--digits", type=int, default=None,
+                        help="Round summary values to this many decimals")
+    args = parser.parse_args()
+
+    group_by = [c.strip() for c in args.group_by.split(",") if c.strip()]
+    columns = [c.strip() for c in args.columns.split(",")] if args.columns else None
+    try:
+        agg = aggregate_paths(args.inputs, group_by, columns)
+    except (OSError, ValueError, KeyError) as e:
+        raise SystemExit(f"aggregate_runs.py: {e}")
+
+    if args.save_state:
+        args.save_state.write_text(json.dumps(agg.to_dict(), indent=1) + "\n")
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            agg.write_summary(f, args.digits)
+    else:
+        agg.write_summary(sys.stdout, args.digits)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+EcoCompute — Dashboard Data Bundle
+
+Builds the one static file the dashboard needs from the measurement files in
+`metadata/`, instead of numbers copied by hand into `constants.ts`,
+`Leaderboard.tsx` and `BatchSizeAnalysis.tsx`:
+
+    python scripts/build_dashboard_bundle.py            # writes public/data/
+    python scripts/build_dashboard_bundle.py --check    # CI: fail if stale
+
+Ingested:
+- `metadata/*_metadata.json` — every `results` entry with `energy_per_1k`
+  (A800 batch sizes 1/4/8, RTX 4090D pure-INT8 ablation), plus the RTX 5090
+  NF4 deltas recorded under `key_findings`
+- `metadata/batch_size_experiment/*_raw_*.csv` — per-run rows, streamed
+  through `aggregate_runs.py` per batch size rather than trusting the
+  summary CSV
+
+Precomputed: per-GPU/quantization means, the batch-size curve (mean/std per
+batch size and energy relative to BS=1), and paradox deltas (energy of each
+quantization vs FP16 on the same GPU, model and batch size). Deltas and
+batch-size ratios carry 95% bootstrap intervals (`action/stats.py`, one
+vectorized pass over every group): the sweep's per-run rows are resampled,
+metadata cells are drawn from their mean ± std over the recorded runs.
+Values without a recorded spread get `null`. Needs NumPy.
+
+The measured Mistral-7B BS=1 values are checked against the Action's
+`REFERENCE_ENERGY`; the build fails if they disagree, so the dashboard and
+the CI gate cannot drift apart.
+
+Output is minified JSON with sorted keys, named by its content hash
+(`dashboard-bundle.<sha256[:12]>.json`) so it can be cached forever, and a
+small `dashboard-manifest.json` that points at it. The dashboard fetches the
+manifest, then prefetches the bundle.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import re
+import statistics
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "action"))
+
+from aggregate_runs import aggregate_paths  # noqa: E402
+from calibrate import BS_ENERGY_SCALE, REFERENCE_ENERGY  # noqa: E402
+from stats import Group, bootstrap_ratios  # noqa: E402
+
+BUNDLE_VERSION = 1
+DEFAULT_METADATA = ROOT / "metadata"
+DEFAULT_OUT = ROOT / "public" / "data"
+MANIFEST_NAME = "dashboard-manifest.json"
+REFERENCE_MODEL = "mistral_7b"       # REFERENCE_ENERGY is Mistral-7B, BS=1
+REFERENCE_TOLERANCE_PCT = 0.5
+
+
+class BundleError(RuntimeError):
+    """Inconsistent or unreadable measurement data."""
+
+
+# ---------------------------------------------------------------------------
+# Ingestion
+# ---------------------------------------------------------------------------
+
+def arch_key(architecture: str) -> str:
+    """'Ada Lovelace' → 'ada', as used by REFERENCE_ENERGY."""
+    return architecture.split()[0].lower()
+
+
+def quant_key(config: str) -> str:
+    """'fp16_baseline' → 'fp16'."""
+    return config.removesuffix("_baseline")
+
+
+def _number(value) -> Optional[float]:
+    return float(value) if isinstance(value, (int, float)) else None
+
+
+def runs_per_config(meta: dict) -> Optional[int]:
+    """Measured repetitions per configuration, wherever the file records it."""
+    for section in meta.values():
+        if isinstance(section, dict):
+            for key in ("repetitions_per_config", "measurement_iterations"):
+                if isinstance(section.get(key), int):
+                    return section[key]
+    m = re.search(r'Measurement: (\d+) iterations', json.dumps(meta))
+    return int(m.group(1)) if m else None
+
+
+def load_metadata_results(path: Path) -> tuple[list[dict], list[dict]]:
+    """(measurements, finding deltas) from one metadata file.
+
+    `results` is keyed either `batch_size_N → config → metrics` (one model)
+    or `model_id → config → metrics` (BS=1). Anything else under `results`
+    (summaries) has no `energy_per_1k` and is ignored.
+    """
+    meta = json.loads(path.read_text())
+    gpu = meta["hardware"]["gpu"]
+    base = {"gpu": gpu["model"].removeprefix("NVIDIA ").removeprefix("GeForce "),
+            "architecture": arch_key(gpu["architecture"]), "source": path.name}
+    runs = runs_per_config(meta)
+
+    tested = meta.get("models_tested") or ([meta["model_tested"]] if "model_tested" in meta else [])
+    models = {m["model_id"]: m["name"] for m in tested}
+    single = meta.get("model_tested", {}).get("model_id")
+
+    measurements = []
+    for key, group in (meta.get("results") or {}).items():
+        bs = re.fullmatch(r'batch_size_(\d+)', key)
+        model_id, batch_size = (single, int(bs.group(1))) if bs else (key, 1)
+        if not isinstance(group, dict):
+            continue
+        for config, metrics in group.items():
+            if not isinstance(metrics, dict) or "energy_per_1k" not in metrics:
+                continue
+            measurements.append({
+                **base,
+                "model": model_id,
+                "model_name": models.get(model_id, model_id),
+                "quantization": quant_key(config),
+                "batch_size": batch_size,
+                "runs": runs,
+                "throughput_tok_s": _number(metrics.get("throughput_mean")),
+                "throughput_std": _number(metrics.get("throughput_std")),
+                "power_w": _number(metrics.get("power_mean")),
+                "power_std": _number(metrics.get("power_std")),
+                "energy_j_per_1k": float(metrics["energy_per_1k"]),
+                "energy_std": _number(metrics.get("energy_std")),
+            })
+
+    # RTX 5090 NF4 crossover: only the deltas are recorded ("+26.5% energy vs FP16")
+    deltas = []
+    for finding in (meta.get("key_findings") or {}).values():
+        if not isinstance(finding, dict):
+            continue
+        for key, text in finding.items():
+            m = re.match(r'([+\-−]?\d+(?:\.\d+)?)% energy vs FP16', str(text))
+            if m:
+                deltas.append({
+                    **base, "model": key, "quantization": "nf4", "batch_size": 1,
+                    "vs_fp16_pct": float(m.group(1).replace("−", "-")),
+                })
+    return measurements, deltas
+
+
+def load_batch_sweep(raw_csv: Path) -> dict:
+    """Aggregate a batch-size sweep's per-run rows per batch size."""
+    meta_path = raw_csv.with_name(raw_csv.name.replace("_raw_", "_metadata_")).with_suffix(".json")
+    meta = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+
+    columns = {
+        "throughput_tok_s": "throughput_tok_s",
+        "avg_power_w": "power_w",
+        "energy_per_request_j": "energy_per_request_j",
+        "energy_per_1k_tokens_j": "energy_j_per_1k",
+    }
+    agg = aggregate_paths([raw_csv], ["batch_size"],
+                          list(columns) + ["avg_gpu_util_pct", "peak_memory_gb"])
+    if not agg.groups:
+        raise BundleError(f"{raw_csv}: no rows")
+
+    points = []
+    for key in agg.sorted_keys():
+        stats = agg.groups[key]
+        point = {"batch_size": int(key[0]), "runs": agg.runs[key]}
+        for column, name in columns.items():
+            point[name], point[f"{name}_std"] = stats[column].mean, stats[column].std
+        point["gpu_util_pct"] = stats["avg_gpu_util_pct"].mean
+        point["peak_memory_gb"] = stats["peak_memory_gb"].max
+        points.append(point)
+
+    first = points[0]["energy_j_per_1k"]
+    for point in points:
+        point["energy_scale"] = point["energy_j_per_1k"] / first
+        point["energy_change_pct"] = (point["energy_scale"] - 1) * 100
+        point["reference_scale"] = BS_ENERGY_SCALE.get(point["batch_size"])
+
+    return {
+        "id": meta.get("benchmark_id", raw_csv.stem),
+        "gpu": meta.get("gpu", ""),
+        "model": meta.get("model", ""),
+        "quantization": meta.get("quantization", ""),
+        "source": raw_csv.name,
+        "points": points,
+    }
+
+
+def load_run_energies(raw_csv: Path) -> dict[int, list[float]]:
+    """Per-run J/1k tokens of a batch-size sweep, by batch size (for resampling)."""
+    runs = defaultdict(list)
+    with open(raw_csv, newline="") as f:
+        for row in csv.DictReader(f):
+            runs[int(row["batch_size"])].append(float(row["energy_per_1k_tokens_j"]))
+    return dict(runs)
+
+
+# ---------------------------------------------------------------------------
+# Aggregates
+# ---------------------------------------------------------------------------
+
+def gpu_quant_means(measurements: list[dict]) -> list[dict]:
+    """Mean throughput/power/energy per (GPU, quantization) at BS=1 across models."""
+    groups = defaultdict(list)
+    for m in measurements:
+        if m["batch_size"] == 1:
+            groups[(m["gpu"], m["architecture"], m["quantization"])].append(m)
+
+    out = []
+    for (gpu, arch, quant), rows in sorted(groups.items()):
+        entry = {"gpu": gpu, "architecture": arch, "quantization": quant,
+                 "models": sorted(r["model"] for r in rows)}
+        for field in ("throughput_tok_s", "power_w", "energy_j_per_1k"):
+            values = [r[field] for r in rows if r[field] is not None]
+            entry[field] = statistics.fmean(values) if values else None
+        out.append(entry)
+    return out
+
+
+def paradox_deltas(measurements: list[dict], findings: list[dict]) -> list[dict]:
+    """Energy (and throughput) of each quantization vs FP16 on the same GPU,
+    model and batch size; plus deltas recorded only as findings."""
+    by_group = defaultdict(dict)
+    for m in measurements:
+        by_group[(m["gpu"], m["model"], m["batch_size"])][m["quantization"]] = m
+
+    out = []
+    for (gpu, model, bs), configs in sorted(by_group.items()):
+        fp16 = configs.get("fp16")
+        if fp16 is None:
+            continue
+        for quant, m in sorted(configs.items()):
+            if quant == "fp16":
+                continue
+            delta = {
+                "gpu": gpu, "architecture": m["architecture"], "model": model,
+                "batch_size": bs, "quantization": quant,
+                "vs_fp16_pct": (m["energy_j_per_1k"] / fp16["energy_j_per_1k"] - 1) * 100,
+                "throughput_vs_fp16_pct": None,
+                "source": m["source"],
+            }
+            if m["throughput_tok_s"] and fp16["throughput_tok_s"]:
+                delta["throughput_vs_fp16_pct"] = (m["throughput_tok_s"] / fp16["throughput_tok_s"] - 1) * 100
+            out.append(delta)
+
+    measured = {(d["gpu"], d["model"], d["batch_size"], d["quantization"]) for d in out}
+    for f in findings:
+        if (f["gpu"], f["model"], f["batch_size"], f["quantization"]) not in measured:
+            out.append({**f, "throughput_vs_fp16_pct": None})
+    return sorted(out, key=lambda d: (d["gpu"], d["model"], d["batch_size"], d["quantization"]))
+
+
+def add_intervals(measurements: list[dict], deltas: list[dict], curves: list[dict],
+                  curve_runs: list[dict[int, list[float]]]):
+    """Attach bootstrap intervals, [low, high] in percent or None:
+    `vs_fp16_ci_pct` to paradox deltas, `energy_change_ci_pct` to batch-size
+    points.
+
+    All groups go through one `bootstrap_ratios` call.
+    """
+    def name(gpu, model, bs, quant):
+        return f"{gpu}/{model}/bs{bs}/{quant}"
+
+    groups = [Group.from_summary(name(m["gpu"], m["model"], m["batch_size"], m["quantization"]),
+                                 m["energy_j_per_1k"], m["energy_std"], m["runs"] or 0)
+              for m in measurements]
+    for curve, runs in zip(curves, curve_runs):
+        groups += [Group.from_samples(f"{curve['id']}/bs{bs}", values) for bs, values in runs.items()]
+    known = {g.name for g in groups}
+
+    targets, pairs = [], []
+    for d in deltas:
+        pair = (name(d["gpu"], d["model"], d["batch_size"], d["quantization"]),
+                name(d["gpu"], d["model"], d["batch_size"], "fp16"))
+        if set(pair) <= known:
+            targets.append((d, "vs_fp16_ci_pct"))
+            pairs.append(pair)
+        else:
+            d["vs_fp16_ci_pct"] = None       # recorded only as a finding
+    for curve in curves:
+        first = curve["points"][0]["batch_size"]
+        for point in curve["points"]:
+            targets.append((point, "energy_change_ci_pct"))
+            pairs.append((f"{curve['id']}/bs{point['batch_size']}", f"{curve['id']}/bs{first}"))
+
+    for (entry, field), ci in zip(targets, bootstrap_ratios(groups, pairs)):
+        if ci is not None:
+            ci = ci.as_pct_change()
+        entry[field] = [ci.low, ci.high] if ci is not None else None
+
+
+def reference_energy(measurements: list[dict]) -> list[dict]:
+    """REFERENCE_ENERGY entries, each marked with the measurement backing it.
+
+    Raises BundleError when a measured Mistral-7B BS=1 value disagrees with
+    the Action's table by more than REFERENCE_TOLERANCE_PCT.
+    """
+    measured = {
+        (m["architecture"], m["quantization"]): m
+        for m in measurements
+        if m["model"] == REFERENCE_MODEL and m["batch_size"] == 1
+    }
+    out, mismatches = [], []
+    for (arch, quant), joules in sorted(REFERENCE_ENERGY.items()):
+        m = measured.get((arch, quant))
+        if m is not None and abs(m["energy_j_per_1k"] - joules) / joules * 100 > REFERENCE_TOLERANCE_PCT:
+            mismatches.append(f"{arch}/{quant}: REFERENCE_ENERGY {joules} vs "
+                              f"{m['energy_j_per_1k']:g} in {m['source']}")
+        out.append({"architecture": arch, "quantization": quant, "energy_j_per_1k": joules,
+                    "measured_in": m["source"] if m else None})
+    if mismatches:
+        raise BundleError("REFERENCE_ENERGY disagrees with metadata:\n  " + "\n  ".join(mismatches))
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Bundle
+# ---------------------------------------------------------------------------
+
+def _rounded(value, digits: int = 2):
+    """Round floats recursively; 2 decimals keep every displayed figure exact."""
+    if isinstance(value, float):
+        return round(value, digits)
+    if isinstance(value, dict):
+        return {k: _rounded(v, digits) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_rounded(v, digits) for v in value]
+    return value
+
+
+def build_bundle(metadata_dir: Path = DEFAULT_METADATA) -> tuple[dict, list[Path]]:
+    """The bundle contents and the source files they were derived from."""
+    sources = sorted(metadata_dir.glob("*_metadata.json"))
+    measurements, findings = [], []
+    for path in sources:
+        m, f = load_metadata_results(path)
+        measurements.extend(m)
+        findings.extend(f)
+    measurements.sort(key=lambda m: (m["gpu"], m["model"], m["batch_size"], m["quantization"]))
+
+    raw_csvs = sorted(metadata_dir.glob("**/*_raw_*.csv"))
+    sources += raw_csvs
+    curves = [load_batch_sweep(p) for p in raw_csvs]
+    deltas = paradox_deltas(measurements, findings)
+    add_intervals(measurements, deltas, curves, [load_run_energies(p) for p in raw_csvs])
+    bundle = {
+        "version": BUNDLE_VERSION,
+        "measurements": measurements,
+        "gpu_quant_means": gpu_quant_means(measurements),
+        "batch_size_curves": curves,
+        "paradox_deltas": deltas,
+        "reference_energy": reference_energy(measurements),
+    }
+    return _rounded(bundle), sources
+
+
+def encode(bundle: dict) -> bytes:
+    return json.dumps(bundle, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def make_manifest(data: bytes, sources: list[Path]) -> dict:
+    digest = content_hash(data)
+    return {
+        "version": BUNDLE_VERSION,
+        "bundle": f"dashboard-bundle.{digest}.json",
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "bytes": len(data),
+        "sources": {
+            str(p.relative_to(ROOT)): hashlib.sha256(p.read_bytes()).hexdigest()[:12]
+            for p in sources
+        },
+    }
+
+
+def write_bundle(data: bytes, manifest: dict, out_dir: Path):
+    """Write the hashed bundle and manifest; drop bundles it supersedes."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for old in out_dir.glob("dashboard-bundle.*.json"):
+        if old.name != manifest["bundle"]:
+            old.unlink()
+    (out_dir / manifest["bundle"]).write_bytes(data)
+    (out_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+
+
+def is_current(manifest: dict, out_dir: Path) -> bool:
+    try:
+        existing = json.loads((out_dir / MANIFEST_NAME).read_text())
+    except (OSError, ValueError):
+        return False
+    return existing == manifest and (out_dir / manifest["bundle"]).exists()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the dashboard data bundle from metadata/")
+    parser.add_argument("--metadata", type=Path, default=DEFAULT_METADATA)
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT)
+    parser.add_argument("--check", action="store_true",
+                        help="Exit 1 if the committed bundle is stale instead of writing it")
+    args = parser.parse_args()
+
+    try:
+        bundle, sources = build_bundle(args.metadata.resolve())
+    except (BundleError, OSError, KeyError, ValueError) as e:
+        raise SystemExit(f"build_dashboard_bundle.py: {e}")
+
+    data = encode(bundle)
+    manifest = make_manifest(data, sources)
+    if args.check:
+        if not is_current(manifest, args.out):
+            raise SystemExit(f"build_dashboard_bundle.py: {args.out / MANIFEST_NAME} is stale; "
+                             "run scripts/build_dashboard_bundle.py")
+        print(f"{manifest['bundle']} is up to date.")
+        return
+
+    write_bundle(data, manifest, args.out)
+    print(f"{manifest['bundle']}: {len(data):,} bytes — {len(bundle['measurements'])} measurements, "
+          f"{sum(len(c['points']) for c in bundle['batch_size_curves'])} batch-size points, "
+          f"{len(bundle['paradox_deltas'])} paradox deltas, from {len(sources)} source file(s)")
+
+
+if __name__ == "__main__":
+    main()
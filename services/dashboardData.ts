@@ -0,0 +1,163 @@
+// ============================================================
+// EcoCompute Dashboard Data — precomputed measurement bundle
+// Built from metadata/ by scripts/build_dashboard_bundle.py.
+// ============================================================
+
+import { ModelData } from '../types';
+
+export interface Measurement {
+  gpu: string;
+  architecture: string;
+  model: string;
+  model_name: string;
+  quantization: string;
+  batch_size: number;
+  runs: number | null;
+  throughput_tok_s: number | null;
+  throughput_std: number | null;
+  power_w: number | null;
+  power_std: number | null;
+  energy_j_per_1k: number;
+  energy_std: number | null;
+  source: string;
+}
+
+export interface GpuQuantMean {
+  gpu: string;
+  architecture: string;
+  quantization: string;
+  models: string[];
+  throughput_tok_s: number | null;
+  power_w: number | null;
+  energy_j_per_1k: number | null;
+}
+
+export interface BatchSizePoint {
+  batch_size: number;
+  runs: number;
+  throughput_tok_s: number;
+  throughput_tok_s_std: number;
+  power_w: number;
+  power_w_std: number;
+  energy_per_request_j: number;
+  energy_per_request_j_std: number;
+  energy_j_per_1k: number;
+  energy_j_per_1k_std: number;
+  gpu_util_pct: number;
+  peak_memory_gb: number;
+  energy_scale: number;            // J/1k relative to the smallest batch size
+  energy_change_pct: number;       // the same, as a percent change
+  energy_change_ci_pct: [number, number] | null;   // 95% bootstrap interval
+  reference_scale: number | null;  // BS_ENERGY_SCALE used by the Action
+}
+
+export interface BatchSizeCurve {
+  id: string;
+  gpu: string;
+  model: string;
+  quantization: string;
+  source: string;
+  points: BatchSizePoint[];
+}
+
+export interface ParadoxDelta {
+  gpu: string;
+  architecture: string;
+  model: string;
+  batch_size: number;
+  quantization: string;
+  vs_fp16_pct: number;
+  vs_fp16_ci_pct: [number, number] | null;         // 95% bootstrap interval; null without recorded spread
+  throughput_vs_fp16_pct: number | null;
+  source: string;
+}
+
+export interface ReferenceEnergy {
+  architecture: string;
+  quantization: string;
+  energy_j_per_1k: number;
+  measured_in: string | null;
+}
+
+export interface DashboardBundle {
+  version: number;
+  measurements: Measurement[];
+  gpu_quant_means: GpuQuantMean[];
+  batch_size_curves: BatchSizeCurve[];
+  paradox_deltas: ParadoxDelta[];
+  reference_energy: ReferenceEnergy[];
+}
+
+interface BundleManifest {
+  version: number;
+  bundle: string;
+  sha256: string;
+  bytes: number;
+}
+
+let pending: Promise<DashboardBundle> | null = null;
+
+/** Fetch the manifest, then the content-hashed bundle it names (once per page). */
+export const loadDashboardBundle = (): Promise<DashboardBundle> => {
+  if (!pending) {
+    const base = new URL('data/', document.baseURI);
+    pending = fetch(new URL('dashboard-manifest.json', base), { cache: 'no-cache' })
+      .then(r => {
+        if (!r.ok) throw new Error(`dashboard manifest: HTTP ${r.status}`);
+        return r.json() as Promise<BundleManifest>;
+      })
+      // The bundle name changes with its content, so the browser may cache it indefinitely
+      .then(manifest => fetch(new URL(manifest.bundle, base)))
+      .then(r => {
+        if (!r.ok) throw new Error(`dashboard bundle: HTTP ${r.status}`);
+        return r.json() as Promise<DashboardBundle>;
+      })
+      .catch(err => {
+        pending = null;
+        throw err;
+      });
+  }
+  return pending;
+};
+
+/** Start loading early (e.g. on app mount) so views find the data ready. */
+export const prefetchDashboardBundle = (): void => {
+  loadDashboardBundle().catch(() => undefined);
+};
+
+/**
+ * Measured values by key: `gpu/model/bsN/quantization` for measurements and
+ * `curve-id/bsN` for batch-size points (the group names the build script uses).
+ */
+const measuredByKey = (bundle: DashboardBundle): Map<string, { throughput: number; power: number }> => {
+  const out = new Map<string, { throughput: number; power: number }>();
+  for (const m of bundle.measurements) {
+    if (m.throughput_tok_s && m.power_w) {
+      out.set(`${m.gpu}/${m.model}/bs${m.batch_size}/${m.quantization}`,
+              { throughput: m.throughput_tok_s, power: m.power_w });
+    }
+  }
+  for (const curve of bundle.batch_size_curves) {
+    for (const p of curve.points) {
+      out.set(`${curve.id}/bs${p.batch_size}`, { throughput: p.throughput_tok_s, power: p.power_w });
+    }
+  }
+  return out;
+};
+
+/**
+ * Refresh the measured fields (execution time per token, tokens per watt) of
+ * models that name a bundle measurement; other fields and models are kept.
+ */
+export const applyMeasurements = (models: ModelData[], bundle: DashboardBundle): ModelData[] => {
+  const measured = measuredByKey(bundle);
+  return models.map(m => {
+    const value = m.bundleKey ? measured.get(m.bundleKey) : undefined;
+    if (!value) return m;
+    return {
+      ...m,
+      executionTime: Number((1 / value.throughput).toPrecision(3)),
+      energyEfficiency: Math.round(value.throughput / value.power * 1000),
+    };
+  });
+};
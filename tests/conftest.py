@@ -0,0 +1,9 @@
+"""Shared pytest setup: the Action's modules import each other as siblings."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "action"))
+
+# Sample input for the auditor (imports transformers), not a test module
+collect_ignore = ["test_energy_waste.py"]
@@ -0,0 +1,87 @@
+"""Streaming run aggregation: Welford merges equal one pass over all rows."""
+
+import csv
+import json
+import os
+import random
+import statistics
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAW_CSV = Path(ROOT, "metadata", "batch_size_experiment",
+                "a800_mistral7b_pure_int8_batch_size_raw_20260215_131345.csv")
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+
+from aggregate_runs import Aggregator, RunningStats, aggregate_paths  # noqa: E402
+
+
+def running(values):
+    stats = RunningStats()
+    for x in values:
+        stats.add(x)
+    return stats
+
+
+def assert_same(a, b):
+    assert a.count == b.count and a.min == b.min and a.max == b.max
+    assert a.mean == pytest.approx(b.mean, rel=1e-12)
+    assert a.m2 == pytest.approx(b.m2, rel=1e-9)
+
+
+@pytest.mark.parametrize("split", [0, 1, 7, 500, 999, 1000])
+def test_merged_halves_equal_a_single_pass(split):
+    rng = random.Random(split)
+    values = [1e6 + rng.gauss(0, 3) for _ in range(1000)]    # large offset: catches naive sums
+    merged = running(values[:split])
+    merged.merge(running(values[split:]))
+
+    assert_same(merged, running(values))
+    assert merged.mean == pytest.approx(statistics.fmean(values), rel=1e-12)
+    assert merged.std == pytest.approx(statistics.stdev(values), rel=1e-6)
+
+
+def test_merging_many_parts_is_order_independent():
+    rng = random.Random(1)
+    parts = [[rng.uniform(100, 300) for _ in range(rng.randint(1, 20))] for _ in range(12)]
+    forward, backward = RunningStats(), RunningStats()
+    for part in parts:
+        forward.merge(running(part))
+    for part in reversed(parts):
+        backward.merge(running(part))
+    assert_same(forward, backward)
+    assert_same(forward, running([x for part in parts for x in part]))
+
+
+def test_saved_states_of_split_csvs_merge_into_the_one_pass_summary(tmp_path):
+    with open(RAW_CSV, newline="") as f:
+        reader = csv.DictReader(f)
+        fields, rows = reader.fieldnames, list(reader)
+    paths = []
+    for i, part in enumerate((rows[0::2], rows[1::2])):
+        path = tmp_path / f"part{i}.csv"
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fields)
+            writer.writeheader()
+            writer.writerows(part)
+        paths.append(path)
+    state = tmp_path / "part0.json"
+    state.write_text(json.dumps(aggregate_paths([paths[0]], ["batch_size"]).to_dict()))
+
+    merged = aggregate_paths([state, paths[1]], ["batch_size"])
+    whole = aggregate_paths([RAW_CSV], ["batch_size"])
+    assert merged.runs == whole.runs and sum(merged.runs.values()) == len(rows)
+    for key, columns in whole.groups.items():
+        assert merged.groups[key].keys() == columns.keys()
+        for column, stats in columns.items():
+            assert_same(merged.groups[key][column], stats)
+
+    energy = [float(r["energy_per_request_j"]) for r in rows if r["batch_size"] == "1"]
+    assert merged.groups[("1",)]["energy_per_request_j"].std == pytest.approx(statistics.stdev(energy))
+
+
+def test_states_grouped_differently_do_not_merge():
+    with pytest.raises(ValueError, match="cannot merge"):
+        Aggregator(["batch_size"]).merge(Aggregator(["model"]))
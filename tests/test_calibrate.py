@@ -0,0 +1,79 @@
+"""Calibration: the NumPy CPU backend, adaptive measurement and the energy estimate."""
+
+import time
+
+import pytest
+
+from calibrate import AdaptivePolicy, CalibrationResult, NumpyBackend, estimate_energy, measure_adaptive
+from hardware import HardwareInfo
+from power import FakePowerSource, PowerSource
+
+
+def test_numpy_backend_scores_every_dtype_with_cpu_power(capsys):
+    pytest.importorskip("numpy")
+    backend = NumpyBackend(threads=1)
+    assert backend.available(HardwareInfo(gpu_count=0))
+    assert not backend.available(HardwareInfo(gpu_count=1))
+
+    result = backend.run(0.3, FakePowerSource(40.0, domain="cpu"))
+    assert set(result.gflops_by_dtype) == {"float32", "float64", "int8"}
+    assert result.benchmark_score == pytest.approx(result.gflops_by_dtype["float32"] / 1000)
+    assert result.power_domains == "cpu"
+    assert result.power_draw_w == pytest.approx(40.0)
+    assert result.energy_per_tflop > 0
+    assert "No readable CPU power domain" not in capsys.readouterr().out
+
+
+def test_unreadable_cpu_power_is_announced_once(capsys):
+    pytest.importorskip("numpy")
+    result = NumpyBackend(threads=1).run(0.2, PowerSource())
+    assert result.benchmark_score > 0
+    assert result.energy_per_tflop == 0
+    assert capsys.readouterr().out.count("No readable CPU power domain") == 1
+
+
+def test_reference_lengths_reproduce_the_reference_scaling():
+    est = estimate_energy(7.0, "fp16", 1, HardwareInfo())
+    assert est["seq_scale"] == 1.0
+    assert (est["input_len"], est["output_len"]) == (256, 256)
+    per_request = est["energy_j_per_1k_tok"] * 256 / 1000
+    assert est["prefill_j_per_request"] + est["decode_j_per_request"] == pytest.approx(per_request, abs=0.2)
+
+
+def test_prompt_and_generation_lengths_scale_separately():
+    def est(input_len, output_len):
+        return estimate_energy(7.0, "fp16", 1, HardwareInfo(), input_len, output_len)
+
+    base, long_prompt, long_output = est(256, 256), est(2048, 256), est(256, 2048)
+    # A longer prompt costs more per generated token and shifts energy to prefill
+    assert long_prompt["energy_j_per_1k_tok"] > base["energy_j_per_1k_tok"]
+    assert long_prompt["prefill_share"] > base["prefill_share"]
+    # Prefill depends on the prompt only; decode grows with the tokens generated
+    assert long_output["prefill_j_per_request"] == base["prefill_j_per_request"]
+    assert long_output["decode_j_per_request"] > 7 * base["decode_j_per_request"]
+    # A one-token answer is dominated by its prompt
+    assert est(256, 1)["prefill_share"] > 0.5
+
+
+def test_adaptive_calibration_is_opt_in(monkeypatch):
+    monkeypatch.delenv("CALIBRATION_TARGET_CI", raising=False)
+    assert AdaptivePolicy.from_env() is None
+    monkeypatch.setenv("CALIBRATION_TARGET_CI", "0")
+    assert AdaptivePolicy.from_env() is None
+    monkeypatch.setenv("CALIBRATION_TARGET_CI", "2")
+    monkeypatch.setenv("CALIBRATION_BUDGET_S", "12")
+    policy = AdaptivePolicy.from_env()
+    assert (policy.target_ci_pct, policy.budget_s) == (2.0, 12.0)
+
+
+def test_power_summary_excludes_warmup_blocks():
+    # 300 W for the 0.2 s warmup (capped: plateau_blocks is never reached), then 100 W
+    source = FakePowerSource(lambda t: 300.0 if t < 0.2 else 100.0)
+    policy = AdaptivePolicy(target_ci_pct=50.0, budget_s=4.0, block_s=0.02, min_blocks=3,
+                            plateau_blocks=1000, max_warmup_s=0.2, power_interval_s=0.005)
+    result = measure_adaptive(lambda: time.sleep(0.001), 10 ** 9, source, policy,
+                              CalibrationResult())
+    assert result.warmup_s >= 0.2 and result.blocks >= 3
+    assert result.power_summary["max_w"] == 100.0
+    assert result.power_summary["duration_s"] < result.duration_s - result.warmup_s + 0.01
+    assert result.power_draw_w == pytest.approx(100.0)
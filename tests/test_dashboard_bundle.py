@@ -0,0 +1,81 @@
+"""Dashboard bundle: content-hashed output, staleness check, REFERENCE_ENERGY guard."""
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("numpy")
+
+SCRIPTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts")
+SCRIPT = os.path.join(SCRIPTS, "build_dashboard_bundle.py")
+sys.path.insert(0, SCRIPTS)
+
+import build_dashboard_bundle as bundle  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def built():
+    contents, sources = bundle.build_bundle()
+    data = bundle.encode(contents)
+    return contents, data, bundle.make_manifest(data, sources)
+
+
+def check(out):
+    return subprocess.run([sys.executable, SCRIPT, "--check", "--out", str(out)],
+                          capture_output=True, text=True)
+
+
+def test_bundle_is_named_by_its_content_hash(built, tmp_path):
+    contents, data, manifest = built
+    (tmp_path / "dashboard-bundle.000000000000.json").write_text("{}")
+    bundle.write_bundle(data, manifest, tmp_path)
+
+    [path] = tmp_path.glob("dashboard-bundle.*.json")         # the superseded bundle is gone
+    assert path.name == f"dashboard-bundle.{hashlib.sha256(data).hexdigest()[:12]}.json"
+    assert path.name == manifest["bundle"]
+    assert json.loads(path.read_bytes()) == contents
+    assert json.loads((tmp_path / bundle.MANIFEST_NAME).read_text()) == manifest
+    assert bundle.is_current(manifest, tmp_path)
+
+
+def test_check_passes_on_the_committed_bundle_and_fails_when_stale(built, tmp_path):
+    assert bundle.is_current(built[2], bundle.DEFAULT_OUT)
+    assert check(bundle.DEFAULT_OUT).returncode == 0
+
+    stale = dict(built[2], sha256="0" * 64)
+    bundle.write_bundle(built[1], stale, tmp_path)
+    result = check(tmp_path)
+    assert result.returncode == 1 and "stale" in result.stderr
+
+
+def test_paradox_deltas_compare_against_fp16_on_the_same_gpu(built):
+    contents = built[0]
+    [delta] = [d for d in contents["paradox_deltas"]
+               if (d["gpu"], d["model"], d["batch_size"], d["quantization"])
+               == ("RTX 4090D", "mistral_7b", 1, "int8_default")]
+    assert delta["vs_fp16_pct"] == pytest.approx((7401 / 5661 - 1) * 100, abs=0.01)
+    low, high = delta["vs_fp16_ci_pct"]
+    assert low < delta["vs_fp16_pct"] < high
+
+    [curve] = contents["batch_size_curves"]
+    assert curve["points"][0]["energy_scale"] == 1.0
+    assert [p["batch_size"] for p in curve["points"]] == [1, 2, 4, 8, 16, 32, 64]
+
+
+def test_reference_energy_mismatch_fails_the_build(monkeypatch):
+    measured = {"architecture": "ada", "quantization": "fp16", "model": bundle.REFERENCE_MODEL,
+                "batch_size": 1, "energy_j_per_1k": 5661.0, "source": "rtx4090d_metadata.json"}
+    monkeypatch.setattr(bundle, "REFERENCE_ENERGY", {("ada", "fp16"): 5661, ("ada", "nf4"): 3707})
+    assert bundle.reference_energy([measured]) == [
+        {"architecture": "ada", "quantization": "fp16", "energy_j_per_1k": 5661,
+         "measured_in": "rtx4090d_metadata.json"},
+        {"architecture": "ada", "quantization": "nf4", "energy_j_per_1k": 3707, "measured_in": None},
+    ]
+
+    monkeypatch.setattr(bundle, "REFERENCE_ENERGY", {("ada", "fp16"): 5000})
+    with pytest.raises(bundle.BundleError, match="ada/fp16: REFERENCE_ENERGY 5000 vs 5661"):
+        bundle.reference_energy([measured])
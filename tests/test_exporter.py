@@ -0,0 +1,70 @@
+"""Exporter: fake power source, scraped over a local HTTP server."""
+
+import urllib.request
+
+import pytest
+
+from exporter import MetricsExporter
+from hardware import HardwareInfo
+from power import CompositePowerSource, FakePowerSource
+
+
+def metric(text, name):
+    return [line for line in text.splitlines() if line.startswith(name + "{")]
+
+
+@pytest.fixture
+def exporter():
+    hw = HardwareInfo(gpu_name="Fake GPU", gpu_count=1, hardware_hash="abc123")
+    source = CompositePowerSource([FakePowerSource(250.0), FakePowerSource(50.0, domain="cpu")])
+    exporter = MetricsExporter(hw, source, interval_s=60)
+    server = exporter.serve(port=0, addr="127.0.0.1")
+    yield exporter, f"http://127.0.0.1:{server.server_address[1]}"
+    exporter.stop()
+
+
+def scrape(url, accept=None):
+    request = urllib.request.Request(url + "/metrics", headers={"Accept": accept} if accept else {})
+    with urllib.request.urlopen(request) as response:
+        return response.headers["Content-Type"], response.read().decode()
+
+
+def test_scrape_serves_one_series_per_source(exporter):
+    exp, url = exporter
+    exp.collect()
+    content_type, text = scrape(url)
+    assert content_type.startswith("text/plain")
+    power = metric(text, "ecocompute_power_watts")
+    assert len(power) == 2
+    assert 'domain="gpu"' in power[0] and power[0].endswith(" 250")
+    assert 'domain="cpu"' in power[1] and power[1].endswith(" 50")
+    assert 'hardware_hash="abc123"' in power[0]
+    assert len(metric(text, "ecocompute_energy_joules_total")) == 2
+    assert not metric(text, "ecocompute_energy_per_1k_tokens_joules")
+
+
+def test_tokens_posted_over_http_feed_the_per_token_gauge(exporter):
+    exp, url = exporter
+    with urllib.request.urlopen(urllib.request.Request(url + "/tokens", data=b"600")) as response:
+        assert response.status == 204
+    exp.collect()
+    _, text = scrape(url)
+    assert metric(text, "ecocompute_tokens_total")[0].endswith(" 600")
+    # 300 W total, 600 tokens over the 60 s minimum window = 10 tokens/s → 30 kJ/1k tokens
+    assert metric(text, "ecocompute_energy_per_1k_tokens_joules")[0].endswith(" 30000")
+
+
+def test_bad_token_body_is_rejected(exporter):
+    _, url = exporter
+    with pytest.raises(urllib.error.HTTPError) as err:
+        urllib.request.urlopen(urllib.request.Request(url + "/tokens", data=b"lots"))
+    assert err.value.code == 400
+
+
+def test_openmetrics_counters_drop_the_total_suffix(exporter):
+    exp, url = exporter
+    exp.collect()
+    content_type, text = scrape(url, "application/openmetrics-text")
+    assert content_type.startswith("application/openmetrics-text")
+    assert "# TYPE ecocompute_energy_joules counter" in text
+    assert text.endswith("# EOF\n")
@@ -0,0 +1,70 @@
+"""Fleet projection: traffic input, idle floor, batching and additivity."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from calibrate import estimate_energy  # noqa: E402
+from fleet import BatchingConfig, load_traffic, project  # noqa: E402
+from hardware import hardware_for_profile  # noqa: E402
+
+
+def traffic(requests, interval_s=60.0, input_len=256, output_len=256):
+    n = len(requests)
+    return {
+        "requests": np.asarray(requests, dtype=float),
+        "input_len": np.full(n, float(input_len)),
+        "output_len": np.full(n, float(output_len)),
+        "interval_s": interval_s,
+    }
+
+
+def test_load_traffic_infers_the_interval_and_rates(tmp_path):
+    path = tmp_path / "traffic.csv"
+    path.write_text(
+        "timestamp,request_rate,output_tokens\n"
+        "2026-01-01T00:00:00,2,128\n"
+        "2026-01-01T00:05:00,4,64\n"
+    )
+    t = load_traffic(str(path))
+    assert t["interval_s"] == 300
+    assert t["requests"].tolist() == [600, 1200]
+    assert t["output_len"].tolist() == [128, 64]
+    assert t["input_len"].tolist() == [256, 256]
+
+
+def test_no_traffic_costs_only_the_idle_floor():
+    hw = hardware_for_profile("a800")
+    config = BatchingConfig(min_gpus=2, price_per_kwh=0.5)
+    p = project(traffic([0, 0, 0]), hw, config=config)
+    assert p.active_kwh == 0
+    assert p.gpu_hours == pytest.approx(2 * 3 * 60 / 3600)
+    assert p.idle_kwh == pytest.approx(2 * 180 * hw.idle_w / 3.6e6)
+    assert p.cost == pytest.approx(p.total_kwh * 0.5)
+
+
+def test_light_traffic_runs_at_batch_one_like_the_estimate():
+    hw = hardware_for_profile("a800")
+    p = project(traffic([1]), hw, model_params_b=7.0)
+    assert p.series["batch"].tolist() == [1.0]
+    j_per_1k = estimate_energy(7.0, "fp16", 1, hw)["energy_j_per_1k_tok"]
+    assert p.active_kwh == pytest.approx(256 / 1000 * j_per_1k / 3.6e6, rel=1e-6)
+
+
+def test_heavy_traffic_batches_up_to_the_cap_and_adds_gpus():
+    hw = hardware_for_profile("a800")
+    light = project(traffic([60]), hw, config=BatchingConfig(max_batch_size=32))
+    heavy = project(traffic([600_000]), hw, config=BatchingConfig(max_batch_size=32))
+    assert heavy.series["batch"].tolist() == [32.0]
+    assert heavy.peak_gpus > light.peak_gpus
+    assert heavy.wh_per_1k_tokens < light.wh_per_1k_tokens
+
+
+def test_projection_is_additive_over_intervals():
+    hw = hardware_for_profile("a800")
+    series = [0, 50, 5_000, 120, 80_000]
+    whole = project(traffic(series), hw)
+    parts = [project(traffic([r]), hw) for r in series]
+    assert whole.total_kwh == pytest.approx(sum(p.total_kwh for p in parts))
+    assert whole.gpu_hours == pytest.approx(sum(p.gpu_hours for p in parts))
+    assert whole.peak_gpus == max(p.peak_gpus for p in parts)
@@ -0,0 +1,141 @@
+"""Git object access and the differential audit built on it."""
+
+import subprocess
+
+import pytest
+
+import gitobjects
+from audit import Severity, build_scan_context, differential_audit, run_pre_commit
+from gitobjects import CatFileBatch
+
+INT8 = (
+    "from transformers import AutoModelForCausalLM\n"
+    'model = AutoModelForCausalLM.from_pretrained("mistralai/Mistral-7B-v0.1", load_in_8bit=True)\n'
+)
+
+
+def git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    git(tmp_path, "init", "-q", "-b", "main")
+    git(tmp_path, "config", "user.email", "dev@example.com")
+    git(tmp_path, "config", "user.name", "dev")
+    (tmp_path / "old.py").write_text(INT8)
+    (tmp_path / "touched.py").write_text("x = 1\n")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "base")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("DIFF_BASE", "main")
+    return tmp_path
+
+
+def test_missing_path_with_spaces(repo):
+    with CatFileBatch(str(repo)) as batch:
+        assert batch.read("HEAD:no such file.py") is None
+        assert batch.read_many(["HEAD:a b.py", "HEAD:old.py"]) == {
+            "HEAD:a b.py": None,
+            "HEAD:old.py": INT8.encode(),
+        }
+
+
+def test_differential_reads_base_blobs_only_for_changed_files(repo, monkeypatch):
+    (repo / "touched.py").write_text("x = 1\n" + INT8)
+    (repo / "untracked.py").write_text(INT8)
+
+    requested = []
+    read_many = CatFileBatch.read_many
+
+    def spy(self, specs):
+        specs = list(specs)
+        requested.extend(specs)
+        return read_many(self, specs)
+
+    monkeypatch.setattr(gitobjects.CatFileBatch, "read_many", spy)
+    result = differential_audit(["old.py", "touched.py", "untracked.py"])
+
+    assert [spec.split(":", 1)[1] for spec in requested] == ["touched.py"]
+    assert sorted({i.file for i in result.new}) == ["touched.py", "untracked.py"]
+    assert {i.file for i in result.existing} == {"old.py"}
+    assert result.resolved == []
+
+
+CONFIG_8BIT = "from transformers import BitsAndBytesConfig\ncfg = BitsAndBytesConfig(load_in_8bit=True)\n"
+CONFIG_FP16 = "cfg = None\n"
+SERVE = (
+    "from transformers import AutoModelForCausalLM\n"
+    "from pkg.config import cfg\n"
+    'model = AutoModelForCausalLM.from_pretrained("mistralai/Mistral-7B-v0.1", quantization_config=cfg)\n'
+)
+CROSS_FILE = "detect_cross_file_quant_config"
+
+
+def commit_project(repo, config):
+    (repo / "pkg").mkdir()
+    (repo / "pkg" / "__init__.py").write_text("")
+    (repo / "pkg" / "config.py").write_text(config)
+    (repo / "serve.py").write_text(SERVE)
+    git(repo, "add", ".")
+    git(repo, "commit", "-q", "-m", "project")
+
+
+def cross_file(issues):
+    return [i.file for i in issues if i.rule == CROSS_FILE]
+
+
+def test_cross_file_finding_in_an_unchanged_file_is_new(repo):
+    commit_project(repo, CONFIG_FP16)
+    (repo / "pkg" / "config.py").write_text(CONFIG_8BIT)
+
+    result = differential_audit(["serve.py", "pkg/config.py"], build_scan_context())
+    assert cross_file(result.new) == ["serve.py"]
+    assert cross_file(result.existing) == []
+
+
+def test_base_versions_resolve_imports_in_the_base_tree(repo):
+    commit_project(repo, CONFIG_8BIT)
+    (repo / "pkg" / "config.py").write_text(CONFIG_FP16)
+    (repo / "serve.py").write_text("# served by the API\n" + SERVE)
+
+    result = differential_audit(["serve.py", "pkg/config.py"], build_scan_context())
+    assert cross_file(result.new + result.existing) == []
+    assert cross_file(result.resolved) == ["serve.py"]
+
+
+
+def pre_commit(capsys) -> str:
+    """Hook output; a blocked commit (exit 1) is fine here."""
+    try:
+        run_pre_commit([], Severity.INFO)
+    except SystemExit as e:
+        assert e.code == 1
+    return capsys.readouterr().out
+
+
+def test_pre_commit_audits_the_staged_version_only(repo, capsys):
+    (repo / "staged.py").write_text(INT8)
+    git(repo, "add", "staged.py")
+    (repo / "staged.py").write_text("x = 1\n")       # unstaged fix
+    (repo / "touched.py").write_text(INT8)           # unstaged, not staged at all
+
+    out = pre_commit(capsys)
+    assert "staged.py:2:" in out and "touched.py" not in out
+    assert "1 staged file(s)" in out
+
+    (repo / "staged.py").write_text("x = 1\n")
+    git(repo, "add", "staged.py")
+    (repo / "staged.py").write_text(INT8)            # unstaged regression
+    assert "0 finding(s)" in pre_commit(capsys)
+
+
+def test_pre_commit_resolves_imports_from_the_git_index(repo, capsys):
+    commit_project(repo, CONFIG_8BIT)
+    (repo / "serve.py").write_text("# staged edit\n" + SERVE)
+    git(repo, "add", "serve.py")
+    (repo / "pkg" / "config.py").write_text(CONFIG_FP16)    # unstaged fix
+
+    out = pre_commit(capsys)
+    assert "1 staged file(s)" in out
+    assert "where `cfg` is defined (`pkg/config.py`)" in out
@@ -0,0 +1,51 @@
+"""GPU profile matching: token trie, longest match, repo overrides."""
+
+import json
+
+import pytest
+
+from hardware import GpuProfileIndex, load_gpu_profiles, normalize_gpu_name
+
+PROFILES = {
+    "rtx 4090": {"arch": "ada"},
+    "rtx 4090d": {"arch": "ada", "aliases": ["rtx 4090 d"]},
+    "l4": {"arch": "ada"},
+    "l40s": {"arch": "ada", "aliases": ["l40 s"]},
+    "a100": {"arch": "ampere"},
+}
+
+
+def test_names_normalize_to_the_same_tokens():
+    assert normalize_gpu_name("RTX4090D") == normalize_gpu_name("rtx 4090 D") == ("rtx", "4090", "d")
+
+
+@pytest.mark.parametrize("gpu_name, key", [
+    ("NVIDIA GeForce RTX 4090", "rtx 4090"),
+    ("NVIDIA GeForce RTX 4090 D", "rtx 4090d"),
+    ("NVIDIA GeForce RTX4090D", "rtx 4090d"),
+    ("NVIDIA L4", "l4"),
+    ("NVIDIA L40S", "l40s"),
+    ("NVIDIA A100-SXM4-80GB", "a100"),
+    ("NVIDIA A10", None),
+    ("NVIDIA L40", None),
+])
+def test_longest_token_match_wins(gpu_name, key):
+    match = GpuProfileIndex(PROFILES).lookup(gpu_name)
+    assert (match[0] if match else None) == key
+
+
+def test_lookup_does_not_depend_on_profile_order():
+    reverse = dict(reversed(list(PROFILES.items())))
+    for name in ("RTX 4090 D", "RTX 4090", "L40S", "L4"):
+        assert GpuProfileIndex(reverse).lookup(name) == GpuProfileIndex(PROFILES).lookup(name)
+
+
+def test_later_profile_files_win_by_name(tmp_path):
+    base, repo = tmp_path / "base.json", tmp_path / "repo.json"
+    base.write_text(json.dumps({"profiles": [{"name": "A100", "arch": "ampere", "tdp_w": 400}]}))
+    repo.write_text(json.dumps({"profiles": [
+        {"name": "a100", "arch": "ampere", "tdp_w": 250},
+        {"name": "no arch"},
+    ]}))
+    profiles = load_gpu_profiles([str(base), str(tmp_path / "missing.json"), str(repo)])
+    assert profiles == {"a100": {"arch": "ampere", "tdp_w": 250}}
@@ -0,0 +1,28 @@
+"""Rule 9: forward passes with autograd on."""
+
+from audit import ScanContext, detect_grad_enabled_inference
+from hardware import hardware_for_profile
+
+SERVE = (
+    "import torch\n"
+    "from transformers import AutoModelForCausalLM\n"
+    'model = AutoModelForCausalLM.from_pretrained("mistralai/Mistral-7B-v0.1", torch_dtype=torch.float16)\n'
+    "out = model(**inputs)\n"
+)
+
+
+def test_static_only_states_the_impact_as_memory():
+    [issue] = detect_grad_enabled_inference(SERVE, "serve.py", ScanContext())
+    assert issue.line == 4
+    assert issue.energy_impact.startswith("Memory, not energy: +1.4 GB")
+
+
+def test_with_a_gpu_the_lost_batch_is_priced_in_energy():
+    [issue] = detect_grad_enabled_inference(SERVE, "serve.py", ScanContext(hw=hardware_for_profile("a800")))
+    assert "more energy per token" in issue.energy_impact
+    assert "BS=32 instead of 64" in issue.energy_impact
+
+
+def test_inference_mode_is_not_flagged():
+    guarded = SERVE.replace("out = model(**inputs)", "with torch.inference_mode():\n    out = model(**inputs)")
+    assert detect_grad_enabled_inference(guarded, "serve.py", ScanContext()) == []
@@ -0,0 +1,59 @@
+"""VRAM estimator: recorded peaks, batch headroom and the memory-fit rule."""
+
+import pytest
+
+from audit import ScanContext, detect_vram_headroom
+from hardware import HardwareInfo
+from memory import estimate_memory, load_peak_memory, max_batch_size, parse_model_params_b
+
+
+@pytest.mark.parametrize("model_id, params_b", [
+    ("mistralai/Mistral-7B-v0.1", 7.0),
+    ("Qwen/Qwen2-0.5B", 0.5),
+    ("facebook/opt-350m", 0.35),
+    ("mistralai/Mixtral-8x7B-v0.1", 56.0),
+    ("TinyLlama/TinyLlama-1.1B-Chat-v1.0", 1.1),
+    ("microsoft/phi-2", 2.7),
+    ("my-org/custom-model", None),
+])
+def test_model_size_from_id(model_id, params_b):
+    assert parse_model_params_b(model_id) == params_b
+
+
+def test_estimate_tracks_the_recorded_a800_peaks():
+    peaks = load_peak_memory()
+    assert peaks
+    for bs, measured in peaks.items():
+        est = estimate_memory(7.24, "int8_pure", bs).total_gb
+        assert abs(est - measured) / measured < 0.03, bs
+
+
+def test_max_batch_size_is_the_largest_batch_that_fits():
+    bs = max_batch_size(7.24, "fp16", 24)
+    assert bs > 0
+    assert estimate_memory(7.24, "fp16", bs).total_gb <= 24 * 0.9
+    assert estimate_memory(7.24, "fp16", bs + 1).total_gb > 24 * 0.9
+    assert max_batch_size(70, "fp16", 24) == 0
+
+
+def load(model_id, extra=""):
+    return (
+        "from transformers import AutoModelForCausalLM\n"
+        f"{extra}"
+        f'model = AutoModelForCausalLM.from_pretrained("{model_id}", device_map="auto")\n'
+    )
+
+
+def test_fit_rule_flags_a_model_too_large_for_the_gpu():
+    ctx = ScanContext(hw=HardwareInfo(gpu_name="RTX 4090", vram_total_mb=24 * 1024))
+    issues = detect_vram_headroom(load("meta-llama/Llama-2-70b-hf"), "serve.py", ctx)
+    assert [(i.line, i.title) for i in issues] == [
+        (2, "meta-llama/Llama-2-70b-hf does not fit in 24 GB VRAM")]
+
+
+def test_fit_rule_reports_idle_batch_headroom_and_needs_hardware():
+    content = load("Qwen/Qwen2-0.5B", "batch_size = 1\n")
+    ctx = ScanContext(hw=HardwareInfo(gpu_name="A800", vram_total_mb=80 * 1024))
+    issues = detect_vram_headroom(content, "serve.py", ctx)
+    assert len(issues) == 1 and issues[0].title.startswith("Qwen/Qwen2-0.5B fits with room for BS=")
+    assert detect_vram_headroom(content, "serve.py", ScanContext()) == []
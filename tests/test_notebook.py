@@ -0,0 +1,61 @@
+"""Notebook reader: streamed code cells match a full json.loads, at any chunk size."""
+
+import io
+import json
+
+import pytest
+
+from notebook import iter_code_cells, read_notebook_source
+
+NOTEBOOK = {
+    "cells": [
+        {"cell_type": "markdown", "metadata": {}, "source": ["# Title with \"quotes\" and ] { brackets\n"]},
+        {
+            "cell_type": "code",
+            "metadata": {"tags": ["a]b", "{c}"]},
+            "outputs": [{
+                "output_type": "display_data",
+                "data": {"image/png": "iVBORw0KGgo" * 200, "text/plain": ["<Figure \\\"x\\\" ]}>"]},
+            }],
+            "source": [
+                "%pip install bitsandbytes\n",
+                "path = \"C:\\\\models\\\\qwen\"  # tab:\t é\n",
+                "model = AutoModelForCausalLM.from_pretrained(path)",
+            ],
+        },
+        {"cell_type": "raw", "metadata": {}, "source": "not code: \"}]\""},
+        {
+            "cell_type": "code",
+            "execution_count": 3,
+            "outputs": [{"output_type": "stream", "text": ["\\" * 9, "\"]}\n"]}],
+            "source": "s = '\\\\\"'\n!nvidia-smi\nprint(s)",
+        },
+    ],
+    "metadata": {"kernelspec": {"name": "python3", "display_name": "Python 3 \"ipykernel\""}},
+    "nbformat": 4,
+    "nbformat_minor": 5,
+}
+
+
+def expected_cells(nb):
+    return [
+        (i, "".join(cell["source"]) if isinstance(cell["source"], list) else cell["source"])
+        for i, cell in enumerate(nb["cells"]) if cell["cell_type"] == "code"
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 20])
+def test_escaped_multi_cell_notebook_streams_like_json_loads(chunk_size):
+    raw = json.dumps(NOTEBOOK, indent=1, ensure_ascii=chunk_size % 2 == 0)
+    cells = list(iter_code_cells(io.StringIO(raw), chunk_size=chunk_size))
+    assert cells == expected_cells(NOTEBOOK)
+
+
+def test_nbformat3_worksheets_and_line_map():
+    nb = {"worksheets": [{"cells": [
+        {"cell_type": "markdown", "source": "x"},
+        {"cell_type": "code", "input": ["a = 1\n", "%timeit a\n"], "outputs": []},
+    ]}], "nbformat": 3}
+    content, line_map = read_notebook_source(io.StringIO(json.dumps(nb)))
+    assert content.split("\n") == ["a = 1", "# %timeit a", ""]
+    assert line_map == [(2, 1), (2, 2), (2, 3)]
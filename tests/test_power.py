@@ -0,0 +1,87 @@
+"""Power sources and traces: RAPL zones, counters, ring-buffer windows."""
+
+import pytest
+
+from power import PowerTrace, RaplPowerSource
+
+
+def zone(root, name, label, energy_uj, max_range=2 ** 32):
+    path = root / name
+    path.mkdir()
+    (path / "name").write_text(label + "\n")
+    (path / "energy_uj").write_text(f"{energy_uj}\n")
+    (path / "max_energy_range_uj").write_text(f"{max_range}\n")
+    return path
+
+
+def test_sums_packages_and_skips_other_top_level_zones(tmp_path):
+    zone(tmp_path, "intel-rapl:0", "package-0", 1_000)
+    zone(tmp_path, "intel-rapl:1", "package-1", 2_000)
+    zone(tmp_path, "intel-rapl:2", "dram", 5_000)
+    zone(tmp_path, "intel-rapl:0:0", "core", 500)
+    source = RaplPowerSource(str(tmp_path))
+    assert [z.name for z in source.zones] == ["intel-rapl:0", "intel-rapl:1"]
+
+    (tmp_path / "intel-rapl:0" / "energy_uj").write_text("3000000")
+    (tmp_path / "intel-rapl:1" / "energy_uj").write_text("4000000")
+    (tmp_path / "intel-rapl:2" / "energy_uj").write_text("9000000")
+    assert abs(source.read_energy_j() - (2.999 + 3.998)) < 1e-9
+
+
+def test_psys_is_used_alone(tmp_path):
+    zone(tmp_path, "intel-rapl:0", "package-0", 0)
+    zone(tmp_path, "intel-rapl:1", "psys", 0)
+    source = RaplPowerSource(str(tmp_path))
+    assert [z.name for z in source.zones] == ["intel-rapl:1"]
+
+    (tmp_path / "intel-rapl:0" / "energy_uj").write_text("5000000")
+    (tmp_path / "intel-rapl:1" / "energy_uj").write_text("8000000")
+    assert source.read_energy_j() == 8.0
+
+
+def test_counter_wraparound(tmp_path):
+    zone(tmp_path, "intel-rapl:0", "package-0", 900, max_range=1_000)
+    source = RaplPowerSource(str(tmp_path))
+    (tmp_path / "intel-rapl:0" / "energy_uj").write_text("100")
+    assert source.read_energy_j() == 200 / 1e6
+
+
+WATTS = [100.0, 300.0] * 5
+
+
+def traces(capacity):
+    full, ring = PowerTrace(len(WATTS)), PowerTrace(capacity)
+    for t, w in enumerate(WATTS):
+        full.append(w, float(t))
+        ring.append(w, float(t))
+    return full, ring
+
+
+@pytest.mark.parametrize("capacity", [2, 3, 4, 7])
+def test_session_windows_stay_exact_after_the_buffer_wraps(capacity):
+    full, ring = traces(capacity)
+    assert len(ring) == capacity
+    assert ring.mean_power_w() == full.mean_power_w() == 200.0
+    assert ring.energy_j() == full.energy_j() == 1800.0
+    assert ring.energy_j(ring.first_t, ring.last_t) == 1800.0
+    assert ring.energy_j(0.0, 8.5) == pytest.approx(full.energy_j(0.0, 8.5))
+    # Windows inside the buffer are integrated from the samples
+    assert ring.energy_j(8.5, 9.0) == pytest.approx(full.energy_j(8.5, 9.0))
+    assert ring.summary().mean_w == 200.0
+
+
+def test_windows_starting_in_evicted_samples_are_rejected():
+    _, ring = traces(4)
+    assert ring.oldest_t == 6.0
+    with pytest.raises(ValueError):
+        ring.energy_j(2.0, 9.0)
+    with pytest.raises(ValueError):
+        ring.mean_power_w(0.0, 3.0)
+
+
+def test_percentile_is_the_bin_centre():
+    trace = PowerTrace(bin_w=10.0)
+    for w in (101.0, 102.0, 149.0, 151.0):
+        trace.append(w)
+    assert trace.percentile(50) == 105.0          # bin [100, 110)
+    assert trace.percentile(100) == 151.0         # clamped to the max reading
@@ -0,0 +1,103 @@
+"""Runtime profiler: per-call attribution with bounded memory."""
+
+import threading
+import time
+
+from power import FakePowerSource
+from profiler import EnergyProfiler
+
+
+def test_totals_cover_calls_beyond_the_record_history():
+    profiler = EnergyProfiler(FakePowerSource(100.0), interval_s=0.005, history=4)
+    with profiler:
+        for _ in range(10):
+            with profiler.measure("generate", tokens=50):
+                time.sleep(0.01)
+
+    assert len(profiler.records) == 4
+    stats = profiler.stats()["generate"]
+    assert stats.calls == 10
+    assert stats.tokens == 500
+    assert abs(stats.avg_power_w - 100.0) < 1e-6
+    assert abs(stats.joules - 100.0 * stats.wall_s) < 1e-6
+    assert all(r.joules is not None for r in profiler.records)
+
+
+def test_stats_include_calls_not_settled_yet():
+    profiler = EnergyProfiler(FakePowerSource(50.0), interval_s=60)
+    profiler.start()
+    with profiler.measure("prefill", tokens=10):
+        time.sleep(0.01)
+    # No sample past the call's end yet: still pending, integrated on demand
+    assert profiler.stats()["prefill"].calls == 1
+    profiler.stop()
+    assert profiler.stats()["prefill"].calls == 1
+
+
+def test_stats_while_calls_finish_concurrently():
+    profiler = EnergyProfiler(FakePowerSource(80.0), interval_s=0.001)
+    done = threading.Event()
+
+    def worker():
+        for _ in range(200):
+            with profiler.measure("call", tokens=1):
+                pass
+        done.set()
+
+    with profiler:
+        thread = threading.Thread(target=worker)
+        thread.start()
+        while not done.is_set():
+            profiler.stats()
+        thread.join()
+    assert profiler.stats()["call"].calls == 200
+
+
+class ClosingSource(FakePowerSource):
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_stop_leaves_a_caller_source_open(monkeypatch):
+    mine = ClosingSource(10.0)
+    with EnergyProfiler(mine, interval_s=60):
+        pass
+    assert not mine.closed
+
+    created = ClosingSource(10.0)
+    monkeypatch.setattr("profiler.default_power_source", lambda: created)
+    with EnergyProfiler(interval_s=60):
+        pass
+    assert created.closed
+
+
+def test_track_records_calls_that_raise():
+    profiler = EnergyProfiler(FakePowerSource(100.0), interval_s=60)
+
+    @profiler.track(name="generate")
+    def fail():
+        time.sleep(0.01)
+        raise RuntimeError("OOM")
+
+    with profiler:
+        try:
+            fail()
+        except RuntimeError:
+            pass
+    stats = profiler.stats()["generate"]
+    assert stats.calls == 1 and stats.tokens == 0
+    assert stats.wall_s >= 0.01 and stats.joules > 0
+
+
+def test_call_longer_than_the_sample_buffer():
+    profiler = EnergyProfiler(FakePowerSource(100.0), interval_s=0.001, capacity=4)
+    with profiler:
+        with profiler.measure("long"):
+            time.sleep(0.05)
+        assert len(profiler.trace) == 4
+    stats = profiler.stats()["long"]
+    assert abs(stats.avg_power_w - 100.0) < 1e-6
+    assert abs(profiler.energy_between(profiler.trace.first_t, profiler.trace.last_t)
+               - 100.0 * (profiler.trace.last_t - profiler.trace.first_t)) < 1e-6
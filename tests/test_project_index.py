@@ -0,0 +1,137 @@
+"""Project index: root-relative keys, no side effects, Rule 2 binding."""
+
+import os
+
+from audit import ScanContext, audit_content, build_scan_context, detect_nf4_small_model
+from project_index import build_index, index_sources
+
+
+def write(root, rel, text):
+    path = os.path.join(root, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+CONFIG = "from transformers import BitsAndBytesConfig\ncfg = BitsAndBytesConfig(load_in_8bit=True)\n"
+SERVE = (
+    "from transformers import AutoModelForCausalLM\n"
+    "from pkg.config import cfg\n"
+    'model = AutoModelForCausalLM.from_pretrained("mistralai/Mistral-7B-v0.1", '
+    'quantization_config=cfg, device_map="auto")\n'
+)
+
+
+def test_keys_and_messages_are_relative_to_an_absolute_root(tmp_path, monkeypatch):
+    write(tmp_path, "pkg/__init__.py", "")
+    write(tmp_path, "pkg/config.py", CONFIG)
+    write(tmp_path, "serve.py", SERVE)
+    monkeypatch.chdir(tmp_path)
+
+    index = build_index(str(tmp_path))
+    assert sorted(index.files) == ["pkg/__init__.py", "pkg/config.py", "serve.py"]
+
+    issues = audit_content(SERVE, "serve.py", ScanContext(index=index))
+    cross = [i for i in issues if i.rule == "detect_cross_file_quant_config"]
+    assert cross and "`pkg/config.py`" in cross[0].description
+    assert str(tmp_path) not in cross[0].description
+
+
+def test_local_runs_do_not_write_the_index(tmp_path, monkeypatch):
+    write(tmp_path, "serve.py", SERVE)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GITHUB_WORKSPACE", raising=False)
+
+    build_scan_context()
+    build_scan_context(files=["serve.py"])
+    assert not (tmp_path / ".ecocompute").exists()
+
+
+def test_files_mode_builds_the_index_once_a_file_imports_a_project_module(tmp_path, monkeypatch):
+    write(tmp_path, "pkg/__init__.py", "")
+    write(tmp_path, "pkg/config.py", CONFIG)
+    write(tmp_path, "serve.py", SERVE)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GITHUB_WORKSPACE", raising=False)
+
+    ctx = build_scan_context(files=["serve.py", "bench.py"])
+    standalone = SERVE.replace("from pkg.config import cfg\n", "import torch\n")
+    audit_content(standalone, "bench.py", ctx)
+    assert ctx.index is None
+
+    audit_content(SERVE, "serve.py", ctx)
+    assert ctx.index is not None
+
+
+def test_files_mode_indexes_the_given_files_and_what_they_import(tmp_path, monkeypatch):
+    write(tmp_path, "pkg/config.py", CONFIG)
+    write(tmp_path, "serve.py", SERVE)
+    write(tmp_path, "other.py", CONFIG)
+    monkeypatch.chdir(tmp_path)
+
+    index = build_index(str(tmp_path), files=["serve.py"])
+    assert sorted(index.files) == ["pkg/config.py", "serve.py"]
+
+
+def test_static_only_resolves_a_config_in_an_unscanned_module(tmp_path, monkeypatch):
+    write(tmp_path, "pkg/__init__.py", "")
+    write(tmp_path, "pkg/config.py", CONFIG)
+    write(tmp_path, "serve.py", SERVE)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GITHUB_WORKSPACE", raising=False)
+
+    issues = audit_content(SERVE, "serve.py", build_scan_context(files=["serve.py"]))
+    assert "detect_cross_file_quant_config" in [i.rule for i in issues]
+
+
+def test_index_sources_pulls_in_imported_modules_only():
+    staged = {"serve.py": SERVE}
+    reads = []
+
+    def read(paths):
+        reads.extend(paths)
+        return {"pkg/config.py": CONFIG}
+
+    index = index_sources(staged, ["pkg/__init__.py", "pkg/config.py", "other.py"], read)
+    assert reads == ["pkg/config.py"]
+    assert index.resolve(index.files["serve.py"], "cfg").quant == {"load_in_8bit": True}
+
+
+def test_nf4_rule_ignores_an_unrelated_small_model_string():
+    content = (
+        "from transformers import AutoModelForCausalLM, BitsAndBytesConfig\n"
+        'DRAFT = "Qwen/Qwen2-1.5B"\n'
+        "bnb = BitsAndBytesConfig(load_in_4bit=True)\n"
+        'model = AutoModelForCausalLM.from_pretrained("mistralai/Mistral-7B-v0.1", '
+        "quantization_config=bnb)\n"
+    )
+    assert detect_nf4_small_model(content, "serve.py") == []
+
+
+def test_nf4_rule_binds_the_model_to_the_nf4_load():
+    content = (
+        "from transformers import AutoModelForCausalLM, BitsAndBytesConfig\n"
+        "def main():\n"
+        '    name = "Qwen/Qwen2-1.5B"\n'
+        "    cfg = BitsAndBytesConfig(load_in_4bit=True)\n"
+        "    model = AutoModelForCausalLM.from_pretrained(name, quantization_config=cfg)\n"
+    )
+    issues = detect_nf4_small_model(content, "serve.py")
+    assert [(i.line, i.title) for i in issues] == [(5, "NF4 quantization on small model (Qwen2-1.5B)")]
+
+
+def test_nf4_and_cross_file_rules_share_one_parse(tmp_path, monkeypatch):
+    import project_index
+
+    content = SERVE.replace("from pkg.config import cfg\n",
+                            "from pkg.config import cfg\nnf4 = dict(load_in_4bit=True)\n")
+    write(tmp_path, "pkg/config.py", CONFIG)
+    write(tmp_path, "serve.py", content)
+    monkeypatch.chdir(tmp_path)
+    index = build_index(str(tmp_path))
+
+    calls = []
+    real = project_index.analyze_source
+    monkeypatch.setattr(project_index, "analyze_source", lambda *a, **kw: calls.append(a) or real(*a, **kw))
+    audit_content(content, "serve.py", ScanContext(index=index))
+    assert len(calls) == 1
@@ -0,0 +1,46 @@
+"""PR comment rendering: grouping and the hard size budget."""
+
+import pytest
+
+from audit import Issue, Severity, generate_comment
+from calibrate import RelativeChange
+from workload import WorkloadResult
+
+
+def findings(n):
+    return [
+        Issue(Severity.WARNING, f"Finding {i}", "ü" * 300, "fix it " * 20,
+              file=f"pkg/module_{i}.py", line=i + 1, energy_impact="2×", rule=f"rule_{i}")
+        for i in range(n)
+    ]
+
+
+def size(text):
+    return len(text.encode("utf-8"))
+
+
+def test_identical_findings_are_grouped():
+    issues = [Issue(Severity.CRITICAL, "Same", "d", "f", file=f"f{i}.py", line=1, rule="r")
+              for i in range(20)]
+    comment = generate_comment(issues, 20)
+    assert comment.count("**Same**") == 1
+    assert "20 locations" in comment and "and 5 more" in comment
+
+
+@pytest.mark.parametrize("budget", [3000, 8000, 60000])
+def test_tail_sections_stay_within_the_budget(budget):
+    change = RelativeChange(has_baseline=False, reason="No baseline found.")
+    workload = WorkloadResult(name="x" * budget, runs=5, j_per_run=10.0)
+    comment = generate_comment(findings(400), 400, change=change, budget=budget, workload=workload)
+
+    assert size(comment) <= budget
+    assert "not shown" in comment
+    assert "Relative Change" in comment
+    assert comment.rstrip().endswith(")")          # footer links survive
+    assert "Workload benchmark section not shown" in comment
+
+
+def test_tail_sections_are_kept_when_they_fit():
+    workload = WorkloadResult(name="bench", runs=5, j_per_run=10.0)
+    comment = generate_comment(findings(3), 3, workload=workload)
+    assert "Workload Benchmark" in comment and "section not shown" not in comment
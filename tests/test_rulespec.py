@@ -0,0 +1,59 @@
+"""Declarative rules: the combined scan must agree with per-pattern matching."""
+
+from rulespec import CompiledRuleSet, RuleSpec, load_rule_specs
+
+
+def ids(specs, content):
+    return [(hit.spec.id, hit.line) for hit in CompiledRuleSet(specs).evaluate(content)]
+
+
+def test_anchored_trigger_matches_past_the_first_line():
+    spec = RuleSpec(id="top-level-load", title="t", trigger=[r"^model\s*="])
+    content = "import torch\n\nmodel = load()\n"
+    assert ids([spec], content) == [("top-level-load", 3)]
+
+
+def test_specs_sharing_a_named_group_do_not_crash():
+    a = RuleSpec(id="a", title="a", trigger=[r"(?P<dtype>float32)"])
+    b = RuleSpec(id="b", title="b", trigger=[r"torch\.(?P<dtype>bfloat16)"])
+    content = "x = torch.float32\ny = torch.bfloat16\n"
+    assert ids([a, b], content) == [("a", 1), ("b", 2)]
+
+
+def test_backreferences_keep_their_group_numbers():
+    plain = RuleSpec(id="plain", title="p", trigger=[r"(cuda)\.synchronize"])
+    repeat = RuleSpec(id="repeat", title="r", trigger=[r"(\w+)\(\1\)"])
+    content = "torch.cuda.synchronize()\nout = f(f)\n"
+    assert ids([plain, repeat], content) == [("plain", 1), ("repeat", 2)]
+
+
+def test_patterns_that_only_conflict_when_joined_fall_back():
+    # A global inline flag is only legal at the start of the whole pattern
+    a = RuleSpec(id="a", title="a", trigger=[r"(?x) to \( 'cuda' \)"])
+    b = RuleSpec(id="b", title="b", trigger=[r"\.half\(\)"])
+    content = "m = m.half()\nm.to('cuda')\n"
+    assert ids([a, b], content) == [("a", 2), ("b", 1)]
+
+
+def test_require_and_forbid(tmp_path):
+    (tmp_path / "org.toml").write_text(
+        "[[rules]]\n"
+        'id = "fp32-serving"\n'
+        'title = "FP32 weights in serving code"\n'
+        "trigger = ['torch_dtype\\s*=\\s*torch\\.float32']\n"
+        "require = ['\\.generate\\(']\n"
+        "forbid = ['device_map\\s*=\\s*\"cpu\"']\n"
+    )
+    specs = load_rule_specs([str(tmp_path)])
+    serving = "m = load(torch_dtype=torch.float32)\nm.generate(x)\n"
+    assert ids(specs, serving) == [("fp32-serving", 1)]
+    assert ids(specs, serving + 'load(device_map="cpu")\n') == []
+    assert ids(specs, "m = load(torch_dtype=torch.float32)\n") == []
+
+
+def test_patterns_matching_at_the_same_spot_are_all_seen():
+    load = RuleSpec(id="load", title="l", trigger=[r"AutoModel\w*\.from_pretrained"],
+                    require=[r"from_pretrained\(", r"Auto"])
+    inner = RuleSpec(id="inner", title="i", trigger=[r"Model"], ignore_case=True)
+    content = "import torch\nm = AutoModelForCausalLM.from_pretrained(name)\n"
+    assert ids([load, inner], content) == [("load", 2), ("inner", 2)]
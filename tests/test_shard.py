@@ -0,0 +1,89 @@
+"""Sharded audits: merged shards equal one unsharded run."""
+
+import subprocess
+from collections import Counter
+
+import pytest
+
+from audit import (
+    Severity, ShardResult, build_scan_context, differential_audit, load_shard_results,
+    merge_shard_results, run_shard, run_static_only, scan_files,
+)
+
+INT8 = (
+    "from transformers import AutoModelForCausalLM\n"
+    'model = AutoModelForCausalLM.from_pretrained("mistralai/Mistral-7B-v0.1", load_in_8bit=True)\n'
+)
+NF4 = (
+    "from transformers import AutoModelForCausalLM, BitsAndBytesConfig\n"
+    "cfg = BitsAndBytesConfig(load_in_4bit=True)\n"
+    'model = AutoModelForCausalLM.from_pretrained("Qwen/Qwen2-0.5B", quantization_config=cfg)\n'
+)
+FILES = {f"mod_{i}.py": (INT8, NF4, "x = 1\n")[i % 3] * (1 + i % 4) for i in range(9)}
+
+
+def git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    for name, text in FILES.items():
+        (tmp_path / name).write_text(text)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GITHUB_WORKSPACE", raising=False)
+    monkeypatch.delenv("GITHUB_OUTPUT", raising=False)
+    return tmp_path
+
+
+def fingerprints(issues):
+    return Counter((i.file, i.rule, i.fingerprint) for i in issues)
+
+
+def shard_all(project, monkeypatch, count, static_only=True):
+    for index in range(1, count + 1):
+        monkeypatch.setenv("SHARD_OUTPUT", str(project / "out" / f"ecocompute-shard-{index}-of-{count}.json"))
+        run_shard(sorted(FILES), f"{index}/{count}", static_only)
+    return merge_shard_results(load_shard_results([str(project / "out")]))
+
+
+@pytest.mark.parametrize("count", [1, 2, 4])
+def test_merged_shards_equal_an_unsharded_run(project, monkeypatch, count):
+    merged = shard_all(project, monkeypatch, count)
+    assert sorted(merged.files) == sorted(FILES)
+    assert merged.diff_result() is None
+    whole = scan_files(sorted(FILES), build_scan_context())
+    assert fingerprints(merged.issues) == fingerprints(whole)
+
+
+def test_differential_shards_keep_the_new_existing_split(project, monkeypatch):
+    git(project, "init", "-q", "-b", "main")
+    git(project, "config", "user.email", "dev@example.com")
+    git(project, "config", "user.name", "dev")
+    git(project, "add", ".")
+    git(project, "commit", "-q", "-m", "base")
+    (project / "mod_2.py").write_text(INT8)           # new finding in a changed file
+    monkeypatch.setenv("DIFF_BASE", "main")
+    monkeypatch.setenv("DIFFERENTIAL", "true")
+
+    merged = shard_all(project, monkeypatch, 3, static_only=False)
+    diff = merged.diff_result()
+    whole = differential_audit(sorted(FILES), build_scan_context())
+    assert diff is not None and diff.base == whole.base
+    assert fingerprints(diff.new) == fingerprints(whole.new) and diff.new
+    assert fingerprints(diff.existing) == fingerprints(whole.existing)
+
+    # A static-only merge gates on the new findings only
+    (project / "mod_2.py").write_text("x = 1\n")
+    git(project, "add", ".")
+    git(project, "commit", "-q", "-m", "clean")
+    merged = shard_all(project, monkeypatch, 3, static_only=False)
+    assert merged.diff_result().new == [] and merged.diff_result().existing
+    run_static_only([], Severity.WARNING, post_comment=False, merge=[str(project / "out")])
+
+
+def test_mixing_differential_and_full_audit_shards_is_rejected():
+    shards = [ShardResult(index=1, count=2, diff_base="abc", new_count=0),
+              ShardResult(index=2, count=2)]
+    with pytest.raises(ValueError, match="mix differential and full audits"):
+        merge_shard_results(shards)
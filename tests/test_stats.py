@@ -0,0 +1,64 @@
+"""Bootstrap intervals: coverage of the true ratio/difference, and no spread → None."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from stats import Group, bootstrap_deltas, bootstrap_ratios  # noqa: E402
+
+TRUE_A, TRUE_B, SIGMA = 120.0, 100.0, 10.0
+
+
+def experiments(trials, runs, summary, seed=0):
+    """`trials` independent A/B measurements of `runs` runs each, as one group list."""
+    rng = np.random.default_rng(seed)
+    groups, pairs = [], []
+    for k in range(trials):
+        for name, mu in ((f"a{k}", TRUE_A), (f"b{k}", TRUE_B)):
+            samples = rng.normal(mu, SIGMA, runs)
+            groups.append(Group.from_summary(name, samples.mean(), samples.std(ddof=1), runs)
+                          if summary else Group.from_samples(name, samples))
+        pairs.append((f"a{k}", f"b{k}"))
+    return groups, pairs
+
+
+@pytest.mark.parametrize("summary", [False, True])
+@pytest.mark.parametrize("confidence", [0.8, 0.95])
+def test_intervals_cover_the_true_value_at_their_confidence(summary, confidence):
+    groups, pairs = experiments(trials=300, runs=30, summary=summary)
+    ratios = bootstrap_ratios(groups, pairs, n_resamples=500, confidence=confidence)
+    deltas = bootstrap_deltas(groups, pairs, n_resamples=500, confidence=confidence)
+
+    for intervals, truth in ((ratios, TRUE_A / TRUE_B), (deltas, TRUE_A - TRUE_B)):
+        coverage = np.mean([ci.low <= truth <= ci.high for ci in intervals])
+        assert abs(coverage - confidence) < 0.06
+        assert all(ci.low < ci.estimate < ci.high for ci in intervals)
+
+
+def test_intervals_narrow_with_more_runs():
+    def width(runs):
+        groups, pairs = experiments(trials=50, runs=runs, summary=False, seed=1)
+        return np.median([ci.high - ci.low for ci in bootstrap_ratios(groups, pairs, n_resamples=500)])
+
+    assert width(40) < 0.6 * width(10)           # ~1/√n: 0.5 expected
+
+
+def test_groups_without_spread_get_no_interval():
+    groups = [
+        Group.from_summary("fp16", 5661, 143, 10),
+        Group.from_summary("no_std", 7401, None, 10),
+        Group.from_summary("one_run", 7401, 115, 1),
+        Group.from_samples("one_sample", [3707.0]),
+        Group.from_summary("int8", 7401, 115, 10),
+    ]
+    pairs = [("no_std", "fp16"), ("fp16", "one_run"), ("one_sample", "fp16"), ("int8", "fp16")]
+    *missing, ci = bootstrap_ratios(groups, pairs)
+    assert missing == [None, None, None]
+    assert ci.as_pct_change().format_pct() == "+30.7% (95% CI +28.3 to +33.2%)"
+
+    assert bootstrap_deltas(groups, pairs[:3]) == [None, None, None]
+
+
+def test_unknown_groups_are_rejected():
+    with pytest.raises(KeyError, match="unknown group"):
+        bootstrap_ratios([Group.from_summary("fp16", 5661, 143, 10)], [("int8", "fp16")])
@@ -0,0 +1,72 @@
+"""Watch mode: incremental re-audit reports only what moved."""
+
+import os
+
+from audit import Severity
+from watch import PollingWatcher, WatchSession
+
+CONFIG_8BIT = "from transformers import BitsAndBytesConfig\ncfg = BitsAndBytesConfig(load_in_8bit=True)\n"
+SERVE = (
+    "from transformers import AutoModelForCausalLM\n"
+    "from pkg.config import cfg\n"
+    'model = AutoModelForCausalLM.from_pretrained("mistralai/Mistral-7B-v0.1", quantization_config=cfg)\n'
+)
+INT8 = (
+    "from transformers import AutoModelForCausalLM\n"
+    'model = AutoModelForCausalLM.from_pretrained("mistralai/Mistral-7B-v0.1", load_in_8bit=True)\n'
+)
+SERVE_PATH = "serve.py"
+CONFIG_PATH = os.path.join("pkg", "config.py")
+
+
+def session(tmp_path, monkeypatch):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "__init__.py").write_text("")
+    (tmp_path / "pkg" / "config.py").write_text("cfg = None\n")
+    (tmp_path / "serve.py").write_text(SERVE)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GITHUB_WORKSPACE", raising=False)
+    s = WatchSession(["."], Severity.INFO)
+    assert s.scan_all() == 3
+    return s
+
+
+def titles(issues):
+    return sorted(i.rule for i in issues)
+
+
+def test_update_reports_new_and_resolved_findings(tmp_path, monkeypatch):
+    s = session(tmp_path, monkeypatch)
+    assert s.update({SERVE_PATH}) == []          # unchanged content: nothing moved
+
+    before = s.totals()
+    (tmp_path / "bench.py").write_text(INT8)
+    [(path, added, resolved)] = s.update({"bench.py"})
+    assert path == "bench.py" and added and resolved == []
+    assert s.totals() == (before[0] + len(added), before[1] + 1)
+
+    os.remove(tmp_path / "bench.py")
+    [(path, new, resolved)] = s.update({"bench.py"})
+    assert new == [] and titles(resolved) == titles(added)
+    assert "bench.py" not in s.results and s.totals() == before
+
+
+def test_changing_an_imported_module_re_audits_its_importers(tmp_path, monkeypatch):
+    s = session(tmp_path, monkeypatch)
+    (tmp_path / "pkg" / "config.py").write_text(CONFIG_8BIT)
+
+    diffs = {path: (new, resolved) for path, new, resolved in s.update({CONFIG_PATH})}
+    assert "detect_cross_file_quant_config" in titles(diffs[SERVE_PATH][0])
+
+    (tmp_path / "pkg" / "config.py").write_text("cfg = None\n")
+    diffs = {path: (new, resolved) for path, new, resolved in s.update({CONFIG_PATH})}
+    assert "detect_cross_file_quant_config" in titles(diffs[SERVE_PATH][1])
+
+
+def test_polling_watcher_reports_changed_sources(tmp_path):
+    (tmp_path / "a.py").write_text("x = 1\n")
+    watcher = PollingWatcher([str(tmp_path)], interval=0)
+    assert watcher.read(0) == set()
+    (tmp_path / "a.py").write_text("x = 22\n")
+    (tmp_path / "notes.txt").write_text("ignored")
+    assert watcher.read(0) == {os.path.join(str(tmp_path), "a.py")}
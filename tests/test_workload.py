@@ -0,0 +1,83 @@
+"""Workload benchmark: measurement, noise-aware gate, baseline round-trip."""
+
+import time
+
+import pytest
+
+from calibrate import Baseline, CalibrationResult, compute_relative_change, load_baseline, save_baseline
+from hardware import HardwareInfo
+from power import FakePowerSource
+from workload import WorkloadError, WorkloadResult, change_is_significant, run_workload
+
+
+def sleeper(seconds=0.02, units=64):
+    def run():
+        time.sleep(seconds)
+        return units
+    return run
+
+
+def test_runs_must_be_positive():
+    with pytest.raises(WorkloadError):
+        run_workload(sleeper(), runs=0, power_source=FakePowerSource(100.0))
+    with pytest.raises(WorkloadError):
+        run_workload(sleeper(), runs=1, warmup=-1, power_source=FakePowerSource(100.0))
+
+
+def test_energy_per_run_from_a_fake_source():
+    result = run_workload(sleeper(), runs=3, warmup=1, power_source=FakePowerSource(200.0),
+                          interval_s=0.005, name="gen")
+    assert len(result.run_joules) == 3
+    assert result.power_domains == "gpu"
+    assert result.units_per_run == 64
+    assert abs(result.avg_power_w - 200.0) < 1e-6
+    assert abs(result.j_per_run - 200.0 * result.seconds_per_run) < 1e-6
+    assert abs(result.j_per_unit - result.j_per_run / 64) < 1e-9
+
+
+def test_single_run_has_no_spread():
+    result = run_workload(sleeper(0.01), runs=1, warmup=0, power_source=FakePowerSource(50.0))
+    assert result.j_per_run_std == 0.0
+
+
+def test_change_is_significant_against_run_to_run_noise():
+    current = WorkloadResult(runs=5, j_per_run=110.0, j_per_run_std=2.0)
+    assert change_is_significant(current, baseline_mean=100.0, baseline_std=2.0, baseline_runs=5)
+    noisy = WorkloadResult(runs=5, j_per_run=110.0, j_per_run_std=20.0)
+    assert not change_is_significant(noisy, baseline_mean=100.0, baseline_std=20.0, baseline_runs=5)
+    exact = WorkloadResult(runs=1, j_per_run=100.0)
+    assert not change_is_significant(exact, baseline_mean=100.0, baseline_std=0.0, baseline_runs=1)
+
+
+def test_baseline_round_trip_gates_on_the_workload(tmp_path, monkeypatch):
+    monkeypatch.setenv("GITHUB_WORKSPACE", str(tmp_path))
+    hw = HardwareInfo(gpu_name="Fake GPU", gpu_count=1, hardware_hash="abc123")
+    stored = run_workload(sleeper(), runs=3, warmup=0, power_source=FakePowerSource(100.0),
+                          interval_s=0.005, name="gen")
+    save_baseline(Baseline(
+        hardware_hash=hw.hardware_hash,
+        workload_name=stored.name,
+        workload_j_per_run=stored.j_per_run,
+        workload_j_std=stored.j_per_run_std,
+        workload_runs=stored.runs,
+        workload_throughput=stored.throughput,
+        workload_domains=stored.power_domains,
+    ))
+    loaded = load_baseline(hw.hardware_hash)
+    assert (loaded.workload_name, loaded.workload_j_per_run, loaded.workload_runs) == (
+        "gen", stored.j_per_run, 3)
+
+    # Same code at twice the power: a clear, significant regression
+    current = run_workload(sleeper(), runs=3, warmup=0, power_source=FakePowerSource(200.0),
+                           interval_s=0.005, name="gen")
+    change = compute_relative_change(0, 0, 0, hw, CalibrationResult(), threshold_pct=5.0,
+                                     workload=current)
+    assert change.workload_change_pct > 50
+    assert change.workload_significant
+    assert not change.passed
+
+    # A different workload is not compared against this baseline
+    other = WorkloadResult(name="other", runs=3, j_per_run=1e6, j_per_run_std=1.0,
+                           power_domains="gpu")
+    change = compute_relative_change(0, 0, 0, hw, CalibrationResult(), workload=other)
+    assert change.workload_change_pct == 0.0 and change.passed
@@ -19,6 +19,7 @@ export interface ModelData {
   energyEfficiency: number; // tokens per watt
   tags: string[];
   provenance: DataProvenance;
+  bundleKey?: string; // measurement in the dashboard bundle that refreshes the measured fields
 }
 
 export interface CalculatorState {